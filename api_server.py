@@ -1,32 +1,57 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import json
 import os
+import queue
+import threading
 import time
-import pickle
 import signal
 import sys
-import re
 from src.csv_handler import CSVHandler
-from selenium.webdriver.common.by import By
-from src.linkedin_auth import LinkedInAuthenticator
-from src.linkedin_responder import LinkedInResponder
-from src.linkedin_messages import LinkedInMessageFetcher
+from src.message_categorizer import MessageCategorizer
+from src.conversation_index import ConversationIndex
+from src.conversation_store import ConversationStore, atomic_write_json
+from src.write_behind import WriteBehindStore
+from src.conversation_snapshot import ConversationSnapshot
+from src.conversation_model import ConversationRecord, pack_messages, replace_or_append
+from src.message_cache import MessageBodyCache
+from src.conversation_cache import ConversationCache
+from src.bulk_reply import BulkReplyJob
+from src.browser_worker import BrowserWorker, BrowserUnavailableError
+from src.sync_checkpoint import SyncCheckpoint
+from src.fetch_scheduler import FetchScheduler
+from src.sync_engine import SyncEngine, FullSync, IncrementalSync, UnreadSync
+from src.browser_jobs import BrowserJobs
+from src.read_receipts import ReadReceiptQueue
+from src.browser_lifecycle import BrowserLifecycle
+from src.cookie_jar import CookieJar, validate_session
+from src.response_template import name_values
+from src.contact_directory import get_directory
+from src.browser_reattach import (KEEP_BROWSER, DEBUGGER_ADDRESS, apply_keep_alive, debugger_listening,
+                                  attach_driver, switch_to_messaging_tab, messaging_tab_alive, detach_driver)
 from datetime import datetime
 
+class ConversationJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes cached conversation records in the API shape"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, ConversationRecord):
+            return o.to_api()
+        return DefaultJSONProvider.default(o)
+
 app = Flask(__name__)
+app.json = ConversationJSONProvider(app)
 CORS(app)  # Enable CORS for all routes (for local frontend dev)
 
 CONVERSATIONS_DIR = 'data/conversations'
-ORDER_FILE = os.path.join(CONVERSATIONS_DIR, '_order.json')
-DRIVER_SESSION_FILE = 'data/driver_session.pkl'
+SNAPSHOT_FILE = 'data/conversations.snap'
+DRIVER_SESSION_FILE = 'data/driver_session.json'
 CACHE_TTL = 10  # seconds
 
-# In-memory cache for conversations
-conversation_cache = {
-    'data': None,
-    'last_fetched': 0
-}
+# In-memory cache for conversations (ConversationRecord objects, shared with sync_progress)
+conversation_cache = ConversationCache(ttl=CACHE_TTL)
 
 # Progress tracking for full sync
 sync_progress = {
@@ -35,29 +60,71 @@ sync_progress = {
     'total': 0,
     'current_conversation': '',
     'conversations': [],
+    'skipped': 0,
+    'incremental': 0,
+    'full': 0,
+    'policy': None,
     'start_time': None
 }
 
+# Held while a request claims sync_progress, so two syncs cannot both start
+sync_progress_lock = threading.Lock()
+
+# Counters and stage timings of the last sync run by each policy (live while it runs)
+sync_stats = {}
+
+# Current or last bulk reply job
+bulk_reply_state = {
+    'job': None
+}
+# Held while a request claims bulk_reply_state, so two jobs cannot both start sending
+bulk_reply_lock = threading.Lock()
+
 authenticator = None
 responder = None
+network_capture = None
 
-def _safe_filename(sender_name):
-    """Generate a safe filename from sender name"""
-    if not sender_name or sender_name.strip() == "":
-        return "Unknown_Contact"
-    
-    # Replace spaces with underscores and remove/replace unsafe characters
-    safe_name = sender_name.strip()
-    safe_name = re.sub(r'[<>:"/\\|?*]', '_', safe_name)  # Replace unsafe chars
-    safe_name = re.sub(r'\s+', '_', safe_name)  # Replace spaces and multiple whitespace
-    safe_name = re.sub(r'_+', '_', safe_name)  # Replace multiple underscores with single
-    safe_name = safe_name.strip('_')  # Remove leading/trailing underscores
-    
-    # Ensure we don't have an empty filename
-    if not safe_name:
-        safe_name = "Unknown_Contact"
-        
-    return safe_name
+# Derived category/reply-status index, updated on every conversation write
+conversation_index = ConversationIndex()
+
+# Single, crash-safe write path for conversation files; updates are applied in
+# memory and coalesced before they reach disk
+conversation_store = WriteBehindStore(ConversationStore(CONVERSATIONS_DIR, index=conversation_index))
+
+def load_message_columns(sender_name):
+    """Reload an evicted message body from the store"""
+    try:
+        data = conversation_store.read(sender_name)
+    except Exception as e:
+        print(f"⚠️ Could not load messages for {sender_name}: {e}")
+        return None
+    return pack_messages(data.get('messages', [])) if data is not None else None
+
+# Only conversation summaries stay resident; message bodies live in a byte-bounded LRU
+message_cache = MessageBodyCache(
+    loader=load_message_columns,
+    max_bytes=int(os.getenv('MESSAGE_CACHE_MB', '64')) * 1024 * 1024
+)
+ConversationRecord.body_cache = message_cache
+
+# Ranks unread threads for refresh cycles and carries unfinished work between them
+fetch_scheduler = FetchScheduler(index=conversation_index)
+
+def flush_pending_writes():
+    """Write out buffered conversation updates and fsync them"""
+    try:
+        flushed = conversation_store.flush()
+        conversation_store.checkpoint()
+        if flushed:
+            print(f"💾 Flushed {flushed} buffered conversation writes")
+    except Exception as e:
+        print(f"⚠️ Error flushing conversation writes: {str(e)[:50]}")
+
+# All Selenium work runs on this single thread
+browser_worker = BrowserWorker()
+# Handles for browser work that endpoints start without waiting on (?async=1)
+browser_jobs = BrowserJobs(browser_worker)
+SERVER_START_TIME = time.time()
 
 def ensure_conversations_directory():
     """Ensure the conversations directory exists with proper permissions"""
@@ -76,47 +143,18 @@ def load_individual_conversations():
     if not os.path.exists(CONVERSATIONS_DIR):
         print(f"⚠️  Conversations directory {CONVERSATIONS_DIR} not found")
         return conversations
-    order = None
-    if os.path.exists(ORDER_FILE):
-        try:
-            with open(ORDER_FILE, 'r', encoding='utf-8') as f:
-                order = json.load(f)
-            print(f"🔢 Loaded processing order from _order.json: {order}")
-        except Exception as e:
-            print(f"⚠️ Could not read _order.json: {e}")
-            order = None
-    files = [f for f in os.listdir(CONVERSATIONS_DIR) if f.endswith('.json') and f != '_order.json']
-    if order:
-        # Use the order from _order.json, append any missing files at the end
-        ordered_files = []
-        for name in order:
-            # Find the file that starts with the safe filename for this sender_name
-            safe_name = name.replace(' ', '_')
-            match = next((f for f in files if f.startswith(safe_name)), None)
-            if match:
-                ordered_files.append(match)
-        # Add any files not in order.json at the end
-        ordered_files += [f for f in files if f not in ordered_files]
-    else:
-        ordered_files = sorted(files)
-    for idx, filename in enumerate(ordered_files):
-        filepath = os.path.join(CONVERSATIONS_DIR, filename)
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                conversation_data = json.load(f)
-                api_conversation = {
-                    'sender_name': conversation_data.get('sender_name', ''),
-                    'is_unread': conversation_data.get('is_unread', False),
-                    'message_count': conversation_data.get('total_messages', 0),
-                    'all_messages': conversation_data.get('messages', []),
-                    'fetch_time': conversation_data.get('fetch_time', ''),
-                    'last_received_message': conversation_data.get('last_received_message', ''),
-                    'index': idx
-                }
-                conversations.append(api_conversation)
-        except Exception as e:
-            print(f"❌ Error loading {filename}: {str(e)}")
+    # Reads go to disk, so buffered updates must land there first
+    conversation_store.flush()
+    # The manifest knows every conversation file and its sidebar position
+    ordered_files = conversation_store.ordered_filenames()
+    # Unchanged files are decoded from the binary snapshot instead of parsed as JSON
+    # Summaries only: message bodies are loaded into the LRU when a thread is opened
+    stored = ConversationSnapshot(SNAPSHOT_FILE).load_files(CONVERSATIONS_DIR, ordered_files, with_messages=False)
+    for filename in ordered_files:
+        conversation_data = stored.get(filename)
+        if conversation_data is None:
             continue
+        conversations.append(ConversationRecord.from_file(conversation_data, index=len(conversations)))
     print(f"📁 Loaded {len(conversations)} conversations from individual files (ordered)")
     return conversations
 
@@ -131,16 +169,14 @@ def save_driver_session():
                 print("⚠️ Driver not responsive, skipping session save")
                 return
                 
-            session_data = {
-                'cookies': authenticator.driver.get_cookies(),
+            cookie_count = CookieJar().capture(authenticator.driver)
+            atomic_write_json(DRIVER_SESSION_FILE, {
                 'session_id': authenticator.driver.session_id,
                 'command_executor': authenticator.driver.command_executor._url,
-                'capabilities': authenticator.driver.capabilities
-            }
-            os.makedirs(os.path.dirname(DRIVER_SESSION_FILE), exist_ok=True)
-            with open(DRIVER_SESSION_FILE, 'wb') as f:
-                pickle.dump(session_data, f)
-            print("💾 Driver session saved")
+                'debugger_address': authenticator.driver.capabilities.get('goog:chromeOptions', {}).get('debuggerAddress'),
+                'saved_at': datetime.now().isoformat()
+            })
+            print(f"💾 Driver session saved ({cookie_count} cookies)")
         except Exception as e:
             print(f"⚠️ Could not save driver session (driver may be closed): {str(e)[:100]}")
             # Don't re-raise, just continue with shutdown
@@ -148,11 +184,13 @@ def save_driver_session():
 def restore_driver_session():
     """Try to restore driver session from saved data"""
     global authenticator
-    if os.path.exists(DRIVER_SESSION_FILE):
+    jar = CookieJar()
+    if jar.exists():
+        # Expired session cookies cannot log in: skip launching a browser for them
+        if jar.session_expired():
+            print("⏰ Saved LinkedIn session has expired, will re-login")
+            return False
         try:
-            with open(DRIVER_SESSION_FILE, 'rb') as f:
-                session_data = pickle.load(f)
-            
             # Create new driver with same capabilities
             from selenium import webdriver
             from selenium.webdriver.chrome.options import Options
@@ -165,24 +203,29 @@ def restore_driver_session():
             chrome_options.add_argument('--log-level=3')
             chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
             
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            # DevTools network events for capturing the messaging JSON (see src/network_capture.py)
+            if os.getenv('LINKEDIN_NETWORK_CAPTURE') == '1':
+                chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
             
-            # Navigate to LinkedIn and restore cookies
-            driver.get('https://www.linkedin.com')
-            for cookie in session_data['cookies']:
-                try:
-                    driver.add_cookie(cookie)
-                except:
-                    pass
+            from src.browser_profile import LEAN_PROFILE, apply_lean_options, apply_lean_profile
+            if LEAN_PROFILE:
+                apply_lean_options(chrome_options)
+            chrome_options.add_argument('--remote-debugging-port=9222')
+            apply_keep_alive(chrome_options)
             
-            driver.refresh()
-            time.sleep(2)
+            driver = webdriver.Chrome(options=chrome_options)
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            if LEAN_PROFILE:
+                apply_lean_profile(driver)
             
-            # Check if still logged in
-            if "/feed" in driver.current_url or authenticator.is_logged_in_check():
+            # All cookies in one CDP call before the first page load, then a
+            # single navigation to messaging both validates the session and
+            # lands where scraping starts
+            jar.inject(driver)
+            if validate_session(driver):
                 print("✅ Successfully restored driver session")
                 authenticator.driver = driver
+                authenticator.is_logged_in = True
                 return True
             else:
                 print("❌ Restored session is invalid, will re-login")
@@ -194,6 +237,65 @@ def restore_driver_session():
             return False
     return False
 
+def saved_debugger_address():
+    """DevTools address of the browser from the saved driver session, or the default port"""
+    try:
+        with open(DRIVER_SESSION_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('debugger_address') or DEBUGGER_ADDRESS
+    except Exception:
+        return DEBUGGER_ADDRESS
+
+def reattach_browser():
+    """Attach to a Chrome left running by the previous server instead of launching one"""
+    global authenticator
+    address = saved_debugger_address()
+    if not debugger_listening(address):
+        return False
+    print(f"🔌 Reattaching to running Chrome at {address}")
+    try:
+        driver = attach_driver(address)
+    except Exception as e:
+        print(f"⚠️ Could not reattach to Chrome: {str(e)[:100]}")
+        return False
+    
+    from src.linkedin_auth import LinkedInAuthenticator
+    from src.browser_profile import LEAN_PROFILE, apply_lean_profile
+    authenticator = LinkedInAuthenticator()
+    authenticator.driver = driver
+    # CDP settings belong to the old chromedriver session; apply them again
+    if LEAN_PROFILE:
+        apply_lean_profile(driver)
+    
+    try:
+        if switch_to_messaging_tab(driver) and messaging_tab_alive(driver):
+            # Logged in with the sidebar already loaded: nothing to navigate or scroll
+            authenticator.is_logged_in = True
+            authenticator.messaging_ready = True
+            print("✅ Reattached to live messaging tab")
+        elif validate_session(driver):
+            authenticator.is_logged_in = True
+            print("✅ Reattached browser, messaging reloaded")
+        else:
+            print("🔐 Reattached browser is logged out")
+    except Exception as e:
+        print(f"⚠️ Reattached browser is not responding: {str(e)[:100]}")
+        detach_driver(driver)
+        authenticator = None
+        return False
+    return True
+
+def release_browser():
+    """Stop the driver at shutdown; Chrome keeps running for the next start unless LINKEDIN_KEEP_BROWSER=0"""
+    if authenticator and authenticator.driver:
+        try:
+            if KEEP_BROWSER:
+                detach_driver(authenticator.driver)
+                print("🔌 Browser left running for the next start")
+            else:
+                authenticator.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Error closing driver: {str(e)[:50]}")
+
 def kill_orphaned_chromedrivers():
     """Kill only orphaned ChromeDriver processes (safe - doesn't touch user's Chrome windows)"""
     try:
@@ -233,6 +335,14 @@ def ensure_authenticator():
                 pass
             authenticator = None
     
+    # A Chrome left running by the previous server holds the profile: reattach to it
+    if reattach_browser():
+        if not authenticator.is_logged_in:
+            print("🔐 Logging in with the reattached browser...")
+            if not authenticator.login():
+                raise Exception("LinkedIn login failed")
+        return authenticator
+    
     # Need to initialize browser
     print("🚀 Initializing LinkedIn browser session...")
     
@@ -247,7 +357,8 @@ def ensure_authenticator():
     # Kill orphaned ChromeDriver processes
     kill_orphaned_chromedrivers()
     
-    # Create new authenticator
+    # Create new authenticator (Selenium is only imported on first browser use)
+    from src.linkedin_auth import LinkedInAuthenticator
     authenticator = LinkedInAuthenticator()
     
     # Try to restore existing session first
@@ -274,13 +385,100 @@ def ensure_authenticator():
     
     return authenticator
 
+def close_browser():
+    """Quit the browser and forget it, so the next launch starts fresh (browser worker)"""
+    global authenticator, responder
+    if authenticator is not None and authenticator.driver is not None:
+        try:
+            authenticator.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Error closing driver: {str(e)[:50]}")
+    authenticator = None
+    responder = None
+    # Chrome releases the profile lock shortly after quitting
+    lockfile = os.path.join(os.path.abspath("./chrome_profiles/linkedin_session"), 'lockfile')
+    deadline = time.time() + 5
+    while os.path.exists(lockfile) and time.time() < deadline:
+        time.sleep(0.2)
+
+def current_driver():
+    return authenticator.driver if authenticator is not None else None
+
+# Health checks and recycling run as background browser jobs, so requests
+# find a warm browser instead of waiting through a cold launch
+browser_lifecycle = BrowserLifecycle(browser_worker, launch=ensure_authenticator, close=close_browser,
+                                     get_driver=current_driver)
+
+def probe_unread_badges(driver, probe_timeout=1.2):
+    """Quickly check the messaging page for any visible unread badge"""
+    from selenium.webdriver.common.by import By
+
+    # Ensure we're on messages page
+    if "/messaging/" not in driver.current_url:
+        driver.get('https://www.linkedin.com/messaging/')
+
+    # Probe for unread indicators with a short grace period for DOM paint
+    start = time.time()
+    while time.time() - start < probe_timeout:
+        # Only criterion: visible notification badges with numeric count
+        try:
+            badges = driver.find_elements(
+                By.CSS_SELECTOR,
+                ".notification-badge.notification-badge--show .notification-badge__count"
+            )
+            for b in badges:
+                txt = (b.text or '').strip()
+                if txt.isdigit() and int(txt) > 0:
+                    return True
+        except Exception:
+            pass
+        time.sleep(0.1)
+    return False
+
+def get_fetcher(driver):
+    """Create a message fetcher, importing Selenium on first browser use"""
+    from src.linkedin_messages import LinkedInMessageFetcher
+    return LinkedInMessageFetcher(driver, capture=get_network_capture(driver))
+
+def get_network_capture(driver):
+    """Messaging network capture for the driver when LINKEDIN_NETWORK_CAPTURE=1, else None"""
+    global network_capture
+    if os.getenv('LINKEDIN_NETWORK_CAPTURE') != '1':
+        return None
+    if network_capture is None or network_capture.driver is not driver:
+        from src.network_capture import MessagingCapture
+        network_capture = MessagingCapture(driver)
+        network_capture.enable()
+    return network_capture
+
 def get_responder():
     global responder
     authenticator = ensure_authenticator()
     if responder is None:
+        from src.linkedin_responder import LinkedInResponder
         responder = LinkedInResponder(authenticator.driver)
     return responder
 
+def wants_async():
+    """True if the client asked for a job handle instead of waiting (?async=1)"""
+    return request.args.get('async', '0') == '1'
+
+def job_accepted(job_id):
+    """202 response pointing the client at a browser job"""
+    return jsonify({
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}',
+        'job': browser_jobs.describe(job_id, include_result=False)
+    }), 202
+
+def serialize_conversations(conversations):
+    """API view of a conversation list: summaries, plus every message body with ?include_messages=1
+
+    Bodies of one conversation come from /api/conversation/<sender_name>/messages.
+    """
+    include_messages = request.args.get('include_messages', '0') == '1'
+    return [ConversationRecord.from_api(conv).to_api(include_messages) for conv in conversations]
+
 @app.route('/api/messages', methods=['GET'])
 def get_messages():
     now = time.time()
@@ -295,76 +493,41 @@ def get_messages():
         print("📁 Loading saved conversations only...")
         conversations = load_individual_conversations()
         if conversations:
-            conversation_cache['data'] = conversations
-            conversation_cache['last_fetched'] = now
+            conversation_cache.replace(conversations, fetched_at=now)
             print(f"📁 Loaded {len(conversations)} saved conversations")
             # If unread_only is requested, filter saved data
             if unread_only:
                 filtered_data = [conv for conv in conversations if conv.get('is_unread', False)]
                 print(f"📬 Filtered to {len(filtered_data)} unread conversations from saved data")
-                return jsonify(filtered_data)
-            return jsonify(conversations)
+                return jsonify(serialize_conversations(filtered_data))
+            return jsonify(serialize_conversations(conversations))
         else:
             print("📁 No saved conversations found")
             return jsonify([])
     
     # Check cache first (existing logic)
-    if not force_refresh and conversation_cache['data'] is not None and now - conversation_cache['last_fetched'] < CACHE_TTL:
+    cached = conversation_cache.snapshot()
+    if not force_refresh and conversation_cache.is_fresh(now):
         print("📋 Returning cached data (not expired)")
         # If unread_only is requested, filter cached data
         if unread_only:
-            filtered_data = [conv for conv in conversation_cache['data'] if conv.get('is_unread', False)]
+            filtered_data = [conv for conv in cached if conv.get('is_unread', False)]
             print(f"📬 Filtered to {len(filtered_data)} unread conversations from cache")
             # If no unread conversations found, return all conversations from cache
             if len(filtered_data) == 0:
                 print("📬 No unread conversations in cache, returning all cached conversations")
-                return jsonify(conversation_cache['data'])
-            return jsonify(filtered_data)
-        return jsonify(conversation_cache['data'])
+                return jsonify(serialize_conversations(cached))
+            return jsonify(serialize_conversations(filtered_data))
+        return jsonify(serialize_conversations(cached))
     
     # If force_refresh or cache is stale, fetch from LinkedIn
-    print("🌐 Fetching fresh data from LinkedIn...")
+    if wants_async():
+        # Return a job handle right away; the client polls /api/jobs/<id>
+        return job_accepted(browser_jobs.submit('refresh', refresh_conversations, unread_only, now))
     try:
-        # Ensure conversations directory exists
-        if not ensure_conversations_directory():
-            return jsonify({"error": "Could not create conversations directory"}), 500
-        
-        # Ensure authenticator is initialized
-        authenticator = ensure_authenticator()
-        print("✅ Authenticator ready, starting LinkedIn fetch...")
-        fetcher = LinkedInMessageFetcher(authenticator.driver)
-        
-        # If unread_only is requested, fetch only new/unread conversations efficiently
-        if unread_only:
-            print("📬 Fetching only new/unread conversations efficiently...")
-            # Use new method that saves directly to individual files
-            saved_files = fetcher.fetch_new_conversations_only(limit=50)
-            
-            # Load the conversations from individual files
-            conversations = load_individual_conversations()
-            
-            # If no new/unread conversations found, check if we have any conversations
-            if len(saved_files) == 0:
-                if len(conversations) > 0:
-                    print("📬 No new/unread conversations found, returning existing conversations")
-                    conversation_cache['data'] = conversations
-                    conversation_cache['last_fetched'] = now
-                    return jsonify(conversations)
-                else:
-                    print("📬 No new/unread conversations found and no saved conversations, fetching all as fallback...")
-                    saved_files = fetcher.fetch_and_save_to_individual_files(include_read=True, limit=50, conversations_dir=CONVERSATIONS_DIR)
-                    conversations = load_individual_conversations()
-        else:
-            # Fetch all conversations and save to individual files
-            saved_files = fetcher.fetch_and_save_to_individual_files(include_read=True, limit=50, conversations_dir=CONVERSATIONS_DIR)
-            conversations = load_individual_conversations()
+        conversations = browser_worker.call(refresh_conversations, unread_only, now)
         
         if conversations:
-            conversation_cache['data'] = conversations
-            conversation_cache['last_fetched'] = now
-            
-            print(f"✅ Fresh data loaded: {len(conversations)} conversations")
-            
             # If unread_only is requested, filter the fresh data
             if unread_only:
                 filtered_data = [conv for conv in conversations if conv.get('is_unread', False)]
@@ -372,40 +535,88 @@ def get_messages():
                 # If no unread conversations found, return all conversations
                 if len(filtered_data) == 0:
                     print("📬 No unread conversations in fresh data, returning all conversations")
-                    return jsonify(conversations)
-                return jsonify(filtered_data)
+                    return jsonify(serialize_conversations(conversations))
+                return jsonify(serialize_conversations(filtered_data))
             
-            return jsonify(conversations)
+            return jsonify(serialize_conversations(conversations))
         else:
             print("❌ Failed to fetch fresh data")
             # Fallback to loading existing individual files
             fallback_conversations = load_individual_conversations()
             if fallback_conversations:
                 print(f"📁 Returning fallback data: {len(fallback_conversations)} conversations")
-                return jsonify(fallback_conversations)
+                return jsonify(serialize_conversations(fallback_conversations))
             return jsonify([])
         
+    except BrowserUnavailableError:
+        raise
     except Exception as e:
         print(f"❌ Error fetching messages: {str(e)}")
         import traceback
         traceback.print_exc()
         
         # Try to return cached data as fallback
-        if conversation_cache['data'] is not None:
+        cached = conversation_cache.snapshot()
+        if cached is not None:
             print("🔄 Returning cached data as fallback")
-            return jsonify(conversation_cache['data'])
+            return jsonify(serialize_conversations(cached))
         
         # Last resort: try loading from individual files
         try:
             fallback_conversations = load_individual_conversations()
             if fallback_conversations:
                 print(f"📁 Returning individual file data as fallback: {len(fallback_conversations)} conversations")
-                return jsonify(fallback_conversations)
+                return jsonify(serialize_conversations(fallback_conversations))
         except Exception as fallback_e:
             print(f"❌ Fallback also failed: {str(fallback_e)}")
         
         return jsonify({"error": str(e)}), 500
 
+def run_sync(fetcher, policy, limit, resume=False, **hooks):
+    """Run the sync engine against the shared store; returns its stats (browser worker)
+
+    Conversations are handed to the hooks as they stream out of the engine
+    and are not kept here, so a sync holds one conversation at a time.
+    """
+    engine = SyncEngine(fetcher, conversation_store, policy, **hooks)
+    sync_stats[policy.name] = engine.stats
+    for _ in engine.stream(limit=limit, resume=resume):
+        pass
+    return engine.stats
+
+def run_unread_sync(limit, **hooks):
+    """Unread-only sync with a fetcher for the current driver; returns its stats (browser worker)"""
+    fetcher = get_fetcher(ensure_authenticator().driver)
+    return run_sync(fetcher, UnreadSync(fetch_scheduler), limit, **hooks)
+
+def sync_conversations(fetcher, unread_only=True, limit=50):
+    """Unread-only sync, or a full one when asked or when nothing is stored yet (browser worker)"""
+    if unread_only:
+        print("📬 Fetching only new/unread conversations efficiently...")
+        stats = run_sync(fetcher, UnreadSync(fetch_scheduler), limit)
+        if stats['saved'] or conversation_store.ordered_filenames():
+            return stats
+        print("📬 No new/unread conversations found and no saved conversations, fetching all as fallback...")
+    return run_sync(fetcher, FullSync(), limit)
+
+def refresh_conversations(unread_only, now):
+    """Fetch from LinkedIn into the individual files and cache; returns the stored conversations (browser worker)"""
+    print("🌐 Fetching fresh data from LinkedIn...")
+    # Ensure conversations directory exists
+    if not ensure_conversations_directory():
+        raise RuntimeError("Could not create conversations directory")
+    
+    authenticator = ensure_authenticator()
+    print("✅ Authenticator ready, starting LinkedIn fetch...")
+    fetcher = get_fetcher(authenticator.driver)
+    sync_conversations(fetcher, unread_only=unread_only, limit=50)
+    conversations = load_individual_conversations()
+    
+    if conversations:
+        conversations = conversation_cache.replace(conversations, fetched_at=now)
+        print(f"✅ Fresh data loaded: {len(conversations)} conversations")
+    return conversations
+
 @app.route('/api/messages/background', methods=['GET'])
 def get_messages_background():
     """Background endpoint to fetch new/unread conversations without blocking the UI"""
@@ -423,100 +634,60 @@ def get_messages_background():
             }), 500
         
         # Ensure authenticator is initialized
-        authenticator = ensure_authenticator()
+        authenticator = browser_worker.call(ensure_authenticator)
         print("✅ Authenticator ready, starting background LinkedIn fetch...")
-        fetcher = LinkedInMessageFetcher(authenticator.driver)
         
         # Fast path: if unread_only, do a very quick unread badge probe and exit early
         if unread_only:
             try:
-                # Ensure we're on messages page
-                if "/messaging/" not in authenticator.driver.current_url:
-                    authenticator.driver.get('https://www.linkedin.com/messaging/')
-
-                # Probe for unread indicators with a short grace period for DOM paint
-                start = time.time()
-                probe_timeout = 1.2  # seconds
-                found_unread = False
-                while time.time() - start < probe_timeout and not found_unread:
-                    # Only criterion: visible notification badges with numeric count
-                    try:
-                        badges = authenticator.driver.find_elements(
-                            By.CSS_SELECTOR,
-                            ".notification-badge.notification-badge--show .notification-badge__count"
-                        )
-                        for b in badges:
-                            txt = (b.text or '').strip()
-                            if txt.isdigit() and int(txt) > 0:
-                                found_unread = True
-                                break
-                    except Exception:
-                        pass
-                    if not found_unread:
-                        time.sleep(0.1)
+                found_unread = browser_worker.call(probe_unread_badges, authenticator.driver)
 
                 if not found_unread:
                     print("📬 Fast path: No unread badges detected; returning immediately")
-                    existing = conversation_cache['data'] if conversation_cache['data'] is not None else load_individual_conversations()
+                    existing = conversation_cache.snapshot()
+                    if existing is None:
+                        existing = load_individual_conversations()
                     return jsonify({
                         'success': True,
                         'new_count': 0,
                         'updated_count': 0,
                         'total_count': len(existing or []),
-                        'conversations': existing or []
+                        'conversations': serialize_conversations(existing or [])
                     })
             except Exception as e:
                 print(f"[WARN] Fast unread probe failed, proceeding normally: {e}")
 
-        # Get existing conversations from cache/file
-        existing_conversations = []
-        if conversation_cache['data'] is not None:
-            existing_conversations = conversation_cache['data']
-        elif os.path.exists(CONVERSATIONS_DIR):
-            existing_conversations = load_individual_conversations()
+        # Make sure the cache holds the stored conversations before merging into it
+        if not conversation_cache.is_loaded() and os.path.exists(CONVERSATIONS_DIR):
+            conversation_cache.replace(load_individual_conversations())
         
         # Use the new efficient method to fetch only new/unread conversations with configurable limit
         try:
             limit = int(request.args.get('limit', 25))
         except Exception:
             limit = 25
+        # The conversation open in the dashboard is fetched first
+        if request.args.get('open'):
+            fetch_scheduler.set_open_thread(request.args.get('open'))
         if unread_only:
             print("📬 Background: Fetching only new/unread conversations efficiently...")
-            new_conversations = fetcher.fetch_new_or_unread_conversations(limit=limit)
         else:
             print("📬 Background: Fetching only new/unread conversations efficiently (not unread_only)...")
-            new_conversations = fetcher.fetch_new_or_unread_conversations(limit=limit)
+        # Merge each conversation into the cache as soon as it is stored, one entry
+        # at a time, so updates made by other requests meanwhile are not overwritten
+        counts = {'new': 0, 'updated': 0}
         
-        # Merge new conversations with existing ones
-        merged_conversations = existing_conversations.copy()
-        new_count = 0
-        updated_count = 0
+        def merge_into_cache(item):
+            conversation = item['conversation']
+            counts['updated' if conversation_cache.get(conversation['sender_name']) is not None else 'new'] += 1
+            conversation_cache.upsert(conversation)
         
-        for new_conv in new_conversations:
-            existing_index = None
-            for i, existing_conv in enumerate(merged_conversations):
-                if existing_conv['sender_name'].lower() == new_conv['sender_name'].lower():
-                    existing_index = i
-                    break
-            
-            if existing_index is not None:
-                # Update existing conversation
-                merged_conversations[existing_index] = new_conv
-                updated_count += 1
-            else:
-                # Add new conversation
-                merged_conversations.append(new_conv)
-                new_count += 1
-        
-        # Save ONLY the changed conversations to individual files to avoid heavy I/O
-        try:
-            fetcher.save_conversations_to_individual_files(new_conversations, CONVERSATIONS_DIR)
-        except Exception as e:
-            print(f"⚠️ Error saving changed conversations: {e}")
+        # The fetcher is made on the worker: with network capture on, creating it sends CDP commands
+        browser_worker.call(run_unread_sync, limit, on_result=merge_into_cache)
+        new_count = counts['new']
+        updated_count = counts['updated']
         
-        # Update in-memory cache
-        conversation_cache['data'] = merged_conversations
-        conversation_cache['last_fetched'] = time.time()
+        merged_conversations = conversation_cache.snapshot()
         
         print(f"✅ Background fetch complete: {new_count} new, {updated_count} updated conversations")
         
@@ -525,9 +696,11 @@ def get_messages_background():
             'new_count': new_count,
             'updated_count': updated_count,
             'total_count': len(merged_conversations),
-            'conversations': merged_conversations
+            'conversations': serialize_conversations(merged_conversations)
         })
         
+    except BrowserUnavailableError:
+        raise
     except Exception as e:
         print(f"❌ Error in background fetch: {e}")
         return jsonify({
@@ -535,92 +708,182 @@ def get_messages_background():
             'error': str(e)
         }), 500
 
-@app.route('/api/conversation/<sender_name>', methods=['GET'])
-def get_single_conversation(sender_name):
+@app.route('/api/messages/stream', methods=['GET'])
+def stream_messages():
+    """Sync from LinkedIn, streaming each conversation as a JSON line as soon as it is stored.
+
+    Lines are {"event": "conversation", ...} per conversation, then one
+    {"event": "done", "stats": ...} or {"event": "error", ...}.
+    """
+    unread_only = request.args.get('unread_only', '1') == '1'
+    include_messages = request.args.get('summary_only', '0') != '1'
     try:
-        # Ensure authenticator is initialized
-        authenticator = ensure_authenticator()
-        fetcher = LinkedInMessageFetcher(authenticator.driver)
-        # Fetch all conversations to get the list and find the right one
-        all_convs = fetcher.get_conversation_list(limit=1000)
-        target_conv = None
-        for conv in all_convs:
-            if sender_name.lower() in conv['sender_name'].lower():
-                target_conv = conv
-                break
-        if not target_conv:
-            return jsonify({'error': 'Conversation not found'}), 404
-        if fetcher.open_conversation(target_conv):
-            messages = fetcher.get_conversation_messages()
-            conversation_data = {
-                'sender_name': target_conv['sender_name'],
-                'is_unread': target_conv['is_unread'],
-                'message_count': len(messages),
-                'all_messages': messages,
-                'fetch_time': time.strftime('%Y-%m-%dT%H:%M:%S')
-            }
-            # Update cache and file
-            now = time.time()
-            # Update in-memory cache
-            if conversation_cache['data'] is not None:
-                updated = False
-                for idx, conv in enumerate(conversation_cache['data']):
-                    if conv['sender_name'].lower() == sender_name.lower():
-                        conversation_cache['data'][idx] = conversation_data
-                        updated = True
-                        break
-                if not updated:
-                    conversation_cache['data'].append(conversation_data)
-            else:
-                conversation_cache['data'] = [conversation_data]
-            conversation_cache['last_fetched'] = now
-            # Update JSON file using the established individual-file schema
+        limit = int(request.args.get('limit', 25 if unread_only else 50))
+    except Exception:
+        limit = 25
+    if not ensure_conversations_directory():
+        return jsonify({'success': False, 'error': 'Could not create conversations directory'}), 500
+    
+    events = queue.Queue()
+    
+    def publish(item):
+        # The cache is updated first, so a reload during the stream already shows the conversation
+        record = conversation_cache.upsert(item['conversation'])
+        events.put({'event': 'conversation', 'mode': item['mode'], 'conversation': record.to_api(include_messages)})
+    
+    def run():
+        fetcher = get_fetcher(ensure_authenticator().driver)
+        policy = UnreadSync(fetch_scheduler) if unread_only else FullSync()
+        return run_sync(fetcher, policy, limit, on_result=publish)
+    
+    job = browser_worker.submit(run)
+    
+    def generate():
+        while True:
             try:
-                os.makedirs(CONVERSATIONS_DIR, exist_ok=True)
-                filepath = os.path.join(CONVERSATIONS_DIR, f"{_safe_filename(sender_name)}.json")
-                # If we failed to extract any messages, do not overwrite an existing file with empty data
-                if len(messages) == 0 and os.path.exists(filepath):
-                    print(f"⚠️ No messages extracted for {sender_name}, preserving existing file contents")
-                else:
-                    # Find last received (incoming) message for preview
-                    last_received = ""
-                    for msg in reversed(messages):
-                        if not msg.get('is_sent', False):
-                            last_received = msg.get('message', '')
-                            break
-                    individual_data = {
-                        'sender_name': target_conv['sender_name'],
-                        'is_unread': target_conv.get('is_unread', False),
-                        'conversation_preview': (last_received[:100] + "...") if len(last_received) > 100 else last_received,
-                        'total_messages': len(messages),
-                        'messages': [
-                            {
-                                'is_sent': m.get('is_sent', False),
-                                'message': m.get('message', ''),
-                                'timestamp': m.get('timestamp', '')
-                            }
-                            for m in messages
-                        ],
-                        'fetch_time': conversation_data.get('fetch_time', time.strftime('%Y-%m-%dT%H:%M:%S')),
-                        'last_received_message': last_received
-                    }
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        json.dump(individual_data, f, indent=2, ensure_ascii=False)
-            except Exception as e:
-                print(f"⚠️ Could not write individual conversation file for {sender_name}: {e}")
-            return jsonify(conversation_data)
+                yield app.json.dumps(events.get(timeout=0.5)) + "\n"
+            except queue.Empty:
+                if job.done():
+                    break
+        # Anything published just before the job finished
+        while not events.empty():
+            yield app.json.dumps(events.get_nowait()) + "\n"
+        try:
+            yield app.json.dumps({'event': 'done', 'stats': job.result()}) + "\n"
+        except Exception as e:
+            print(f"❌ Error in streamed fetch: {e}")
+            yield app.json.dumps({'event': 'error', 'error': str(e)}) + "\n"
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def scrape_single_conversation(sender_name):
+    """Find a conversation in the sidebar and scrape its messages (runs on the browser worker)"""
+    # Ensure authenticator is initialized
+    authenticator = ensure_authenticator()
+    fetcher = get_fetcher(authenticator.driver)
+    # Fetch all conversations to get the list and find the right one
+    all_convs = fetcher.get_conversation_list(limit=1000)
+    target_conv = None
+    for conv in all_convs:
+        if sender_name.lower() in conv['sender_name'].lower():
+            target_conv = conv
+            break
+    if not target_conv:
+        return None, None
+    if not fetcher.open_conversation(target_conv):
+        return target_conv, None
+    return target_conv, fetcher.get_conversation_messages()
+
+def refresh_single_conversation(sender_name):
+    """Scrape one conversation into the cache and its file (browser worker)"""
+    target_conv, messages = scrape_single_conversation(sender_name)
+    if not target_conv:
+        raise LookupError('Conversation not found')
+    if messages is None:
+        raise RuntimeError('Failed to open conversation')
+    conversation_data = {
+        'sender_name': target_conv['sender_name'],
+        'is_unread': target_conv['is_unread'],
+        'message_count': len(messages),
+        'all_messages': messages,
+        'fetch_time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'thread_url': target_conv.get('thread_url')
+    }
+    # Update in-memory cache
+    conversation_cache.upsert(conversation_data)
+    # Update JSON file using the established individual-file schema
+    try:
+        # If we failed to extract any messages, do not overwrite an existing file with empty data
+        if len(messages) == 0 and conversation_store.exists(target_conv['sender_name']):
+            print(f"⚠️ No messages extracted for {sender_name}, preserving existing file contents")
         else:
-            return jsonify({'error': 'Failed to open conversation'}), 500
+            conversation_store.write(conversation_data)
+    except Exception as e:
+        print(f"⚠️ Could not write individual conversation file for {sender_name}: {e}")
+    return conversation_data
+
+@app.route('/api/conversation/<sender_name>', methods=['GET'])
+def get_single_conversation(sender_name):
+    if wants_async():
+        return job_accepted(browser_jobs.submit('conversation', refresh_single_conversation, sender_name))
+    try:
+        return jsonify(browser_worker.call(refresh_single_conversation, sender_name))
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except BrowserUnavailableError:
+        raise
     except Exception as e:
         print(f"Error fetching single conversation: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/conversation/<sender_name>/messages', methods=['GET'])
+def get_conversation_messages(sender_name):
+    """Message bodies of one stored conversation, served from the message cache"""
+    record = conversation_cache.get(sender_name)
+    if record is None:
+        data = conversation_store.read(sender_name)
+        if data is None:
+            return jsonify({'error': f'No stored conversation with {sender_name}'}), 404
+        record = ConversationRecord.from_file(data)
+    return jsonify(record.to_api())
+
 @app.route('/api/templates', methods=['GET'])
 def get_templates():
     handler = CSVHandler()
     templates = handler.load_templates()
     return jsonify(templates)
 
+@app.route('/api/contacts/<path:sender_name>', methods=['GET'])
+def get_contact(sender_name):
+    """Parsed name of a contact as used in replies"""
+    return jsonify(get_directory().lookup(sender_name))
+
+@app.route('/api/contacts/<path:sender_name>', methods=['PUT'])
+def set_contact(sender_name):
+    """Correct a contact's first and/or last name; the correction is kept across restarts"""
+    data = request.get_json() or {}
+    if data.get('first_name') is None and data.get('last_name') is None:
+        return jsonify({'error': 'first_name or last_name is required'}), 400
+    contact = get_directory().set_override(sender_name, data.get('first_name'), data.get('last_name'))
+    # The pending reply in the index was personalized with the old name
+    stored = conversation_store.read(sender_name)
+    if stored is not None:
+        conversation_index.update(stored)
+    return jsonify(contact)
+
+@app.route('/api/contacts/<path:sender_name>', methods=['DELETE'])
+def reset_contact(sender_name):
+    """Drop a name correction and go back to the parsed name"""
+    removed = get_directory().remove_override(sender_name)
+    stored = conversation_store.read(sender_name)
+    if removed and stored is not None:
+        conversation_index.update(stored)
+    return jsonify({'success': removed, 'contact': get_directory().lookup(sender_name)})
+
+@app.route('/api/awaiting_reply', methods=['GET'])
+def get_awaiting_reply():
+    """Conversations awaiting a reply, grouped by category, served from the index"""
+    try:
+        hr_name = request.args.get('hr_name')
+        categories = [c for c in request.args.get('category', '').split(',') if c]
+
+        # The index is refreshed when buffered writes reach the store
+        conversation_store.flush()
+
+        # Bootstrap the index once from the stored conversations
+        if not conversation_index.exists():
+            conversation_index.rebuild(load_individual_conversations())
+
+        grouped = conversation_index.awaiting_reply(hr_name=hr_name, categories=categories or None)
+        return jsonify({
+            'total': sum(len(items) for items in grouped.values()),
+            'counts': {category: len(items) for category, items in grouped.items()},
+            'categories': grouped
+        })
+    except Exception as e:
+        print(f"Error reading awaiting-reply index: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/preview_response', methods=['POST'])
 def preview_response():
     """Preview a categorized response for a message with custom HR name"""
@@ -629,30 +892,36 @@ def preview_response():
         message_text = data.get('message', '')
         sender_name = data.get('sender_name', 'Test User')
         hr_name = data.get('hr_name', 'HR Team')
+        template = data.get('template')
         
-        if not message_text.strip():
+        if not message_text.strip() and not template:
             return jsonify({'error': 'Message text is required'}), 400
         
         # Initialize categorizer
-        from src.message_categorizer import MessageCategorizer
         categorizer = MessageCategorizer()
         
-        # Categorize the message
-        categorization = categorizer.categorize_message(message_text)
+        # Categorize the message, unless a specific template is being previewed
+        if template:
+            categorization = {'category': None, 'matched_keyword': None, 'template': template}
+        else:
+            categorization = categorizer.categorize_message(message_text)
         
-        # Extract first name
-        first_name = categorizer.extract_first_name(sender_name)
+        values = {
+            **name_values(sender_name),
+            'hrName': hr_name,
+            'company': data.get('company'),
+            'role': data.get('role'),
+            'recruiterEmail': data.get('recruiter_email')
+        }
+        first_name = values['firstName']
         
         # Personalize response if category found
         personalized_response = None
+        missing_value = None
         if categorization['template']:
-            personalized_response = categorizer.personalize_response(
-                categorization['template'],
-                {
-                    'firstName': first_name,
-                    'hrName': hr_name
-                }
-            )
+            personalized_response = categorizer.personalize_response(categorization['template'], values)
+            if personalized_response is None:
+                missing_value = categorizer.missing_value(categorization['template'], values)
         
         return jsonify({
             'sender_name': sender_name,
@@ -662,13 +931,83 @@ def preview_response():
             'category': categorization['category'],
             'matched_keyword': categorization['matched_keyword'],
             'response_template': categorization['template'],
-            'personalized_response': personalized_response
+            'personalized_response': personalized_response,
+            'missing_value': missing_value
         })
         
     except Exception as e:
         print(f"Error in preview_response: {e}")
         return jsonify({'error': str(e)}), 500
 
+def record_sent_message(sender_name, message):
+    """Append a sent message to the cached and stored conversation without re-fetching"""
+    now_iso = datetime.now().isoformat()
+
+    # The stored file keeps fields the cache does not hold (thread url and id,
+    # sidebar fingerprint, message ids), so the sent message is appended to it as is
+    file_data = None
+    try:
+        file_data = conversation_store.read(sender_name)
+    except Exception as e:
+        print(f"[WARN] Could not read existing individual file for {sender_name}: {e}")
+
+    # Start from existing conversation (cache or file) if available
+    existing_conv = conversation_cache.get(sender_name)
+    if existing_conv is None and file_data is not None:
+        existing_conv = ConversationRecord.from_file(file_data)
+
+    # Build updated conversation
+    if existing_conv is None:
+        existing_conv = {
+            'sender_name': sender_name,
+            'is_unread': False,
+            'message_count': 0,
+            'all_messages': [],
+            'fetch_time': now_iso
+        }
+
+    sent_msg = {
+        'is_sent': True,
+        'message': message,
+        'timestamp': now_iso,
+        'message_index': len(existing_conv.get('all_messages') or [])
+    }
+    all_messages = list(existing_conv.get('all_messages') or []) + [sent_msg]
+
+    updated_conv = ConversationRecord.from_api({
+        'sender_name': existing_conv.get('sender_name') or sender_name,
+        'is_unread': existing_conv.get('is_unread', False),
+        'all_messages': all_messages,
+        'message_count': len(all_messages),
+        'fetch_time': now_iso,
+        'last_received_message': existing_conv.get('last_received_message'),
+        'unread_count': existing_conv.get('unread_count'),
+        'index': existing_conv.get('index')
+    })
+
+    # Update cache entry or append
+    try:
+        conversation_cache.upsert(updated_conv)
+    except Exception as e:
+        print(f"[WARN] Could not update cache after send: {e}")
+
+    # Write individual file in established schema (best-effort)
+    try:
+        if file_data is not None:
+            messages = list(file_data.get('messages', []))
+            messages.append({'is_sent': True, 'message': message, 'timestamp': now_iso})
+            conversation_store.write({**file_data, 'messages': messages, 'total_messages': len(messages), 'fetch_time': now_iso})
+        else:
+            conversation_store.write(updated_conv)
+    except Exception as e:
+        print(f"[WARN] Could not persist individual file after send: {e}")
+
+    return updated_conv
+
+def send_linkedin_message(sender_name, message):
+    """Send a message through the responder (runs on the browser worker)"""
+    return get_responder().send_response(sender_name, message)
+
 @app.route('/api/send_message', methods=['POST'])
 def send_message():
     data = request.get_json()
@@ -677,171 +1016,142 @@ def send_message():
     if not sender_name or not message:
         return jsonify({'success': False, 'error': 'Missing sender_name or message'}), 400
     try:
-        responder = get_responder()
-        success = responder.send_response(sender_name, message)
+        success = browser_worker.call(send_linkedin_message, sender_name, message)
 
         # Optimistic, fast return: update cache and file without a slow re-fetch
-        now_iso = datetime.now().isoformat()
-
-        # Start from existing conversation (cache or file) if available
-        existing_conv = None
-        if conversation_cache['data'] is not None:
-            for conv in conversation_cache['data']:
-                if conv.get('sender_name', '').lower() == sender_name.lower():
-                    existing_conv = conv
-                    break
+        updated_conv = record_sent_message(sender_name, message)
 
-        # If not in cache, try to read individual file
-        if existing_conv is None:
-            try:
-                filepath = os.path.join(CONVERSATIONS_DIR, f"{_safe_filename(sender_name)}.json")
-                if os.path.exists(filepath):
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        file_data = json.load(f)
-                    # Convert individual file schema to API shape
-                    existing_conv = {
-                        'sender_name': file_data.get('sender_name', sender_name),
-                        'is_unread': file_data.get('is_unread', False),
-                        'message_count': file_data.get('total_messages', 0),
-                        'all_messages': file_data.get('messages', []),
-                        'fetch_time': file_data.get('fetch_time', now_iso)
-                    }
-            except Exception as e:
-                print(f"[WARN] Could not read existing individual file for {sender_name}: {e}")
-
-        # Build updated conversation
-        if existing_conv is None:
-            existing_conv = {
-                'sender_name': sender_name,
-                'is_unread': False,
-                'message_count': 0,
-                'all_messages': [],
-                'fetch_time': now_iso
-            }
-
-        sent_msg = {
-            'is_sent': True,
-            'message': message,
-            'timestamp': now_iso,
-            'message_index': len(existing_conv.get('all_messages', []))
-        }
-        all_messages = existing_conv.get('all_messages', []) + [sent_msg]
-
-        updated_conv = {
-            **existing_conv,
-            'all_messages': all_messages,
-            'message_count': len(all_messages),
-            'fetch_time': now_iso
-        }
+        return jsonify({'success': success, 'conversation': updated_conv})
+    except BrowserUnavailableError:
+        raise
+    except Exception as e:
+        print(f"Error sending message: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
 
-        # Update cache entry in-place or append
+def acknowledge_reads(sender_names):
+    """Open each conversation once so LinkedIn marks it read; returns {name: badge cleared} (browser worker)"""
+    authenticator = ensure_authenticator()
+    fetcher = get_fetcher(authenticator.driver)
+    results = {}
+    for sender_name in sender_names:
         try:
-            if conversation_cache['data'] is None:
-                conversation_cache['data'] = [updated_conv]
+            thread_url = conversation_index.thread_url(sender_name)
+            if thread_url:
+                opened = fetcher.open_thread_url(thread_url)
             else:
-                replaced = False
-                for i, conv in enumerate(conversation_cache['data']):
-                    if conv.get('sender_name', '').lower() == sender_name.lower():
-                        conversation_cache['data'][i] = updated_conv
-                        replaced = True
-                        break
-                if not replaced:
-                    conversation_cache['data'].append(updated_conv)
-            conversation_cache['last_fetched'] = time.time()
+                # Thread URL not known yet: click its sidebar entry instead
+                element = fetcher.find_conversation_element(sender_name) if fetcher.navigate_to_messages() else None
+                opened = element is not None and fetcher.open_conversation({'sender_name': sender_name, 'element': element})
+            results[sender_name] = opened and fetcher.is_marked_read(sender_name)
+            if not results[sender_name]:
+                print(f"[WARN] LinkedIn still shows {sender_name} as unread")
         except Exception as e:
-            print(f"[WARN] Could not update cache after send: {e}")
+            print(f"[WARN] Could not acknowledge {sender_name} as read: {e}")
+            results[sender_name] = False
+    return results
 
-        # Write individual file in established schema (best-effort)
-        try:
-            os.makedirs(CONVERSATIONS_DIR, exist_ok=True)
-            last_received = ""
-            for msg in reversed(all_messages):
-                if not msg.get('is_sent', False):
-                    last_received = msg.get('message', '')
-                    break
-            individual_data = {
-                'sender_name': updated_conv['sender_name'],
-                'is_unread': updated_conv.get('is_unread', False),
-                'conversation_preview': (last_received[:100] + "...") if len(last_received) > 100 else last_received,
-                'total_messages': len(all_messages),
-                'messages': [
-                    {
-                        'is_sent': m.get('is_sent', False),
-                        'message': m.get('message', ''),
-                        'timestamp': m.get('timestamp', '')
-                    } for m in all_messages
-                ],
-                'fetch_time': now_iso,
-                'last_received_message': last_received
-            }
-            with open(os.path.join(CONVERSATIONS_DIR, f"{_safe_filename(sender_name)}.json"), 'w', encoding='utf-8') as f:
-                json.dump(individual_data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"[WARN] Could not persist individual file after send: {e}")
-
-        return jsonify({'success': success, 'conversation': updated_conv})
-    except Exception as e:
-        print(f"Error sending message: {e}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+# LinkedIn-side read acknowledgements, batched into background browser passes
+read_receipts = ReadReceiptQueue(browser_worker, acknowledge_reads)
 
 @app.route('/api/mark_read/<sender_name>', methods=['POST'])
 def mark_conversation_read(sender_name):
-    """Mark a conversation as read (and trigger LinkedIn UI switch)"""
+    """Mark a conversation as read locally now; LinkedIn is told in the background"""
+    # The dashboard marks a conversation read when the user opens it
+    fetch_scheduler.set_open_thread(sender_name)
     try:
-        # --- NEW: Switch to another conversation, then to the target one in Selenium ---
-        try:
-            authenticator = ensure_authenticator()
-            if authenticator and hasattr(authenticator, 'driver') and authenticator.driver:
-                fetcher = LinkedInMessageFetcher(authenticator.driver)
-                if fetcher.navigate_to_messages():
-                    conversations = fetcher.get_conversation_list(limit=10)
-                    # Find the target and another conversation
-                    target_conv = None
-                    other_conv = None
-                    for conv in conversations:
-                        if conv['sender_name'].lower() == sender_name.lower():
-                            target_conv = conv
-                        elif not other_conv:
-                            other_conv = conv
-                    # Switch to another conversation first (if available and not the same)
-                    if other_conv and other_conv['sender_name'].lower() != sender_name.lower():
-                        fetcher.open_conversation(other_conv)
-                        time.sleep(1)
-                    # Now switch to the target conversation
-                    if target_conv:
-                        fetcher.open_conversation(target_conv)
-                        time.sleep(2)
-                        print(f"✓ Switched to {sender_name} in Selenium to mark as read")
-        except Exception as e:
-            print(f"[WARN] Selenium mark-read switch failed: {e}")
-        # --- END NEW ---
-
         # Update the cache to mark conversation as read
-        if conversation_cache['data'] is not None:
-            for conv in conversation_cache['data']:
-                if conv['sender_name'].lower() == sender_name.lower():
-                    conv['is_unread'] = False
-                    conv['unread_count'] = 0
-                    print(f"📬 Marked conversation with {sender_name} as read")
-                    break
+        if conversation_cache.update(sender_name, {'is_unread': False, 'unread_count': 0}) is not None:
+            print(f"📬 Marked conversation with {sender_name} as read")
         # Update the individual JSON file to mark as read using the same schema
         try:
-            filepath = os.path.join(CONVERSATIONS_DIR, f"{_safe_filename(sender_name)}.json")
-            if os.path.exists(filepath):
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    individual_data = json.load(f)
-                # Ensure boolean field is consistent
-                individual_data['is_unread'] = False
-                # Write back preserving the established schema
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(individual_data, f, indent=2, ensure_ascii=False)
+            # Ensure boolean field is consistent, preserving the established schema
+            conversation_store.update(sender_name, {'is_unread': False})
         except Exception as e:
             print(f"[WARN] Could not update individual file for mark_read: {e}")
-        return jsonify({'success': True, 'message': f'Marked {sender_name} as read'})
+        queued = read_receipts.add(sender_name)
+        return jsonify({'success': True, 'message': f'Marked {sender_name} as read', 'linkedin_ack_queued': queued})
     except Exception as e:
         print(f"Error marking conversation as read: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/mark_read_by_switch', methods=['POST'])
+def mark_conversation_read_by_switch():
+    """Mark-read with the sender name in the JSON body (used by the dashboard)"""
+    sender_name = (request.get_json(silent=True) or {}).get('sender_name')
+    if not sender_name:
+        return jsonify({'success': False, 'error': 'sender_name is required'}), 400
+    return mark_conversation_read(sender_name)
+
+def sync_cancelled():
+    return not sync_progress['active']
+
+def start_sync_progress(limit, policy_name):
+    """Claim /api/sync_progress for a new sync; False if one is already running"""
+    with sync_progress_lock:
+        if sync_progress['active']:
+            return False
+        sync_progress['active'] = True
+    sync_progress.update({
+        'active': True,
+        'current': 0,
+        'total': limit,
+        'current_conversation': 'Initializing...',
+        # Start with existing: the same records the cache holds, not a second copy
+        'conversations': list(conversation_cache.snapshot() or load_individual_conversations()),
+        'skipped': 0,
+        'incremental': 0,
+        'full': 0,
+        'policy': policy_name,
+        'start_time': time.time()
+    })
+    return True
+
+def report_sync_position(position, total, preview):
+    sync_progress.update({
+        'current': position,
+        'total': total,
+        'current_conversation': f"Processing: {preview['sender_name']}"
+    })
+
+def publish_sync_result(item):
+    """Show a finished conversation in /api/sync_progress (merged with the existing ones)"""
+    sync_progress['conversations'] = replace_or_append(sync_progress['conversations'], item['conversation'])
+    sync_progress[item['mode']] += 1
+
+def run_full_sync(limit):
+    """Fetch all conversations and update individual JSON files (runs on the browser worker)"""
+    try:
+        # Ensure authenticator is initialized
+        authenticator = ensure_authenticator()
+        print("✅ Authenticator ready, starting full LinkedIn sync...")
+        fetcher = get_fetcher(authenticator.driver)
+        
+        print(f"📥 Fetching all conversations (limit: {limit})...")
+        stats = run_sync(fetcher, FullSync(), limit, cancel_check=sync_cancelled,
+                         on_progress=report_sync_position, on_result=publish_sync_result)
+        
+        # Complete the sync
+        final_conversations = conversation_cache.replace(load_individual_conversations())
+        sync_progress.update({
+            'current_conversation': stats.get('error') or f"Completed! Processed {stats['saved']} conversations",
+            'conversations': final_conversations
+        })
+    finally:
+        sync_progress['active'] = False
+    
+    sync_result = {
+        'success': stats['state'] != 'failed',
+        'message': stats.get('error') or f'Full sync {stats["state"]}',
+        'total_processed': stats['saved'],
+        'total_conversations': len(final_conversations),
+        'conversations': final_conversations,
+        'stats': stats,
+        'sync_time': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+    
+    print(f"✅ Full sync {stats['state']}: {stats['saved']} conversations processed, {len(final_conversations)} total conversations")
+    return sync_result
+
 @app.route('/api/full_sync', methods=['POST'])
 def full_sync():
     """Full sync: fetch ALL conversations and update individual JSON files"""
@@ -860,121 +1170,22 @@ def full_sync():
                 'message': 'Directory creation failed'
             }), 500
         
-        # Ensure authenticator is initialized
-        authenticator = ensure_authenticator()
-        print("✅ Authenticator ready, starting full LinkedIn sync...")
-        fetcher = LinkedInMessageFetcher(authenticator.driver)
-        
-        processing_order = []
-        # Fetch all conversations and save to individual files
-        print(f"📥 Fetching all conversations (limit: {limit})...")
-        saved_files = []
-        for conv in fetcher.get_conversation_list(limit=limit):
-            if not sync_progress['active']:  # Check if cancelled
-                break
-                
-            sync_progress.update({
-                'current': len(processing_order) + 1,
-                'current_conversation': f"Processing: {conv['sender_name']}"
-            })
-            
-            print(f"\n📥 Processing conversation {len(processing_order) + 1}/{limit}: {conv['sender_name']}")
-            
-            if fetcher.open_conversation(conv):
-                messages = fetcher.get_conversation_messages()
-                
-                if messages:
-                    # Find last received message
-                    last_received = ""
-                    for msg in reversed(messages):
-                        if not msg.get('is_sent', False):
-                            last_received = msg.get('message', '')
-                            break
-                    
-                    conversation_data = {
-                        'sender_name': conv['sender_name'],
-                        'is_unread': conv['is_unread'],
-                        'message_count': len(messages),
-                        'all_messages': messages,
-                        'fetch_time': datetime.now().isoformat(),
-                        'last_received_message': last_received
-                    }
-                    
-                    # Save individual file immediately
-                    try:
-                        filename = fetcher._safe_filename(conv['sender_name']) + ".json"
-                        filepath = os.path.join(CONVERSATIONS_DIR, filename)
-                        
-                        individual_data = {
-                            'sender_name': conv['sender_name'],
-                            'is_unread': conv.get('is_unread', False),
-                            'conversation_preview': last_received[:100] + "..." if len(last_received) > 100 else last_received,
-                            'total_messages': len(messages),
-                            'messages': [{'is_sent': m.get('is_sent', False), 'message': m.get('message', ''), 'timestamp': m.get('timestamp', '')} for m in messages],
-                            'fetch_time': conversation_data['fetch_time'],
-                            'last_received_message': last_received
-                        }
-                        
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            json.dump(individual_data, f, indent=2, ensure_ascii=False)
-                        
-                        print(f"✅ Saved {conv['sender_name']}: {len(messages)} messages")
-                        
-                        # Add to processed list and update progress
-                        processed_conversations.append(conversation_data)
-                        
-                        # Update conversations in progress (merge with existing)
-                        existing_conversations = sync_progress['conversations'].copy()
-                        
-                        # Find and update existing conversation or add new one
-                        updated = False
-                        for i, existing_conv in enumerate(existing_conversations):
-                            if existing_conv['sender_name'].lower() == conv['sender_name'].lower():
-                                existing_conversations[i] = conversation_data
-                                updated = True
-                                break
-                        
-                        if not updated:
-                            existing_conversations.append(conversation_data)
-                        
-                        sync_progress['conversations'] = existing_conversations
-                        
-                        # Add to processing order
-                        processing_order.append(conv['sender_name'])
-                        
-                    except Exception as e:
-                        print(f"❌ Error saving {conv['sender_name']}: {str(e)}")
-                        continue
-                
-                time.sleep(1)  # Small delay between conversations
-        
-        # Complete the sync
-        final_conversations = load_individual_conversations()
-        
-        # Update in-memory cache
-        conversation_cache['data'] = final_conversations
-        conversation_cache['last_fetched'] = time.time()
-        
-        sync_result = {
-            'success': True,
-            'message': f'Full sync completed successfully',
-            'total_processed': len(saved_files),
-            'total_conversations': len(final_conversations),
-            'conversations': final_conversations,
-            'sync_time': time.strftime('%Y-%m-%dT%H:%M:%S')
-        }
+        # Shares /api/sync_progress and /api/sync_cancel with the progressive sync
+        if not start_sync_progress(limit, FullSync.name):
+            return jsonify({
+                'success': False,
+                'error': 'Sync already in progress',
+                'message': 'Another sync operation is currently running'
+            }), 409
         
-        print(f"✅ Full sync complete: {len(saved_files)} conversations processed, {len(final_conversations)} total conversations")
-        # After saving all conversations, save the processing order
-        try:
-            with open(ORDER_FILE, 'w', encoding='utf-8') as f:
-                json.dump(processing_order, f, ensure_ascii=False, indent=2)
-            print(f"🔢 Saved processing order to _order.json: {processing_order}")
-        except Exception as e:
-            print(f"⚠️ Could not save _order.json: {e}")
+        sync_result = browser_worker.call(run_full_sync, limit)
         return jsonify(sync_result)
         
+    except BrowserUnavailableError:
+        sync_progress['active'] = False
+        raise
     except Exception as e:
+        sync_progress['active'] = False
         print(f"❌ Error in full sync: {str(e)}")
         import traceback
         traceback.print_exc()
@@ -990,30 +1201,32 @@ def full_sync_progressive():
     """Start progressive full sync that can be monitored via /api/sync_progress"""
     global sync_progress
     
+    claimed = False
     try:
-        # Check if sync is already running
-        if sync_progress['active']:
-            return jsonify({
-                'success': False,
-                'error': 'Sync already in progress',
-                'message': 'Another sync operation is currently running'
-            }), 409
-        
         # Get parameters
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         limit = data.get('limit', 100)
+        resume = str(data.get('resume', request.args.get('resume', 'false'))).lower() in ('1', 'true')
+        
+        # Resume the last interrupted sync from its checkpoint instead of starting over
+        if resume:
+            checkpoint = SyncCheckpoint()
+            if checkpoint.resumable():
+                limit = checkpoint.data.get('limit', limit)
+                print(f"⏯️ Resuming progressive sync: {len(checkpoint.data['completed'])} conversations already done")
+            else:
+                resume = False
         
         print(f"🔄 Starting progressive full sync for up to {limit} conversations...")
         
-        # Initialize progress tracking
-        sync_progress.update({
-            'active': True,
-            'current': 0,
-            'total': limit,
-            'current_conversation': 'Initializing...',
-            'conversations': load_individual_conversations(),  # Start with existing
-            'start_time': time.time()
-        })
+        # Initialize progress tracking; only one sync may hold it
+        claimed = start_sync_progress(limit, IncrementalSync.name)
+        if not claimed:
+            return jsonify({
+                'success': False,
+                'error': 'Sync already in progress',
+                'message': 'Another sync operation is currently running'
+            }), 409
         
         # Ensure conversations directory exists
         if not ensure_conversations_directory():
@@ -1024,20 +1237,23 @@ def full_sync_progressive():
                 'message': 'Directory creation failed'
             }), 500
         
-        # Start sync in background thread
-        import threading
-        sync_thread = threading.Thread(target=run_progressive_sync, args=(limit,))
-        sync_thread.daemon = True
-        sync_thread.start()
+        # Run sync in background on the browser worker
+        browser_worker.submit(run_progressive_sync, limit, resume)
         
         return jsonify({
             'success': True,
-            'message': 'Progressive sync started',
+            'message': 'Progressive sync resumed' if resume else 'Progressive sync started',
+            'resumed': resume,
             'progress_endpoint': '/api/sync_progress'
         })
         
+    except BrowserUnavailableError:
+        if claimed:
+            sync_progress['active'] = False
+        raise
     except Exception as e:
-        sync_progress['active'] = False
+        if claimed:
+            sync_progress['active'] = False
         print(f"❌ Error starting progressive sync: {str(e)}")
         return jsonify({
             'success': False,
@@ -1045,187 +1261,43 @@ def full_sync_progressive():
             'message': 'Failed to start progressive sync'
         }), 500
 
-def run_progressive_sync(limit):
-    """Run the progressive sync in background"""
+def run_progressive_sync(limit, resume=False):
+    """Run the progressive sync in background, checkpointing after every conversation"""
     global sync_progress
     
     try:
         # Ensure authenticator is initialized
         authenticator = ensure_authenticator()
         print("✅ Authenticator ready, starting progressive LinkedIn sync...")
-        fetcher = LinkedInMessageFetcher(authenticator.driver)
-        
-        # Navigate to messages
-        if not fetcher.navigate_to_messages():
-            sync_progress.update({
-                'active': False,
-                'current_conversation': 'Failed to navigate to messages'
-            })
-            return
+        fetcher = get_fetcher(authenticator.driver)
         
-        # Get conversation list
         sync_progress['current_conversation'] = 'Fetching conversation list...'
-        conversations_list = fetcher.get_conversation_list(limit=limit)
-        sync_progress['total'] = len(conversations_list)
+        # Unchanged threads are skipped, changed ones read from their last stored message
+        stats = run_sync(fetcher, IncrementalSync(), limit, resume=resume, checkpoint=SyncCheckpoint(),
+                         cancel_check=sync_cancelled, on_progress=report_sync_position, on_result=publish_sync_result)
         
-        if not conversations_list:
+        if stats.get('error') or not stats['listed']:
             sync_progress.update({
                 'active': False,
-                'current_conversation': 'No conversations found'
+                'current_conversation': stats.get('error') or 'No conversations found'
             })
             return
         
-        print(f"📥 Processing {len(conversations_list)} conversations progressively...")
-        
-        processed_conversations = []
-        processing_order = []
-        
-        for conv_index, conv in enumerate(conversations_list):
-            if not sync_progress['active']:  # Check if cancelled
-                break
-                
-            sync_progress.update({
-                'current': conv_index + 1,
-                'current_conversation': f"Processing: {conv['sender_name']}"
-            })
-            
-            # Check if conversation already exists and is read - skip if so
-            filename = fetcher._safe_filename(conv['sender_name']) + ".json"
-            filepath = os.path.join(CONVERSATIONS_DIR, filename)
-            
-            should_skip = False
-            if os.path.exists(filepath):
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                    # Skip if conversation is read (not unread)
-                    if not existing_data.get('is_unread', False) and not conv.get('is_unread', False):
-                        print(f"⏭️ Skipping conversation {conv_index + 1}/{len(conversations_list)}: {conv['sender_name']} (already saved and read)")
-                        
-                        # Still add to processing order
-                        processing_order.append(conv['sender_name'])
-                        
-                        # Add existing conversation to progress (convert to API format)
-                        conversation_data = {
-                            'sender_name': existing_data.get('sender_name', ''),
-                            'is_unread': existing_data.get('is_unread', False),
-                            'message_count': existing_data.get('total_messages', 0),
-                            'all_messages': existing_data.get('messages', []),
-                            'fetch_time': existing_data.get('fetch_time', ''),
-                            'last_received_message': existing_data.get('last_received_message', ''),
-                            'index': conv_index
-                        }
-                        
-                        # Update sync progress with existing conversation
-                        existing_conversations = sync_progress['conversations'].copy()
-                        updated = False
-                        for i, existing_conv in enumerate(existing_conversations):
-                            if existing_conv['sender_name'].lower() == conv['sender_name'].lower():
-                                existing_conversations[i] = conversation_data
-                                updated = True
-                                break
-                        if not updated:
-                            existing_conversations.append(conversation_data)
-                        sync_progress['conversations'] = existing_conversations
-                        
-                        should_skip = True
-                except Exception as e:
-                    print(f"⚠️ Could not read existing file for {conv['sender_name']}: {e}")
-            
-            if should_skip:
-                continue
-            
-            print(f"\n📥 Processing conversation {conv_index + 1}/{len(conversations_list)}: {conv['sender_name']}")
-            
-            if fetcher.open_conversation(conv):
-                messages = fetcher.get_conversation_messages()
-                
-                if messages:
-                    # Find last received message
-                    last_received = ""
-                    for msg in reversed(messages):
-                        if not msg.get('is_sent', False):
-                            last_received = msg.get('message', '')
-                            break
-                    
-                    conversation_data = {
-                        'sender_name': conv['sender_name'],
-                        'is_unread': conv['is_unread'],
-                        'message_count': len(messages),
-                        'all_messages': messages,
-                        'fetch_time': datetime.now().isoformat(),
-                        'last_received_message': last_received
-                    }
-                    
-                    # Save individual file immediately
-                    try:
-                        filename = fetcher._safe_filename(conv['sender_name']) + ".json"
-                        filepath = os.path.join(CONVERSATIONS_DIR, filename)
-                        
-                        individual_data = {
-                            'sender_name': conv['sender_name'],
-                            'is_unread': conv.get('is_unread', False),
-                            'conversation_preview': last_received[:100] + "..." if len(last_received) > 100 else last_received,
-                            'total_messages': len(messages),
-                            'messages': [{'is_sent': m.get('is_sent', False), 'message': m.get('message', ''), 'timestamp': m.get('timestamp', '')} for m in messages],
-                            'fetch_time': conversation_data['fetch_time'],
-                            'last_received_message': last_received
-                        }
-                        
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            json.dump(individual_data, f, indent=2, ensure_ascii=False)
-                        
-                        print(f"✅ Saved {conv['sender_name']}: {len(messages)} messages")
-                        
-                        # Add to processed list and update progress
-                        processed_conversations.append(conversation_data)
-                        
-                        # Update conversations in progress (merge with existing)
-                        existing_conversations = sync_progress['conversations'].copy()
-                        
-                        # Find and update existing conversation or add new one
-                        updated = False
-                        for i, existing_conv in enumerate(existing_conversations):
-                            if existing_conv['sender_name'].lower() == conv['sender_name'].lower():
-                                existing_conversations[i] = conversation_data
-                                updated = True
-                                break
-                        
-                        if not updated:
-                            existing_conversations.append(conversation_data)
-                        
-                        sync_progress['conversations'] = existing_conversations
-                        
-                        # Add to processing order
-                        processing_order.append(conv['sender_name'])
-                        
-                    except Exception as e:
-                        print(f"❌ Error saving {conv['sender_name']}: {str(e)}")
-                        continue
-                
-                time.sleep(1)  # Small delay between conversations
+        cancelled = stats['state'] == 'cancelled'
+        processed = stats['saved']
         
         # Complete the sync
-        final_conversations = load_individual_conversations()
-        
-        # Update in-memory cache
-        conversation_cache['data'] = final_conversations
-        conversation_cache['last_fetched'] = time.time()
+        final_conversations = conversation_cache.replace(load_individual_conversations())
         
         sync_progress.update({
             'active': False,
-            'current_conversation': f'Completed! Processed {len(processed_conversations)} conversations',
+            'current_conversation': 'Cancelled by user (resume with resume=true)' if cancelled
+                else f'Completed! Processed {processed} conversations',
             'conversations': final_conversations
         })
         
-        print(f"✅ Progressive sync complete: {len(processed_conversations)} conversations processed")
-        # After saving all conversations, save the processing order
-        try:
-            with open(ORDER_FILE, 'w', encoding='utf-8') as f:
-                json.dump(processing_order, f, ensure_ascii=False, indent=2)
-            print(f"🔢 Saved processing order to _order.json: {processing_order}")
-        except Exception as e:
-            print(f"⚠️ Could not save _order.json: {e}")
+        print(f"✅ Progressive sync {stats['state']}: {processed} conversations processed "
+              f"({stats['skipped']} unchanged, {stats['incremental']} incremental, {stats['full']} full)")
         
     except Exception as e:
         print(f"❌ Error in progressive sync: {str(e)}")
@@ -1239,13 +1311,22 @@ def get_sync_progress():
     """Get current sync progress"""
     global sync_progress
     
+    checkpoint = SyncCheckpoint()
+    checkpoint.load()
     return jsonify({
         'active': sync_progress['active'],
         'current': sync_progress['current'],
         'total': sync_progress['total'],
         'current_conversation': sync_progress['current_conversation'],
-        'conversations': sync_progress['conversations'],
+        'conversations': serialize_conversations(sync_progress['conversations']),
         'progress_percent': round((sync_progress['current'] / max(sync_progress['total'], 1)) * 100, 1) if sync_progress['total'] > 0 else 0,
+        'checkpoint': checkpoint.progress(),
+        'fetch_stats': {
+            'skipped': sync_progress['skipped'],
+            'incremental': sync_progress['incremental'],
+            'full': sync_progress['full'],
+            'stages': sync_stats.get(sync_progress['policy'], {}).get('stages')
+        },
         'elapsed_time': round(time.time() - sync_progress['start_time'], 1) if sync_progress['start_time'] else 0
     })
 
@@ -1255,55 +1336,175 @@ def cancel_sync():
     global sync_progress
     
     if sync_progress['active']:
+        # The running fetch notices this inside its scroll/extraction loops
         sync_progress['active'] = False
         sync_progress['current_conversation'] = 'Cancelled by user'
         return jsonify({'success': True, 'message': 'Sync cancelled'})
     else:
         return jsonify({'success': False, 'message': 'No active sync to cancel'})
 
+def _bulk_reply_job_from_request(data):
+    return BulkReplyJob(
+        categories=data.get('categories') or [],
+        caps=data.get('caps') or {},
+        hr_name=data.get('hr_name', 'HR Team'),
+        delay_between=data.get('delay', 3),
+        index=conversation_index,
+        on_sent=record_sent_message
+    )
+
+def run_bulk_reply(job, resume):
+    """Run a bulk reply job in background"""
+    try:
+        job.responder = get_responder()
+        job.run(resume=resume)
+    except Exception as e:
+        print(f"❌ Error in bulk reply: {str(e)}")
+        job.progress.update({
+            'state': 'failed',
+            'current_conversation': f'Error: {str(e)}'
+        })
+
+@app.route('/api/bulk_reply', methods=['POST'])
+def start_bulk_reply():
+    """Start a background bulk reply job, or return a dry-run report"""
+    try:
+        data = request.get_json() or {}
+        try:
+            job = _bulk_reply_job_from_request(data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        if data.get('dry_run', False):
+            return jsonify({'success': True, 'dry_run': True, 'report': job.dry_run()})
+
+        with bulk_reply_lock:
+            running = bulk_reply_state['job']
+            if running is not None and running.progress['state'] == 'running':
+                return jsonify({
+                    'success': False,
+                    'error': 'Bulk reply already in progress',
+                    'message': 'Another bulk reply job is currently running'
+                }), 409
+            bulk_reply_state['job'] = job
+            job.progress['state'] = 'running'
+
+        # Sends drive the browser, so the job runs on the browser worker
+        try:
+            browser_worker.submit(run_bulk_reply, job, data.get('resume', True))
+        except BrowserUnavailableError as e:
+            job.progress.update({'state': 'failed', 'current_conversation': f'Error: {str(e)}'})
+            raise
+
+        return jsonify({
+            'success': True,
+            'message': 'Bulk reply started',
+            'progress_endpoint': '/api/bulk_reply/progress'
+        })
+    except BrowserUnavailableError:
+        raise
+    except Exception as e:
+        print(f"❌ Error starting bulk reply: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/bulk_reply/progress', methods=['GET'])
+def get_bulk_reply_progress():
+    """Get progress of the current or last bulk reply job"""
+    job = bulk_reply_state['job']
+    if job is None:
+        return jsonify({'state': 'idle'})
+    return jsonify(job.progress)
+
+@app.route('/api/bulk_reply/cancel', methods=['POST'])
+def cancel_bulk_reply():
+    """Cancel the running bulk reply job after the current send"""
+    job = bulk_reply_state['job']
+    if job is not None and job.progress['state'] == 'running':
+        job.cancel()
+        return jsonify({'success': True, 'message': 'Bulk reply cancelling'})
+    return jsonify({'success': False, 'message': 'No active bulk reply to cancel'})
+
 def signal_handler(sig, frame):
     """Handle shutdown signals to save driver session"""
     print("\n🛑 Shutting down gracefully...")
     
     # Set a timeout for the entire shutdown process
-    import threading
     shutdown_timer = threading.Timer(5.0, lambda: (print("⚠️ Shutdown timeout, forcing exit"), os._exit(1)))
     shutdown_timer.start()
     
+    # Acknowledged writes first: they matter more than the browser session
+    flush_pending_writes()
+    
     try:
         # Try to save session quickly
         save_driver_session()
     except Exception as e:
         print(f"⚠️ Error during session save: {str(e)[:50]}")
     
-    # Close driver quickly
-    if authenticator and authenticator.driver:
-        try:
-            authenticator.driver.quit()
-        except Exception as e:
-            print(f"⚠️ Error closing driver: {str(e)[:50]}")
+    # Close driver quickly (Chrome itself stays up for a reattach)
+    release_browser()
     
     shutdown_timer.cancel()
     print("✅ Shutdown complete")
     sys.exit(0)
 
-# Register signal handlers
-signal.signal(signal.SIGINT, signal_handler)
-signal.signal(signal.SIGTERM, signal_handler)
+@app.errorhandler(BrowserUnavailableError)
+def browser_unavailable(e):
+    return jsonify({'success': False, 'error': str(e)}), 503
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Recent browser jobs started with ?async=1"""
+    return jsonify({'jobs': browser_jobs.list(), 'worker': browser_worker.status()})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """State of a browser job and its result once done; ?wait=N long-polls up to N seconds"""
+    try:
+        wait = min(float(request.args.get('wait', 0)), 10)
+    except ValueError:
+        wait = 0
+    browser_jobs.wait(job_id, wait)
+    job = browser_jobs.describe(job_id)
+    if job is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a browser job that has not started yet"""
+    if browser_jobs.get(job_id) is None:
+        return jsonify({'error': f'Unknown job {job_id}'}), 404
+    cancelled = browser_jobs.cancel(job_id)
+    return jsonify({'success': cancelled, 'job': browser_jobs.describe(job_id, include_result=False)})
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Service health: API is up, browser worker reports its own readiness"""
+    return jsonify({
+        'status': 'ok',
+        'uptime': round(time.time() - SERVER_START_TIME, 1),
+        'browser': browser_worker.status(),
+        'browser_session': authenticator is not None and authenticator.driver is not None,
+        'cache': conversation_cache.status(),
+        'message_cache': message_cache.stats(),
+        'fetch_scheduler': fetch_scheduler.status(),
+        'read_receipts': read_receipts.status(),
+        'browser_lifecycle': browser_lifecycle.status(),
+        'sync': sync_stats
+    })
 
 @app.route('/api/shutdown', methods=['POST'])
 def shutdown():
     """Graceful shutdown endpoint"""
+    flush_pending_writes()
+    
     try:
         save_driver_session()
     except Exception as e:
         print(f"⚠️ Error during session save: {str(e)[:50]}")
     
-    if authenticator and authenticator.driver:
-        try:
-            authenticator.driver.quit()
-        except Exception as e:
-            print(f"⚠️ Error closing driver: {str(e)[:50]}")
+    release_browser()
     
     return jsonify({'success': True, 'message': 'Shutdown initiated'})
 
@@ -1321,10 +1522,11 @@ def initialize_on_startup():
             print("✅ Logged in successfully!")
         
         # Navigate to messages page and scroll to load conversations
-        fetcher = LinkedInMessageFetcher(auth.driver)
+        fetcher = get_fetcher(auth.driver)
         
-        print("📍 Navigating to LinkedIn messages page...")
-        if fetcher.navigate_to_messages():
+        if auth.messaging_ready:
+            print("✅ Messages page already loaded in the reattached browser")
+        elif fetcher.navigate_to_messages():
             print("✅ Successfully navigated to messages")
             
             # Scroll to load conversations (minimum 3 scrolls)
@@ -1333,37 +1535,16 @@ def initialize_on_startup():
         else:
             print("⚠️ Failed to navigate to messages page")
         
-        # Check if we have existing conversations
-        existing_conversations = load_individual_conversations()
-        
-        if existing_conversations and len(existing_conversations) > 0:
-            # We have existing conversations, just fetch new/unread ones
-            print(f"📁 Found {len(existing_conversations)} existing conversations")
-            print("📬 Fetching only new/unread conversations...")
-            saved_files = fetcher.fetch_new_conversations_only(limit=50)
-            
-            if saved_files and len(saved_files) > 0:
-                print(f"✅ Fetched {len(saved_files)} new unread conversation(s)")
-            else:
-                print("📭 No new unread messages")
+        # Only new/unread conversations when some are stored, everything otherwise
+        stats = sync_conversations(fetcher, unread_only=True, limit=50)
+        if stats['saved']:
+            print(f"✅ Fetched {stats['saved']} conversation(s)")
         else:
-            # No existing conversations, do a full fetch
-            print("📥 No existing conversations found - fetching all conversations...")
-            saved_files = fetcher.fetch_and_save_to_individual_files(
-                include_read=True, 
-                limit=50, 
-                conversations_dir=CONVERSATIONS_DIR
-            )
-            
-            if saved_files and len(saved_files) > 0:
-                print(f"✅ Fetched {len(saved_files)} conversation(s)")
-            else:
-                print("📭 No conversations found")
+            print("📭 No new unread messages")
         
         # Update conversation cache after fetching
         all_conversations = load_individual_conversations()
-        conversation_cache['data'] = all_conversations
-        conversation_cache['last_fetched'] = time.time()
+        conversation_cache.replace(all_conversations)
         print(f"✅ Cache updated with {len(all_conversations)} conversation(s)")
         
         print("🎉 Initialization complete! Browser is ready.\n")
@@ -1373,10 +1554,51 @@ def initialize_on_startup():
         import traceback
         traceback.print_exc()
         print("Server will continue running. Browser will open when you click refresh.\n")
+        # Let the browser worker report the failure through /api/health
+        raise
+
+def serve(host='127.0.0.1', port=5000, threads=8, connection_limit=500):
+    """Serve the API under a multi-threaded WSGI server"""
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        print("⚠️ waitress not installed, falling back to Flask's threaded server")
+        app.run(host=host, port=port, threaded=True, use_reloader=False)
+        return
+    print(f"🌐 Serving API on http://{host}:{port} ({threads} threads)")
+    # Browser work runs on the worker thread, so request threads only ever
+    # wait on it when a client asks to; allow many idle UI connections
+    waitress_serve(app, host=host, port=port, threads=threads, connection_limit=connection_limit)
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="LinkedIn automation API server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--read-only', action='store_true',
+                        help="Serve stored conversations only; never import Selenium or open a browser")
+    args = parser.parse_args()
+
+    # Register signal handlers
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    # Name-based files from older versions move to stable ids, then
+    # writes interrupted by a crash are recovered before serving anything
+    conversation_store.migrate_legacy_files()
+    conversation_store.replay_journal()
+
+    # Serve stored conversations right away; the browser starts in the background
+    conversation_cache.replace(load_individual_conversations())
+    if args.read_only or os.getenv('LINKEDIN_READ_ONLY') == '1':
+        print("📖 Read-only mode: serving stored conversations, browser disabled")
+        browser_worker.disable("Browser is disabled in read-only mode")
+    else:
+        browser_worker.start(initializer=initialize_on_startup)
+        browser_lifecycle.start()
+
+    serve(args.host, args.port, args.threads)
 
 if __name__ == '__main__':
-    # Initialize browser on startup
-    initialize_on_startup()
-    
-    # Run the Flask app
-    app.run(debug=True, host='127.0.0.1', port=5000, use_reloader=False) 
\ No newline at end of file
+    main()
@@ -0,0 +1,147 @@
+"""Page load, memory and CPU of the full vs the lean Chrome profile.
+
+Serves a local fixture page shaped like the messaging view (a sidebar and
+thread of messages, avatar images, web fonts, a video and animated
+elements) and loads it repeatedly in a headless Chrome launched with and
+without the lean profile. For each profile it reports the load time from
+Navigation Timing, the JS heap and script/task time from CDP
+Performance.getMetrics, and the browser's resident memory (with psutil).
+Needs Chrome and chromedriver; --url loads a real page instead of the fixture.
+No results have been recorded yet: the lean profile's gains are unmeasured
+until this is run on a machine with Chrome.
+
+    python benchmarks/bench_browser_profile.py --loads 10
+"""
+import argparse
+import http.server
+import os
+import statistics
+import struct
+import sys
+import threading
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.browser_profile import apply_lean_options, apply_lean_profile
+
+def make_png(size=256):
+    """A noisy RGB image so it cannot compress away"""
+    raw = b''.join(b'\x00' + os.urandom(size * 3) for _ in range(size))
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+def make_page(conversations, messages):
+    sidebar = ''.join(
+        f'<li class="msg-conversation-listitem"><img src="/avatar{i}.png" width="48">'
+        f'<span class="truncate">Contact {i}</span><p class="msg-conversation-card__message-snippet">Hello {i}</p></li>'
+        for i in range(conversations))
+    thread = ''.join(
+        f'<li class="spin"><p class="msg-s-event-listitem__body">Message {i} about the role and the team</p></li>'
+        for i in range(messages))
+    return f"""<!doctype html><html><head><style>
+@font-face {{ font-family: Fixture; src: url(/font.woff2); }}
+body {{ font-family: Fixture, sans-serif; }}
+@keyframes spin {{ from {{ transform: rotate(0deg); }} to {{ transform: rotate(360deg); }} }}
+.spin {{ animation: spin 1s linear infinite; }}
+</style></head><body>
+<ul>{sidebar}</ul><div class="msg-s-message-list"><ul>{thread}</ul></div>
+<video src="/clip.mp4" autoplay muted loop></video>
+</body></html>""".encode()
+
+def serve_fixture(conversations, messages):
+    page = make_page(conversations, messages)
+    png = make_png()
+    blob = os.urandom(512 * 1024)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.endswith('.png'):
+                body, kind = png, 'image/png'
+            elif self.path.endswith('.woff2'):
+                body, kind = blob, 'font/woff2'
+            elif self.path.endswith('.mp4'):
+                body, kind = blob, 'video/mp4'
+            else:
+                body, kind = page, 'text/html'
+            self.send_response(200)
+            self.send_header('Content-Type', kind)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/messaging/"
+
+def browser_rss(driver):
+    try:
+        import psutil
+    except ImportError:
+        return None
+    process = psutil.Process(driver.service.process.pid)
+    return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+
+def run_profile(url, loads, lean):
+    from selenium import webdriver
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    if lean:
+        apply_lean_options(options)
+    driver = webdriver.Chrome(options=options)
+    try:
+        if lean:
+            apply_lean_profile(driver)
+        driver.execute_cdp_cmd('Performance.enable', {})
+        load_ms = []
+        for _ in range(loads):
+            driver.get(url)
+            load_ms.append(driver.execute_script(
+                "const t = performance.getEntriesByType('navigation')[0]; return t.loadEventEnd - t.startTime;"))
+        metrics = {m['name']: m['value'] for m in driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+        return {
+            'load_ms': statistics.median(load_ms),
+            'heap_mb': metrics.get('JSHeapUsedSize', 0) / 1e6,
+            'task_s': metrics.get('TaskDuration', 0),
+            'rss_mb': (browser_rss(driver) or 0) / 1e6
+        }
+    finally:
+        driver.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the full and lean browser profiles")
+    parser.add_argument('--loads', type=int, default=10)
+    parser.add_argument('--conversations', type=int, default=40)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--url', help="Load this page instead of the local fixture")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = serve_fixture(args.conversations, args.messages)
+    from selenium.common.exceptions import NoSuchDriverException
+    try:
+        results = {name: run_profile(url, args.loads, lean) for name, lean in (('full', False), ('lean', True))}
+    except NoSuchDriverException as e:
+        print(f"❌ Chrome/chromedriver not available, nothing measured: {str(e).splitlines()[0][:120]}")
+        sys.exit(1)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print(f"{args.loads} loads of {url}")
+    print(f"{'profile':8} {'load ms':>9} {'JS heap MB':>11} {'task s':>8} {'RSS MB':>8}")
+    for name, r in results.items():
+        print(f"{name:8} {r['load_ms']:9.0f} {r['heap_mb']:11.1f} {r['task_s']:8.2f} {r['rss_mb']:8.0f}")
+
+if __name__ == '__main__':
+    main()
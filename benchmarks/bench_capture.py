@@ -0,0 +1,81 @@
+"""Replay recorded messaging responses through the network capture, offline.
+
+Feeds the fixture's payloads to MessagingCapture as DevTools performance-log
+events from a stand-in driver, so drain() and the parser run exactly as they
+do against Chrome, then reports the parsed conversations and parse time.
+--scale repeats the fixture's threads under new ids for a larger mailbox.
+
+    python benchmarks/bench_capture.py --fixture benchmarks/fixtures/messaging_capture.json --scale 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.network_capture import MessagingCapture
+
+class ReplayDriver:
+    """Just enough of a WebDriver to serve recorded responses as network events"""
+
+    def __init__(self, payloads):
+        self.bodies = {}
+        self.log = []
+        for pos, payload in enumerate(payloads):
+            request_id = f"replay.{pos}"
+            self.bodies[request_id] = json.dumps(payload['body'])
+            self.log.append(self._event('Network.responseReceived', {
+                'requestId': request_id,
+                'response': {'url': payload['url'], 'mimeType': 'application/vnd.linkedin.normalized+json+2.1'}
+            }))
+            self.log.append(self._event('Network.loadingFinished', {'requestId': request_id}))
+
+    def _event(self, method, params):
+        return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Network.getResponseBody':
+            return {'body': self.bodies[params['requestId']], 'base64Encoded': False}
+        return {}
+
+    def get_log(self, kind):
+        entries, self.log = self.log, []
+        return entries
+
+def scaled(payloads, scale):
+    """The fixture repeated under distinct thread ids"""
+    text = json.dumps(payloads)
+    result = []
+    for copy in range(scale):
+        result.extend(json.loads(text.replace(',2-', f',2-{copy}x').replace('/thread/2-', f'/thread/2-{copy}x')))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured messaging responses through the parser")
+    parser.add_argument('--fixture', default=os.path.join(ROOT, 'benchmarks', 'fixtures', 'messaging_capture.json'))
+    parser.add_argument('--scale', type=int, default=1)
+    args = parser.parse_args()
+
+    with open(args.fixture, 'r', encoding='utf-8') as f:
+        payloads = scaled(json.load(f)['payloads'], args.scale)
+
+    capture = MessagingCapture(ReplayDriver(payloads))
+    capture.enable()
+    start = time.perf_counter()
+    captured = capture.drain()
+    drain_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    conversations = capture.conversations()
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    messages = sum(conv['message_count'] for conv in conversations)
+    print(f"{captured} responses captured in {drain_ms:.1f} ms")
+    print(f"{len(conversations)} conversations, {messages} messages parsed in {parse_ms:.1f} ms")
+    for conv in conversations[:5]:
+        print(f"  {conv['sender_name']}: {conv['message_count']} messages, unread={conv['unread_count']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Memory held by the conversation cache: plain dicts vs ConversationRecord.
+
+Builds the same synthetic conversations as the API dicts the cache used to
+hold, as compact records, and as summary records whose bodies sit in a
+byte-bounded MessageBodyCache, and reports the memory retained by each
+(tracemalloc), plus the cost of serializing records back to the API shape.
+
+    python benchmarks/bench_memory.py --conversations 2000 --messages 25
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.conversation_model import ConversationRecord
+from src.message_cache import MessageBodyCache
+
+WORDS = ("hello thanks position role interview salary remote team opportunity "
+         "experience availability schedule call week looking forward grazie ciao").split()
+
+def make_payload(n_conversations, n_messages):
+    """JSON text as stored on disk, so each build parses fresh strings"""
+    conversations = []
+    for i in range(n_conversations):
+        messages = [
+            {
+                'is_sent': m % 2 == 1,
+                'message': ' '.join(random.choices(WORDS, k=random.randint(5, 40))),
+                'timestamp': f"{m % 12 + 1}:{m % 60:02d} PM",
+                'message_index': m
+            }
+            for m in range(n_messages)
+        ]
+        conversations.append({
+            'sender_name': f"Contact {i % (n_conversations // 2 or 1)}",
+            'is_unread': i % 3 == 0,
+            'message_count': n_messages,
+            'all_messages': messages,
+            'fetch_time': '2024-05-01T10:00:00',
+            'last_received_message': messages[-2]['message'] if n_messages > 1 else '',
+            'index': i
+        })
+    return json.dumps(conversations)
+
+def retained(build, payload):
+    gc.collect()
+    tracemalloc.start()
+    result = build(payload)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def build_dicts(payload):
+    return json.loads(payload)
+
+def build_records(payload):
+    return [ConversationRecord.from_api(conv) for conv in json.loads(payload)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cache memory of dicts and compact records")
+    parser.add_argument('--conversations', type=int, default=2000)
+    parser.add_argument('--messages', type=int, default=25)
+    parser.add_argument('--body-cache-mb', type=float, default=2, help="Message body LRU budget")
+    args = parser.parse_args()
+
+    random.seed(7)
+    payload = make_payload(args.conversations, args.messages)
+    total_messages = args.conversations * args.messages
+
+    dicts, dict_bytes = retained(build_dicts, payload)
+    del dicts
+    records, record_bytes = retained(build_records, payload)
+
+    # Summaries resident, bodies in a bounded LRU (the server's configuration)
+    body_cache = MessageBodyCache(max_bytes=int(args.body_cache_mb * 1024 * 1024))
+    ConversationRecord.body_cache = body_cache
+    summaries, summary_bytes = retained(build_records, payload)
+    ConversationRecord.body_cache = None
+    del summaries
+
+    start = time.perf_counter()
+    api = [record.to_api() for record in records]
+    to_api_ms = (time.perf_counter() - start) * 1000
+    assert api == json.loads(payload), "records do not round-trip to the API shape"
+
+    print(f"{args.conversations} conversations, {total_messages} messages")
+    print(f"plain dicts:          {dict_bytes / 1e6:7.1f} MB ({dict_bytes / total_messages:.0f} B/message)")
+    print(f"ConversationRecord:   {record_bytes / 1e6:7.1f} MB ({record_bytes / total_messages:.0f} B/message)")
+    print(f"summaries + body LRU: {summary_bytes / 1e6:7.1f} MB "
+          f"({args.body_cache_mb:g} MB budget, {body_cache.evictions} bodies evicted)")
+    print(f"Saving: {100 * (1 - record_bytes / dict_bytes):.0f}%, to_api() for all: {to_api_ms:.0f} ms")
+
+if __name__ == '__main__':
+    main()
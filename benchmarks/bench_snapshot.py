@@ -0,0 +1,106 @@
+"""Startup load of stored conversations: JSON files vs binary snapshot.
+
+Generates synthetic conversations in a temporary directory, then compares
+loading every JSON file against loading them through an up-to-date
+snapshot (fully decoded, and summaries only), reporting wall time and
+peak allocated memory (measured in a separate pass).
+
+    python benchmarks/bench_snapshot.py --conversations 5000 --messages 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.conversation_store import ConversationStore
+from src.conversation_snapshot import ConversationSnapshot, convert_json_dir
+
+WORDS = ("hello thanks position role interview salary remote team opportunity "
+         "experience availability schedule call week looking forward grazie ciao").split()
+
+def make_conversation(i, n_messages):
+    # Every fourth thread as if read from the network capture, with LinkedIn ids
+    captured = i % 4 == 0
+    messages = [
+        {
+            'is_sent': m % 2 == 1,
+            'message': ' '.join(random.choices(WORDS, k=random.randint(5, 60))),
+            'timestamp': f"2024-05-{m % 28 + 1:02d}T10:{m % 60:02d}:00",
+            **({'message_id': f"urn:li:msg_message:(urn:li:fsd_profile:ME,2-{i}-{m})",
+                'delivered_at': 1714557600000 + m * 60000} if captured else {})
+        }
+        for m in range(n_messages)
+    ]
+    conversation = {'sender_name': f"Contact {i}", 'is_unread': i % 3 == 0, 'all_messages': messages,
+                    'thread_url': f"https://www.linkedin.com/messaging/thread/2-{i}/",
+                    'sidebar_fingerprint': f"{i:016x}"}
+    if captured:
+        conversation['conversation_id'] = f"urn:li:msg_conversation:(urn:li:fsd_profile:ME,2-{i})"
+    return conversation
+
+def load_json_dir(conversations_dir):
+    conversations = {}
+    for filename in os.listdir(conversations_dir):
+        if filename.endswith('.json') and not filename.startswith('_'):
+            with open(os.path.join(conversations_dir, filename), 'r', encoding='utf-8') as f:
+                conversations[filename] = json.load(f)
+    return conversations
+
+def load_summaries(snapshot_path):
+    with ConversationSnapshot(snapshot_path) as snapshot:
+        return list(snapshot.summaries())
+
+def measure(label, fn, *args, runs=3):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    # tracemalloc slows allocation down, so memory gets its own pass
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    elapsed = min(timings)
+    print(f"{label:<26} {elapsed * 1000:8.0f} ms  peak {peak / 1e6:7.1f} MB  ({len(result)} conversations)")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON and snapshot conversation loading")
+    parser.add_argument('--conversations', type=int, default=5000)
+    parser.add_argument('--messages', type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        conversations_dir = os.path.join(tmp, 'conversations')
+        snapshot_path = os.path.join(tmp, 'conversations.snap')
+        ConversationStore(conversations_dir).write_many(
+            make_conversation(i, args.messages) for i in range(args.conversations)
+        )
+        convert_json_dir(conversations_dir, snapshot_path)
+
+        json_bytes = sum(os.path.getsize(os.path.join(conversations_dir, f)) for f in os.listdir(conversations_dir))
+        print(f"JSON files: {json_bytes / 1e6:.1f} MB, snapshot: {os.path.getsize(snapshot_path) / 1e6:.1f} MB")
+
+        filenames = [f for f in os.listdir(conversations_dir) if f.endswith('.json') and not f.startswith('_')]
+        snapshot = ConversationSnapshot(snapshot_path)
+
+        json_time = measure("JSON files", load_json_dir, conversations_dir)
+        snap_time = measure("snapshot (full decode)", snapshot.load_files, conversations_dir, filenames)
+        lazy_time = measure("summaries (startup path)", load_summaries, snapshot_path)
+
+        assert snapshot.load_files(conversations_dir, filenames) == load_json_dir(conversations_dir), \
+            "snapshot does not round-trip"
+        # Startup (load_individual_conversations) only reads summaries; bodies are decoded per opened thread
+        print(f"Speedup: {json_time / lazy_time:.1f}x summaries (startup path), {json_time / snap_time:.1f}x full decode")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Import-time budget for the API server.
+
+Imports api_server in fresh interpreters and fails (exit code 1) if the
+median import time exceeds the budget or if Selenium gets imported before
+any browser work is requested.
+
+    python benchmarks/bench_startup.py --budget 0.4 --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import api_server\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(elapsed, 'selenium' in sys.modules)\n"
+)
+
+def measure_once():
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    elapsed, selenium_loaded = output.split()
+    return float(elapsed), selenium_loaded == 'True'
+
+def main():
+    parser = argparse.ArgumentParser(description="Check api_server import time against a budget")
+    parser.add_argument('--budget', type=float, default=0.4, help="Maximum median import time in seconds")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    timings = []
+    selenium_loaded = False
+    for _ in range(args.runs):
+        elapsed, loaded = measure_once()
+        timings.append(elapsed)
+        selenium_loaded = selenium_loaded or loaded
+
+    median = statistics.median(timings)
+    print(f"api_server import: median {median * 1000:.0f} ms, best {min(timings) * 1000:.0f} ms over {args.runs} runs")
+
+    failed = False
+    if selenium_loaded:
+        print("✗ Selenium was imported at startup")
+        failed = True
+    if median > args.budget:
+        print(f"✗ Import time {median:.3f}s exceeds budget of {args.budget:.3f}s")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✓ Startup within budget")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Peak memory and time to first result: collect-then-save vs streaming sync.
+
+Runs the sync engine over a synthetic sidebar (no browser) twice: once
+collecting every conversation before writing them all, the way
+fetch_all_conversations + save_conversations_to_individual_files used to,
+and once persisting each conversation as it streams out of the engine.
+Reports the peak memory (tracemalloc) and when the first conversation
+reached disk.
+
+    python benchmarks/bench_streaming.py --conversations 300 --messages 200
+"""
+import argparse
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.conversation_store import ConversationStore
+from src.sync_engine import FullSync, SyncEngine
+
+WORDS = ("hello thanks position role interview salary remote team opportunity "
+         "experience availability schedule call week looking forward grazie ciao").split()
+
+class SyntheticFetcher:
+    """Stands in for LinkedInMessageFetcher: a sidebar of N threads of M messages"""
+
+    def __init__(self, n_conversations, n_messages, scrape_delay):
+        self.n_conversations = n_conversations
+        self.n_messages = n_messages
+        self.scrape_delay = scrape_delay
+        self.cancel_check = None
+        self.current = None
+
+    def navigate_to_messages(self):
+        return True
+
+    def get_conversation_list(self, limit=20):
+        return [{'index': i, 'sender_name': f"Contact {i}", 'is_unread': i % 3 == 0, 'unread_count': 0,
+                 'fingerprint': f"fp{i}"} for i in range(min(limit, self.n_conversations))]
+
+    def open_conversation(self, preview):
+        self.current = preview
+        preview['thread_url'] = f"https://www.linkedin.com/messaging/thread/2-{preview['index']}/"
+        return True
+
+    def get_conversation_messages(self):
+        time.sleep(self.scrape_delay)
+        return [{'is_sent': m % 2 == 1, 'message': ' '.join(random.choices(WORDS, k=random.randint(5, 40))),
+                 'timestamp': f"{m % 12 + 1}:{m % 60:02d} PM", 'message_index': m}
+                for m in range(self.n_messages)]
+
+    def wait_for_sidebar(self):
+        pass
+
+def measure(label, run):
+    directory = tempfile.mkdtemp(prefix='bench_streaming_')
+    try:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        first = run(directory, start)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"{label:<18} peak {peak / 1024 / 1024:7.1f} MB   first on disk {first * 1000:8.1f} ms   total {elapsed:6.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collect-then-save vs streaming sync")
+    parser.add_argument('--conversations', type=int, default=300)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--scrape-ms', type=float, default=2.0, help="simulated time to read one thread")
+    args = parser.parse_args()
+    FullSync.pause = 0
+
+    def fetcher():
+        return SyntheticFetcher(args.conversations, args.messages, args.scrape_ms / 1000)
+
+    def collect_then_save(directory, start):
+        conversations = [item['conversation'] for item in SyncEngine(fetcher()).stream(limit=args.conversations)]
+        ConversationStore(directory).write_many(conversations)
+        return time.perf_counter() - start
+
+    def streaming(directory, start):
+        first = None
+        for _ in SyncEngine(fetcher(), ConversationStore(directory)).stream(limit=args.conversations):
+            if first is None:
+                first = time.perf_counter() - start
+        return first
+
+    print(f"{args.conversations} conversations x {args.messages} messages")
+    measure("collect then save", collect_then_save)
+    measure("streaming", streaming)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Personalize response templates for many recipients, compiled vs chained replace.
+
+Renders every template in data/response_templates.csv (plus one using all
+placeholders) for --recipients generated names, once with the compiled
+segment renderer and once with the chained str.replace it replaced, and
+checks that no rendered reply still contains a placeholder.
+
+    python benchmarks/bench_templates.py --recipients 10000
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.response_template import PLACEHOLDER_RE, compile_template, name_values
+
+FULL_TEMPLATE = ("Ciao [firstname], sono [Nome HR] di [company]. Stiamo cercando un profilo [role]: "
+                 "se ti interessa scrivi a [recruiter_email]. A presto, [hrname]")
+
+def load_templates():
+    path = os.path.join(ROOT, 'data', 'response_templates.csv')
+    with open(path, 'r', encoding='utf-8') as f:
+        return [row['response'] for row in csv.DictReader(f)] + [FULL_TEMPLATE]
+
+def chained_replace(template, values):
+    text = template.replace('[firstname]', values['firstName'])
+    text = text.replace('[hrname]', values['hrName']).replace('[Nome HR]', values['hrName'])
+    text = text.replace('[company]', values['company']).replace('[role]', values['role'])
+    return text.replace('[recruiter_email]', values['recruiterEmail'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch template personalization")
+    parser.add_argument('--recipients', type=int, default=10000)
+    args = parser.parse_args()
+
+    shared = {'hrName': 'Giulia Bianchi', 'company': 'Blazar Group', 'role': 'Data Engineer',
+              'recruiterEmail': 'recruiting@example.com'}
+    recipients = [name_values(f"maria{i} ROSSI") for i in range(args.recipients)]
+    templates = load_templates()
+
+    start = time.perf_counter()
+    compiled = [compile_template(text).validate() for text in templates]
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    rendered = [template.render_many(recipients, shared=shared) for template in compiled]
+    render_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for text in templates:
+        [chained_replace(text, {**shared, **row}) for row in recipients]
+    replace_ms = (time.perf_counter() - start) * 1000
+
+    leftovers = sum(1 for replies in rendered for reply in replies if PLACEHOLDER_RE.search(reply))
+    total = len(templates) * len(recipients)
+    print(f"{len(templates)} templates compiled in {compile_ms:.2f} ms")
+    print(f"{total} replies: compiled {render_ms:.1f} ms, chained replace {replace_ms:.1f} ms")
+    print(f"replies with a leftover placeholder: {leftovers}")
+    print(f"sample: {rendered[-1][0]}")
+
+if __name__ == '__main__':
+    main()
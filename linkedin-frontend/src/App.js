@@ -80,7 +80,9 @@ function App() {
     try {
       setIsBackgroundLoading(true);
       console.log("🔄 Fetching new conversations in background...");
-      const res = await fetch(`http://127.0.0.1:5000/api/messages/background?unread_only=${unreadOnly ? '1' : '0'}&limit=${limit}`);
+      // The open conversation is fetched first by the backend scheduler
+      const openParam = selectedConversation ? `&open=${encodeURIComponent(selectedConversation.sender_name)}` : '';
+      const res = await fetch(`http://127.0.0.1:5000/api/messages/background?unread_only=${unreadOnly ? '1' : '0'}&limit=${limit}${openParam}`);
       const data = await res.json();
       
       if (data.success) {
@@ -99,7 +101,7 @@ function App() {
             c => c.sender_name === selectedConversation.sender_name
           );
           if (updated) {
-            setSelectedConversation(updated);
+            refreshSelectedConversation(updated);
           }
         }
         
@@ -289,6 +291,30 @@ function App() {
     prevSelectedConversationRef.current = selectedConversation;
   }, [selectedConversation]);
 
+  // List views only carry summaries; message bodies are loaded when a conversation is opened
+  const loadConversationMessages = async (conv) => {
+    try {
+      const res = await fetch(`http://127.0.0.1:5000/api/conversation/${encodeURIComponent(conv.sender_name)}/messages`);
+      if (!res.ok) return;
+      const data = await res.json();
+      setSelectedConversation(prev =>
+        prev && prev.sender_name === conv.sender_name
+          ? { ...prev, all_messages: data.all_messages, message_count: data.message_count }
+          : prev
+      );
+    } catch (err) {
+      console.log('Error loading conversation messages:', err);
+    }
+  };
+
+  // Apply a summary from a list refresh to the open conversation, reloading its messages if they changed
+  const refreshSelectedConversation = (summary) => {
+    setSelectedConversation(prev => ({ ...prev, ...summary }));
+    if (!selectedConversation || summary.message_count !== selectedConversation.message_count) {
+      loadConversationMessages(summary);
+    }
+  };
+
   const handleSelectConversation = async (conv) => {
     setNotification(null);
     // Always mark as read when clicking on a conversation (even in unread mode)
@@ -309,6 +335,7 @@ function App() {
     } else {
       setSelectedConversation(conv);
     }
+    loadConversationMessages(conv);
   };
 
   const handleSendMessage = async (sender_name, message) => {
@@ -398,7 +425,7 @@ function App() {
               c => c.sender_name === selectedConversation.sender_name
             );
             if (updated) {
-              setSelectedConversation(updated);
+              refreshSelectedConversation(updated);
             }
           }
         }
@@ -4,6 +4,7 @@ import "./ConversationDetail.css";
 function ConversationDetail({ conversation, templates, onSend, hrName }) {
   const [selectedTemplateIdx, setSelectedTemplateIdx] = useState(null);
   const [message, setMessage] = useState("");
+  const [templateNotice, setTemplateNotice] = useState(null); // Why a template could not be filled in
   const [pendingMessages, setPendingMessages] = useState([]); // For optimistic UI
   const messagesEndRef = useRef(null);
 
@@ -51,6 +52,7 @@ function ConversationDetail({ conversation, templates, onSend, hrName }) {
 
   const handleTemplateClick = async (idx) => {
     setSelectedTemplateIdx(idx);
+    setTemplateNotice(null);
     
     try {
       // Use the preview response API for proper personalization
@@ -60,45 +62,33 @@ function ConversationDetail({ conversation, templates, onSend, hrName }) {
           "Content-Type": "application/json",
         },
         body: JSON.stringify({
-          message: "template preview", // Dummy message to get template
+          message: "template preview",
+          template: templates[idx].response || "",
           sender_name: conversation.sender_name || "",
           hr_name: hrName || "HR Team"
         })
       });
       
       if (response.ok) {
+        // The server renders every placeholder the template uses, or says which one has no value
         const data = await response.json();
-        // Use the template response and personalize it
-        const template = templates[idx];
-        const firstName = data.first_name || conversation.sender_name?.split(" ")[0] || "";
-        const effectiveHrName = hrName || "HR Team";
-        
-        let personalized = template.response || "";
-        personalized = personalized.replace(/\[firstname\]/gi, firstName);
-        personalized = personalized.replace(/\[hrname\]/gi, effectiveHrName);
-        personalized = personalized.replace(/\[Nome HR\]/gi, effectiveHrName); // Legacy support
-        
-        setMessage(personalized);
+        if (data.personalized_response) {
+          setMessage(data.personalized_response);
+        } else {
+          // Never paste the unrendered template: its placeholders would be sent as written
+          setMessage("");
+          setTemplateNotice(data.missing_value
+            ? `This template needs a value for [${data.missing_value}] before it can be used.`
+            : "This template could not be filled in.");
+        }
       } else {
-        // Fallback to simple personalization
-        const firstName = conversation.sender_name?.split(" ")[0] || "";
-        const effectiveHrName = hrName || "HR Team";
-        let personalized = templates[idx].response || "";
-        personalized = personalized.replace(/\[firstname\]/gi, firstName);
-        personalized = personalized.replace(/\[hrname\]/gi, effectiveHrName);
-        personalized = personalized.replace(/\[Nome HR\]/gi, effectiveHrName);
-        setMessage(personalized);
+        setMessage("");
+        setTemplateNotice("Could not personalize the template, please try again.");
       }
     } catch (error) {
       console.error("Error personalizing template:", error);
-      // Fallback to simple personalization
-      const firstName = conversation.sender_name?.split(" ")[0] || "";
-      const effectiveHrName = hrName || "HR Team";
-      let personalized = templates[idx].response || "";
-      personalized = personalized.replace(/\[firstname\]/gi, firstName);
-      personalized = personalized.replace(/\[hrname\]/gi, effectiveHrName);
-      personalized = personalized.replace(/\[Nome HR\]/gi, effectiveHrName);
-      setMessage(personalized);
+      setMessage("");
+      setTemplateNotice("Could not personalize the template, please try again.");
     }
   };
 
@@ -180,11 +170,12 @@ function ConversationDetail({ conversation, templates, onSend, hrName }) {
           <div ref={messagesEndRef} />
         </div>
         <div className="message-input-section">
+          {templateNotice && <div className="template-notice">{templateNotice}</div>}
           <div className="input-container">
             <textarea
               className="message-input"
               value={message}
-              onChange={(e) => setMessage(e.target.value)}
+              onChange={(e) => { setMessage(e.target.value); setTemplateNotice(null); }}
               onKeyPress={handleKeyPress}
               placeholder="Type your message here..."
               rows={3}
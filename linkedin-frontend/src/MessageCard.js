@@ -28,7 +28,11 @@ const MessageCard = ({ message, isSelected, onClick }) => {
         return ai - bi;
       });
       const last = msgs[msgs.length - 1];
-      if (last && last.message) return last.message;
+      if (last && last.message) return last.is_sent ? `You: ${last.message}` : last.message;
+    }
+    // List summaries carry the latest message, sent or received, without the bodies
+    if (message.last_message) {
+      return message.last_message_sent ? `You: ${message.last_message}` : message.last_message;
     }
     // Fallbacks: last_received_message -> conversation_preview -> message
     if (message.last_received_message) return message.last_received_message;
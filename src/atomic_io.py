@@ -0,0 +1,27 @@
+import json
+import os
+import tempfile
+
+def atomic_write_bytes(filepath, payload, fsync=True):
+    """Write bytes through a temp file and rename it over the target"""
+    directory = os.path.dirname(filepath) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def atomic_write_json(filepath, data, fsync=True, indent=2):
+    """Write JSON through a temp file and rename it over the target"""
+    payload = json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8')
+    atomic_write_bytes(filepath, payload, fsync=fsync)
@@ -0,0 +1,99 @@
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, TimeoutError as FutureTimeout
+
+MAX_FINISHED_JOBS = 200  # finished jobs kept for polling before the oldest are dropped
+
+class BrowserJobs:
+    """Handles for browser work that requests start but do not wait for.
+
+    Each job is a BrowserWorker future registered under a short id, so an
+    endpoint can return 202 with the id straight away and the client polls
+    (or long-polls) GET /api/jobs/<id> for the result. Request threads are
+    never held for the length of a scrape, so cheap reads keep being served
+    while the browser is busy.
+    """
+
+    def __init__(self, worker, keep=MAX_FINISHED_JOBS):
+        self.worker = worker
+        self.keep = keep
+        self._jobs = {}  # job id -> job dict, in submission order
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """Queue fn on the browser worker; returns the job id"""
+        future = self.worker.submit(fn, *args, **kwargs)
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._jobs[job_id] = {
+                'id': job_id,
+                'kind': kind,
+                'future': future,
+                'submitted_at': time.time(),
+                'finished_at': None
+            }
+            self._prune()
+        future.add_done_callback(lambda _: self._finished(job_id))
+        return job_id
+
+    def _finished(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job['finished_at'] = time.time()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['future'].done()]
+        for job_id in finished[:max(len(finished) - self.keep, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """Block up to timeout seconds for a job to finish (long polling)"""
+        job = self._jobs.get(job_id)
+        if job is None or timeout <= 0:
+            return job
+        try:
+            job['future'].exception(timeout=timeout)
+        except (FutureTimeout, CancelledError):
+            pass
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet; True if it was cancelled"""
+        job = self._jobs.get(job_id)
+        return job is not None and job['future'].cancel()
+
+    def describe(self, job_id, include_result=True):
+        """JSON-ready state of a job, or None if unknown"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        future = job['future']
+        if future.cancelled():
+            state = 'cancelled'
+        elif future.done():
+            state = 'failed' if future.exception() is not None else 'completed'
+        elif future.running():
+            state = 'running'
+        else:
+            state = 'queued'
+        info = {
+            'id': job['id'],
+            'kind': job['kind'],
+            'state': state,
+            'submitted_at': job['submitted_at'],
+            'elapsed': round((job['finished_at'] or time.time()) - job['submitted_at'], 2)
+        }
+        if state == 'failed':
+            info['error'] = str(future.exception())
+        elif state == 'completed' and include_result:
+            info['result'] = future.result()
+        return info
+
+    def list(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.describe(job_id, include_result=False) for job_id in job_ids]
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+
+RECYCLE_AFTER_JOBS = int(os.getenv('BROWSER_RECYCLE_AFTER', '300'))   # browser jobs before a fresh Chrome
+RECYCLE_RSS_MB = int(os.getenv('BROWSER_RECYCLE_RSS_MB', '1500'))     # Chrome memory before a fresh Chrome
+HEALTH_INTERVAL = float(os.getenv('BROWSER_HEALTH_INTERVAL', '60'))   # seconds between health checks
+MAX_LAUNCH_BACKOFF = 600
+
+def process_tree_rss(pid):
+    """Resident memory of a process and its children in bytes, or None without psutil"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        process = psutil.Process(pid)
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    except psutil.Error:
+        return None
+
+class BrowserLifecycle:
+    """Keeps the browser warm: background health checks, recycling and restart metrics.
+
+    Health checks run as background jobs on the browser worker, so they
+    only use the browser while no request needs it. A dead browser is
+    relaunched there instead of inside the next request, and a live one
+    is recycled after a number of jobs or once Chrome's memory passes a
+    threshold. The persistent profile can only be opened by one Chrome,
+    so there is a single warm browser rather than several.
+    """
+
+    def __init__(self, worker, launch, close, get_driver, recycle_after=RECYCLE_AFTER_JOBS,
+                 max_rss_mb=RECYCLE_RSS_MB, interval=HEALTH_INTERVAL):
+        self.worker = worker
+        self.launch = launch          # starts (or reuses) a logged-in browser
+        self.close = close            # quits the browser and forgets it
+        self.get_driver = get_driver  # current driver or None
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.interval = interval
+        self.jobs_since_launch = 0
+        self.restarts = 0
+        self.restart_reasons = {}
+        self.last_restart = None
+        self.last_check = None
+        self.last_rss_mb = None
+        self.launch_failures = 0
+        self._next_launch_at = 0
+        self._check_queued = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Count browser jobs and start the periodic health check"""
+        self.worker.after_job = self._after_job
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='browser-health', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.schedule_check()
+
+    def schedule_check(self):
+        """Queue a health check behind any real browser work"""
+        if self._check_queued or self.worker.state == 'disabled':
+            return
+        self._check_queued = True
+        try:
+            self.worker.submit_background(self.check)
+        except Exception as e:
+            self._check_queued = False
+            print(f"⚠️ Could not schedule browser health check: {e}")
+
+    def _after_job(self, job_name):
+        if job_name == 'check':
+            return
+        self.jobs_since_launch += 1
+        if self.jobs_since_launch >= self.recycle_after:
+            self.schedule_check()
+
+    def driver_rss_mb(self, driver):
+        try:
+            rss = process_tree_rss(driver.service.process.pid)
+        except Exception:
+            rss = None
+        return round(rss / 1e6, 1) if rss is not None else None
+
+    def check(self):
+        """Health check and recycle policy (browser worker)"""
+        self._check_queued = False
+        self.last_check = time.time()
+        driver = self.get_driver()
+        if driver is None:
+            # Never started or closed: warm one up unless launches keep failing
+            if time.time() >= self._next_launch_at:
+                self.restart('cold')
+            return
+        try:
+            _ = driver.current_url
+        except Exception:
+            self.restart('dead')
+            return
+        self.last_rss_mb = self.driver_rss_mb(driver)
+        if self.jobs_since_launch >= self.recycle_after:
+            self.restart('jobs')
+        elif self.last_rss_mb is not None and self.last_rss_mb >= self.max_rss_mb:
+            self.restart('memory')
+
+    def restart(self, reason):
+        """Replace the browser with a fresh, logged-in one (browser worker)"""
+        print(f"♻️ Restarting browser ({reason})")
+        try:
+            self.close()
+        except Exception as e:
+            print(f"⚠️ Error closing browser: {str(e)[:80]}")
+        started = time.time()
+        try:
+            self.launch()
+        except Exception as e:
+            self.launch_failures += 1
+            backoff = min(self.interval * 2 ** self.launch_failures, MAX_LAUNCH_BACKOFF)
+            self._next_launch_at = time.time() + backoff
+            print(f"⚠️ Browser relaunch failed ({e}); next attempt in {backoff:.0f}s")
+            return False
+        self.launch_failures = 0
+        self.jobs_since_launch = 0
+        self.restarts += 1
+        self.restart_reasons[reason] = self.restart_reasons.get(reason, 0) + 1
+        self.last_restart = {'reason': reason, 'at': time.time(), 'seconds': round(time.time() - started, 1)}
+        return True
+
+    def status(self):
+        return {
+            'jobs_since_launch': self.jobs_since_launch,
+            'recycle_after': self.recycle_after,
+            'rss_mb': self.last_rss_mb,
+            'max_rss_mb': self.max_rss_mb,
+            'restarts': self.restarts,
+            'restart_reasons': self.restart_reasons,
+            'last_restart': self.last_restart,
+            'last_check': self.last_check,
+            'launch_failures': self.launch_failures
+        }
@@ -0,0 +1,81 @@
+import os
+import time
+
+# Lean scraping profile: on unless LINKEDIN_LEAN_PROFILE=0
+LEAN_PROFILE = os.getenv('LINKEDIN_LEAN_PROFILE', '1') != '0'
+DISABLE_IMAGES = os.getenv('LINKEDIN_DISABLE_IMAGES', '1') != '0'
+
+# Requests the messaging pages never need, by resource type (file extension)
+# and by URL (media CDN, ads and trackers). Network.setBlockedURLs wildcards.
+BLOCKED_RESOURCE_PATTERNS = (
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.avif', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+)
+BLOCKED_URL_PATTERNS = (
+    '*media.licdn.com/dms/image*',
+    '*dms.licdn.com/playlist*',
+    '*doubleclick.net*',
+    '*googletagservices.com*',
+    '*google-analytics.com*',
+    '*px.ads.linkedin.com*',
+    '*snap.licdn.com/li.lms-analytics*',
+    '*linkedin.com/li/track*',
+    '*linkedin.com/realtime/connect*sendTrackingEvent*',
+    '*linkedin.com/voyager/api/feed/*',
+)
+
+LINKEDIN_URL = 'https://www.linkedin.com'
+SESSION_COOKIE = 'li_at'
+
+def apply_lean_options(chrome_options, disable_images=DISABLE_IMAGES):
+    """Launch flags and preferences for a lean scraping browser"""
+    chrome_options.add_argument('--mute-audio')
+    chrome_options.add_argument('--autoplay-policy=user-gesture-required')
+    chrome_options.add_argument('--force-prefers-reduced-motion')
+    chrome_options.add_argument('--disable-background-networking')
+    chrome_options.add_argument('--disable-component-update')
+    chrome_options.add_argument('--disable-features=Translate,MediaRouter,OptimizationHints')
+    if disable_images:
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2
+        })
+
+def apply_lean_profile(driver):
+    """Block unneeded requests and animations on a running driver through CDP"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {
+            'urls': list(BLOCKED_RESOURCE_PATTERNS + BLOCKED_URL_PATTERNS)
+        })
+        driver.execute_cdp_cmd('Emulation.setEmulatedMedia', {
+            'features': [{'name': 'prefers-reduced-motion', 'value': 'reduce'}]
+        })
+        # Run whatever animations remain to completion almost instantly
+        driver.execute_cdp_cmd('Animation.enable', {})
+        driver.execute_cdp_cmd('Animation.setPlaybackRate', {'playbackRate': 100})
+        print("🪶 Lean browser profile active (images, media, fonts and trackers blocked)")
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not apply lean browser profile: {e}")
+        return False
+
+def session_cookie(driver):
+    """The LinkedIn session cookie as CDP reports it, without loading a page; None if absent.
+
+    Raises if the driver has no CDP support.
+    """
+    cookies = driver.execute_cdp_cmd('Network.getCookies', {'urls': [LINKEDIN_URL]}).get('cookies', [])
+    for cookie in cookies:
+        if cookie.get('name') == SESSION_COOKIE:
+            return cookie
+    return None
+
+def has_live_session(driver, now=None):
+    """True if the session cookie exists and has not expired (session cookies never expire)"""
+    cookie = session_cookie(driver)
+    if cookie is None:
+        return False
+    expires = cookie.get('expires', -1)
+    return expires is None or expires <= 0 or expires > (now or time.time())
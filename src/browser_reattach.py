@@ -0,0 +1,58 @@
+import json
+import os
+import urllib.request
+
+# Leave Chrome running when the API server stops, so the next start reattaches
+# to it instead of launching and logging in again. LINKEDIN_KEEP_BROWSER=0 quits it.
+KEEP_BROWSER = os.getenv('LINKEDIN_KEEP_BROWSER', '1') != '0'
+DEBUGGER_ADDRESS = '127.0.0.1:9222'  # setup_driver launches Chrome with --remote-debugging-port=9222
+CONVERSATION_LIST_SELECTOR = 'li.msg-conversation-listitem'
+
+def apply_keep_alive(chrome_options):
+    """Let Chrome outlive chromedriver so a restarted server can reattach to it"""
+    if KEEP_BROWSER:
+        chrome_options.add_experimental_option('detach', True)
+
+def debugger_listening(address=DEBUGGER_ADDRESS, timeout=1):
+    """True if a Chrome answers on the DevTools address (no chromedriver involved)"""
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout) as response:
+            return 'Browser' in json.loads(response.read().decode('utf-8'))
+    except Exception:
+        return False
+
+def attach_driver(address=DEBUGGER_ADDRESS):
+    """A new chromedriver session on the Chrome already running at the address"""
+    from selenium import webdriver
+    chrome_options = webdriver.ChromeOptions()
+    chrome_options.debugger_address = address
+    if os.getenv('LINKEDIN_NETWORK_CAPTURE') == '1':
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return webdriver.Chrome(options=chrome_options)
+
+def switch_to_messaging_tab(driver):
+    """Switch to the tab showing LinkedIn messaging; False if no tab does"""
+    for handle in driver.window_handles:
+        driver.switch_to.window(handle)
+        if 'linkedin.com/messaging' in driver.current_url:
+            return True
+    return False
+
+def messaging_tab_alive(driver):
+    """True if the current tab is a loaded, logged-in messaging page with its conversation list"""
+    try:
+        url = driver.current_url
+        if '/messaging' not in url or any(part in url for part in ('/login', '/authwall', '/checkpoint')):
+            return False
+        return bool(driver.execute_script(
+            "return document.readyState === 'complete' && document.querySelectorAll(arguments[0]).length;",
+            CONVERSATION_LIST_SELECTOR))
+    except Exception:
+        return False
+
+def detach_driver(driver):
+    """Stop chromedriver but leave the (detached) Chrome and its tabs running"""
+    try:
+        driver.service.stop()
+    except Exception as e:
+        print(f"⚠️ Error stopping chromedriver: {str(e)[:50]}")
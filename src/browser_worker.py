@@ -0,0 +1,152 @@
+import itertools
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+# Job priorities: lower runs first, FIFO within a priority
+PRIORITY_NORMAL = 0
+PRIORITY_BACKGROUND = 10  # housekeeping that should only use an otherwise idle browser
+_PRIORITY_STOP = 100
+
+class BrowserUnavailableError(RuntimeError):
+    """Raised when browser work is requested but the worker cannot run it"""
+
+class BrowserWorker:
+    """Dedicated thread that owns the browser and runs all Selenium work.
+
+    Selenium drivers are not thread-safe, so request handlers submit jobs
+    here instead of touching the driver themselves. The first job is the
+    browser initializer, whose outcome is reported through status().
+    Background jobs only run when no normal-priority job is queued.
+    """
+
+    def __init__(self, name="browser-worker"):
+        self.name = name
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._thread = None
+        self.state = 'stopped'
+        self.error = None
+        self.current_job = None
+        self.jobs_completed = 0
+        # Optional callback(job name) after every job, e.g. for recycle policies
+        self.after_job = None
+        self.started_at = None
+        self.ready_at = None
+
+    def start(self, initializer=None):
+        """Start the worker thread, running the initializer as its first job"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.state = 'starting'
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        if initializer is not None:
+            self.submit(self._initialize, initializer)
+        else:
+            self.submit(self._mark_ready)
+
+    def _mark_ready(self):
+        self.state = 'ready'
+        self.ready_at = time.time()
+
+    def _initialize(self, initializer):
+        try:
+            initializer()
+            self._mark_ready()
+        except Exception as e:
+            # Keep serving jobs: each one will retry browser setup on demand
+            self.state = 'error'
+            self.error = str(e)
+
+    def disable(self, reason):
+        """Refuse all browser work, e.g. when serving in read-only mode"""
+        self.state = 'disabled'
+        self.error = reason
+
+    def in_worker(self):
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue a job and return a Future for its result"""
+        return self._submit(PRIORITY_NORMAL, fn, args, kwargs)
+
+    def submit_background(self, fn, *args, **kwargs):
+        """Queue a low-priority job that waits until the worker is otherwise idle"""
+        return self._submit(PRIORITY_BACKGROUND, fn, args, kwargs)
+
+    def _submit(self, priority, fn, args, kwargs):
+        future = Future()
+        if self.in_worker():
+            # Nested submission from a running job: run inline to avoid a deadlock
+            self._execute(future, fn, args, kwargs)
+            return future
+        if self.state == 'disabled':
+            raise BrowserUnavailableError(self.error)
+        if self._thread is None or not self._thread.is_alive():
+            raise BrowserUnavailableError("Browser worker is not running")
+        self._queue.put((priority, next(self._sequence), (future, fn, args, kwargs)))
+        return future
+
+    def call(self, fn, *args, timeout=None, **kwargs):
+        """Run a job on the worker and wait for its result"""
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    def _execute(self, future, fn, args, kwargs):
+        """Run a job into its future; returns (ran, error). A job cancelled while queued does not run"""
+        # Atomic with Future.cancel(), unlike checking cancelled() first
+        if not future.set_running_or_notify_cancel():
+            return False, None
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            return True, e
+        future.set_result(result)
+        return True, None
+
+    def _run(self):
+        while True:
+            _, _, item = self._queue.get()
+            if item is None:
+                break
+            future, fn, args, kwargs = item
+            self.current_job = getattr(fn, '__name__', repr(fn))
+            ran, error = self._execute(future, fn, args, kwargs)
+            if not ran:
+                # Cancelled while still queued
+                self.current_job = None
+                continue
+            if error is not None:
+                print(f"⚠️ Browser job {self.current_job} failed: {error}")
+                traceback.print_exception(type(error), error, error.__traceback__)
+            if self.after_job is not None:
+                try:
+                    self.after_job(self.current_job)
+                except Exception as e:
+                    print(f"⚠️ after_job hook failed: {e}")
+            self.current_job = None
+            self.jobs_completed += 1
+
+    def stop(self, timeout=5):
+        """Stop the worker after the jobs already queued"""
+        if self._thread is None:
+            return
+        self._queue.put((_PRIORITY_STOP, next(self._sequence), None))
+        if not self.in_worker():
+            self._thread.join(timeout)
+        self.state = 'stopped'
+
+    def status(self):
+        return {
+            'state': self.state,
+            'ready': self.state == 'ready',
+            'error': self.error,
+            'current_job': self.current_job,
+            'queued_jobs': self._queue.qsize(),
+            'jobs_completed': self.jobs_completed,
+            'startup_seconds': round(self.ready_at - self.started_at, 1) if self.ready_at and self.started_at else None
+        }
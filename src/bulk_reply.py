@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from src.conversation_index import ConversationIndex
+from src.conversation_store import atomic_write_json
+from src.csv_handler import CSVHandler
+
+PROGRESS_FILE = 'data/bulk_reply_progress.json'
+# Largest per-category cap; higher values are clamped to it
+MAX_CAP = 1000
+
+class BulkReplyJob:
+    """Non-interactive bulk reply driven by the conversation index.
+
+    Selects conversations whose latest inbound message falls in one of the
+    requested categories, renders the pending response and sends it through
+    the responder. Progress is written after every send so an interrupted
+    job can be resumed without replying twice.
+    """
+
+    def __init__(self, responder=None, categories=None, caps=None, hr_name="HR Team",
+                 delay_between=3, index=None, progress_path=PROGRESS_FILE, on_sent=None):
+        self.responder = responder
+        self.categories = list(categories or [])
+        self.caps = validate_caps(caps or {})
+        self.hr_name = hr_name
+        self.delay_between = delay_between
+        self.index = index or ConversationIndex()
+        self.progress_path = progress_path
+        self.on_sent = on_sent
+        self.csv_handler = CSVHandler()
+        self._cancel = threading.Event()
+        self.progress = self._new_progress()
+
+    def _new_progress(self):
+        return {
+            'state': 'idle',
+            'categories': self.categories,
+            'caps': self.caps,
+            'hr_name': self.hr_name,
+            'started_at': None,
+            'finished_at': None,
+            'current': 0,
+            'total': 0,
+            'current_conversation': '',
+            'sent': [],
+            'failed': [],
+            'skipped': []
+        }
+
+    def _load_progress(self):
+        if not os.path.exists(self.progress_path):
+            return None
+        try:
+            with open(self.progress_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read bulk reply progress: {e}")
+            return None
+
+    def _save_progress(self):
+        try:
+            # A crash mid-write must not leave a truncated file that resume cannot read
+            atomic_write_json(self.progress_path, self.progress)
+        except Exception as e:
+            print(f"⚠️ Could not save bulk reply progress: {e}")
+
+    def plan(self, already_sent=None):
+        """Select the conversations to reply to, honouring per-category caps.
+
+        Returns (selected, capped, skipped); skipped lists the conversations
+        whose reply still has a placeholder without a value.
+        """
+        already_sent = already_sent or []
+        sent_names = {item['sender_name'].lower() for item in already_sent}
+        sent_per_category = {}
+        for item in already_sent:
+            sent_per_category[item['category']] = sent_per_category.get(item['category'], 0) + 1
+
+        grouped = self.index.awaiting_reply(hr_name=self.hr_name, categories=self.categories or None)
+        selected = []
+        capped = {}
+        skipped = []
+        for category in sorted(grouped):
+            remaining = None
+            if category in self.caps:
+                remaining = max(self.caps[category] - sent_per_category.get(category, 0), 0)
+            for entry in grouped[category]:
+                if entry['sender_name'].lower() in sent_names:
+                    continue
+                if entry.get('missing_value'):
+                    skipped.append({
+                        'sender_name': entry['sender_name'],
+                        'category': category,
+                        'missing_value': entry['missing_value']
+                    })
+                    continue
+                if not entry.get('pending_response'):
+                    continue
+                if remaining is not None and remaining <= 0:
+                    capped[category] = capped.get(category, 0) + 1
+                    continue
+                selected.append({
+                    'sender_name': entry['sender_name'],
+                    'category': category,
+                    'matched_keyword': entry.get('matched_keyword'),
+                    'original_message': entry.get('last_received_message', ''),
+                    'timestamp': entry.get('last_received_timestamp', ''),
+                    'personalized_response': entry['pending_response']
+                })
+                if remaining is not None:
+                    remaining -= 1
+        for item in skipped:
+            print(f"⚠️ Not replying to {item['sender_name']}: no value for [{item['missing_value']}]")
+        return selected, capped, skipped
+
+    def dry_run(self):
+        """Report what a run would send without touching the browser"""
+        selected, capped, skipped = self.plan()
+        counts = {}
+        for item in selected:
+            counts[item['category']] = counts.get(item['category'], 0) + 1
+        return {
+            'total': len(selected),
+            'counts': counts,
+            'capped': capped,
+            'skipped': skipped,
+            'replies': selected
+        }
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self, resume=True):
+        """Send all planned replies, resuming a previous unfinished job if asked"""
+        if self.responder is None:
+            raise ValueError("A responder is required to send replies")
+
+        previous = self._load_progress() if resume else None
+        if previous and previous.get('state') not in ('completed', None):
+            print(f"♻️ Resuming bulk reply job started at {previous.get('started_at')}")
+            self.progress.update({
+                'started_at': previous.get('started_at'),
+                'sent': previous.get('sent', []),
+                'failed': previous.get('failed', [])
+            })
+
+        selected, capped, skipped = self.plan(already_sent=self.progress['sent'])
+        self.progress.update({
+            'state': 'running',
+            'started_at': self.progress['started_at'] or datetime.now().isoformat(),
+            'current': len(self.progress['sent']),
+            'total': len(self.progress['sent']) + len(selected),
+            'capped': capped,
+            'skipped': skipped
+        })
+        self._save_progress()
+        print(f"📤 Bulk reply: {len(selected)} replies to send ({len(self.progress['sent'])} already sent, "
+              f"{len(skipped)} skipped for unfilled placeholders)")
+
+        for idx, item in enumerate(selected):
+            if self._cancel.is_set():
+                self.progress['state'] = 'cancelled'
+                self.progress['current_conversation'] = 'Cancelled by user'
+                self._save_progress()
+                print("🛑 Bulk reply cancelled")
+                return self.progress
+
+            sender_name = item['sender_name']
+            self.progress['current_conversation'] = sender_name
+            print(f"\n📤 Bulk reply {idx + 1}/{len(selected)} to {sender_name} ({item['category']})")
+
+            try:
+                success = self.responder.send_response(sender_name, item['personalized_response'])
+            except Exception as e:
+                print(f"✗ Error sending to {sender_name}: {e}")
+                success = False
+
+            if success:
+                self._record_sent(item)
+            else:
+                self.progress['failed'].append({
+                    'sender_name': sender_name,
+                    'category': item['category'],
+                    'failed_at': datetime.now().isoformat()
+                })
+            self.progress['current'] += 1
+            self._save_progress()
+
+            # Delay between messages to avoid rate limiting
+            if idx < len(selected) - 1 and not self._cancel.is_set():
+                time.sleep(self.delay_between)
+
+        self.progress.update({
+            'state': 'completed',
+            'current_conversation': f"Completed! Sent {len(self.progress['sent'])} replies",
+            'finished_at': datetime.now().isoformat()
+        })
+        self._save_progress()
+        print(f"✅ Bulk reply complete: {len(self.progress['sent'])} sent, {len(self.progress['failed'])} failed")
+        return self.progress
+
+    def _record_sent(self, item):
+        sender_name = item['sender_name']
+        self.progress['sent'].append({
+            'sender_name': sender_name,
+            'category': item['category'],
+            'sent_at': datetime.now().isoformat()
+        })
+        self.index.mark_replied(sender_name)
+        self.csv_handler.save_message_history({
+            'timestamp': item['timestamp'],
+            'sender_name': sender_name,
+            'original_message': item['original_message'],
+            'category': item['category'],
+            'matched_keyword': item['matched_keyword'],
+            'response_template': None,
+            'personalized_response': item['personalized_response'],
+            'response_sent': True
+        })
+        if self.on_sent:
+            try:
+                self.on_sent(sender_name, item['personalized_response'])
+            except Exception as e:
+                print(f"⚠️ Could not record sent reply for {sender_name}: {e}")
+
+def validate_caps(caps):
+    """Caps as {category: whole number} clamped to 0..MAX_CAP; raises ValueError on anything else"""
+    if not isinstance(caps, dict):
+        raise ValueError("caps must map categories to counts")
+    result = {}
+    for category, count in caps.items():
+        try:
+            value = int(str(count).strip())
+        except ValueError:
+            raise ValueError(f"cap for {category!r} must be a whole number, got {count!r}")
+        result[str(category).strip()] = max(0, min(value, MAX_CAP))
+    return result
+
+def parse_caps(values):
+    """Parse category=count pairs into a caps dict"""
+    caps = {}
+    for value in values or []:
+        category, _, count = value.partition('=')
+        caps[category.strip()] = count
+    return validate_caps(caps)
+
+def main():
+    parser = argparse.ArgumentParser(description="Send category-based replies in bulk")
+    parser.add_argument('--category', action='append', default=[], help="Category to reply to (repeatable)")
+    parser.add_argument('--cap', action='append', default=[], help="Per-category cap as category=count (repeatable)")
+    parser.add_argument('--hr-name', default="HR Team")
+    parser.add_argument('--delay', type=float, default=3)
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would be sent")
+    parser.add_argument('--no-resume', action='store_true', help="Ignore progress from a previous run")
+    args = parser.parse_args()
+
+    try:
+        caps = parse_caps(args.cap)
+    except ValueError as e:
+        parser.error(str(e))
+    job = BulkReplyJob(
+        categories=args.category,
+        caps=caps,
+        hr_name=args.hr_name,
+        delay_between=args.delay
+    )
+
+    if args.dry_run:
+        print(json.dumps(job.dry_run(), indent=2, ensure_ascii=False))
+        return
+
+    from src.linkedin_auth import LinkedInAuthenticator
+    from src.linkedin_responder import LinkedInResponder
+
+    auth = LinkedInAuthenticator()
+    auth.setup_driver(headless=False)
+    if not auth.is_logged_in and not auth.login():
+        print("✗ Login failed!")
+        return
+    try:
+        job.responder = LinkedInResponder(auth.driver)
+        job.run(resume=not args.no_resume)
+    finally:
+        auth.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from src.atomic_io import atomic_write_json
+
+CONTACTS_FILE = 'data/contacts.json'
+
+# Honorifics and titles LinkedIn users put in front of their name (compared without dots)
+TITLES = {
+    'dott', 'dottssa', 'dssa', 'dr', 'dra', 'drssa', 'ing', 'avv', 'prof', 'profssa', 'arch',
+    'geom', 'rag', 'sig', 'sigra', 'signa', 'mr', 'mrs', 'ms', 'mx', 'miss', 'sir', 'dottor', 'dottore',
+    'dottoressa', 'ingegner', 'ingegnere', 'avvocato', 'professor', 'professore', 'professoressa'
+}
+# Credentials and suffixes after the name
+SUFFIXES = {'phd', 'mba', 'msc', 'bsc', 'cfa', 'cpa', 'pmp', 'jr', 'sr', 'ii', 'iii', 'iv'}
+# First names that commonly start a two-word first name (Maria Grazia, Gian Luca, Jean Pierre)
+COMPOUND_FIRST = {'maria', 'anna', 'gian', 'pier', 'giovan', 'rosa', 'jean', 'mary', 'ann', 'anne', 'josé', 'jose'}
+GIVEN_NAMES = {
+    'grazia', 'teresa', 'luisa', 'paola', 'rosa', 'elena', 'chiara', 'vittoria', 'cristina', 'laura',
+    'lucia', 'giovanna', 'rita', 'angela', 'antonietta', 'carla', 'francesca', 'pia', 'assunta', 'stella',
+    'luca', 'marco', 'paolo', 'carlo', 'franco', 'piero', 'battista', 'maria', 'anna', 'luigi',
+    'pierre', 'paul', 'luc', 'marie', 'claude', 'jane', 'beth', 'kate', 'louise', 'antonio', 'luis'
+}
+
+def proper_name(name):
+    """Capitalize a name typed all in lower or upper case ('MARIA' -> 'Maria', "d'amico" -> "D'Amico")"""
+    name = (name or '').strip()
+    if not name or (not name.islower() and not name.isupper()):
+        return name  # mixed case is how the person writes it (McDonald, DeLuca)
+    return re.sub(r"[^\W\d_]+", lambda m: m.group(0).capitalize(), name.lower())
+
+def clean_display_name(display_name):
+    """A display name without emoji, symbols, pronouns, taglines, titles or credentials"""
+    text = unicodedata.normalize('NFKC', display_name or '')
+    text = re.sub(r'\(.*?\)|\[.*?\]', ' ', text)          # (she/her), [Hiring]
+    text = re.split(r'\s[|•·–—-]\s|\|', text)[0]          # "Mario Rossi | Recruiter"
+    text = text.split(',')[0]                             # "Mario Rossi, PhD"
+    # Emoji, pictographs and other symbols; keep letters, marks, digits, punctuation and spaces
+    text = ''.join(ch for ch in text if unicodedata.category(ch)[0] not in ('S', 'C') and not '\ufe00' <= ch <= '\ufe0f')
+    tokens = text.split()
+    while tokens and tokens[0].lower().replace('.', '') in TITLES:
+        tokens.pop(0)
+    while tokens and tokens[-1].lower().replace('.', '') in SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens).strip(" .-'")
+
+def fold(text):
+    """Text without accents, symbols or case, whitespace collapsed"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch) and unicodedata.category(ch)[0] not in ('S', 'C'))
+    return ' '.join(text.casefold().split())
+
+def normalize_key(display_name):
+    """Accent-, case- and decoration-insensitive key of a name ('Dott. José  Núñez 🚀' -> 'jose nunez')"""
+    return fold(clean_display_name(display_name)) or fold(display_name)
+
+def parse_name(display_name):
+    """First name, last name and key of a LinkedIn display name"""
+    cleaned = clean_display_name(display_name)
+    tokens = cleaned.split()
+    first_count = 1
+    if len(tokens) >= 3 and tokens[0].lower() in COMPOUND_FIRST and tokens[1].lower() in GIVEN_NAMES:
+        first_count = 2
+    return {
+        'display_name': display_name,
+        'first_name': proper_name(' '.join(tokens[:first_count])),
+        'last_name': proper_name(' '.join(tokens[first_count:])),
+        'full_name': proper_name(cleaned),
+        'key': normalize_key(display_name)
+    }
+
+class ContactDirectory:
+    """Parsed names of the people we talk to, with manual overrides.
+
+    Each display name is parsed once and memoized; overrides (a first or
+    last name typed by hand) are kept in data/contacts.json by normalized
+    key, so they also apply when the display name gains a title or emoji.
+    """
+
+    def __init__(self, path=CONTACTS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._overrides = None
+
+    def _load_overrides(self):
+        if self._overrides is None:
+            overrides = {}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        overrides = json.load(f).get('overrides', {})
+                except Exception as e:
+                    print(f"⚠️ Could not read contact overrides: {e}")
+            self._overrides = overrides
+        return self._overrides
+
+    def lookup(self, display_name):
+        """Contact record for a display name: display_name, first_name, last_name, full_name, key"""
+        display_name = display_name or ''
+        contact = self._cache.get(display_name)
+        if contact is None:
+            contact = parse_name(display_name)
+            override = self._load_overrides().get(contact['key'])
+            if override:
+                contact.update(override)
+                contact['overridden'] = True
+            self._cache[display_name] = contact
+        return contact
+
+    def first_name(self, display_name):
+        return self.lookup(display_name)['first_name']
+
+    def key(self, display_name):
+        return self.lookup(display_name)['key']
+
+    def matches(self, display_name, shown_name):
+        """True if a name shown by LinkedIn (possibly a group of names) belongs to the contact"""
+        key = self.key(display_name)
+        if not key:
+            return False
+        shown = fold(re.sub(r'[,.;&]', ' ', shown_name or ''))
+        return key == shown or f" {key} " in f" {shown} "
+
+    def set_override(self, display_name, first_name=None, last_name=None):
+        """Persist a hand-corrected first and/or last name for a contact"""
+        with self._lock:
+            overrides = dict(self._load_overrides())
+            key = normalize_key(display_name)
+            override = dict(overrides.get(key, {}))
+            if first_name is not None:
+                override['first_name'] = first_name.strip()
+            if last_name is not None:
+                override['last_name'] = last_name.strip()
+            overrides[key] = override
+            atomic_write_json(self.path, {'overrides': overrides})
+            self._overrides = overrides
+            self._cache = {}
+        return self.lookup(display_name)
+
+    def remove_override(self, display_name):
+        with self._lock:
+            overrides = dict(self._load_overrides())
+            if overrides.pop(normalize_key(display_name), None) is None:
+                return False
+            atomic_write_json(self.path, {'overrides': overrides})
+            self._overrides = overrides
+            self._cache = {}
+        return True
+
+# One directory per process, shared by the categorizer and the responder
+_directory = None
+
+def get_directory():
+    global _directory
+    if _directory is None:
+        _directory = ContactDirectory()
+    return _directory
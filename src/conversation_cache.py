@@ -0,0 +1,98 @@
+import threading
+import time
+from src.conversation_model import ConversationRecord
+
+DEFAULT_TTL = 10  # seconds before a refresh from LinkedIn is due
+
+class ConversationCache:
+    """Thread-safe, versioned in-memory list of conversation records.
+
+    Writers build a new tuple under an RLock and publish it with a single
+    reference swap (copy-on-write), so readers take snapshot() without
+    locking and never observe a half-updated list. Records are never
+    mutated once published: updates replace them with modified copies.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._conversations = None  # tuple of ConversationRecord, None until first load
+        self._versions = {}  # lowercased sender name -> entry version
+        self.version = 0
+        self.last_fetched = 0
+
+    def snapshot(self):
+        """Current conversations as an immutable tuple, or None if never loaded"""
+        return self._conversations
+
+    def is_loaded(self):
+        return self._conversations is not None
+
+    def is_fresh(self, now=None):
+        """Loaded and younger than the TTL"""
+        now = time.time() if now is None else now
+        return self._conversations is not None and now - self.last_fetched < self.ttl
+
+    def get(self, sender_name):
+        name = sender_name.lower()
+        for conv in self._conversations or ():
+            if conv.sender_name.lower() == name:
+                return conv
+        return None
+
+    def entry_version(self, sender_name):
+        return self._versions.get(sender_name.lower(), 0)
+
+    def _publish(self, conversations, changed_names):
+        self.version += 1
+        for name in changed_names:
+            self._versions[name] = self.version
+        self._conversations = tuple(conversations)
+
+    def replace(self, conversations, fetched_at=None):
+        """Swap in a complete conversation list; returns the new snapshot"""
+        records = [ConversationRecord.from_api(conv) for conv in conversations]
+        with self._lock:
+            self._publish(records, [record.sender_name.lower() for record in records])
+            self.last_fetched = time.time() if fetched_at is None else fetched_at
+            return self._conversations
+
+    def upsert(self, conversation):
+        """Replace the conversation from the same sender, or append it; returns the record"""
+        record = ConversationRecord.from_api(conversation)
+        name = record.sender_name.lower()
+        with self._lock:
+            conversations = list(self._conversations or ())
+            for pos, existing in enumerate(conversations):
+                if existing.sender_name.lower() == name:
+                    conversations[pos] = record
+                    break
+            else:
+                conversations.append(record)
+            self._publish(conversations, [name])
+            self.last_fetched = time.time()
+        return record
+
+    def update(self, sender_name, changes):
+        """Publish a copy of a cached conversation with fields changed; returns it or None"""
+        name = sender_name.lower()
+        with self._lock:
+            conversations = list(self._conversations or ())
+            for pos, existing in enumerate(conversations):
+                if existing.sender_name.lower() == name:
+                    record = existing.copy()
+                    for key, value in changes.items():
+                        record[key] = value
+                    conversations[pos] = record
+                    self._publish(conversations, [name])
+                    return record
+        return None
+
+    def status(self):
+        conversations = self._conversations
+        return {
+            'conversations': len(conversations) if conversations is not None else 0,
+            'version': self.version,
+            'age_seconds': round(time.time() - self.last_fetched, 1) if conversations is not None else None,
+            'ttl': self.ttl
+        }
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+from datetime import datetime
+from src.message_categorizer import MessageCategorizer
+from src.conversation_store import atomic_write_json
+from src.response_template import MissingTemplateValue, compile_template, name_values
+
+INDEX_FILE = 'data/conversation_index.json'
+
+# One lock for every index instance in the process: the index is a single
+# file and each update is a read-modify-write of it
+_index_lock = threading.Lock()
+
+class ConversationIndex:
+    """Derived per-conversation index of category and reply status.
+
+    Entries are keyed by lowercased sender name and rebuilt from a
+    conversation whenever it is written, so readers never need to
+    re-categorize messages or consult the message history.
+    """
+
+    def __init__(self, index_path=INDEX_FILE):
+        self.index_path = index_path
+        self._categorizer = None
+
+    @property
+    def categorizer(self):
+        # Templates are only loaded once something actually gets indexed
+        if self._categorizer is None:
+            self._categorizer = MessageCategorizer()
+        return self._categorizer
+
+    def exists(self):
+        return os.path.exists(self.index_path)
+
+    def load(self):
+        """Load all index entries keyed by lowercased sender name"""
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read conversation index: {e}")
+            return {}
+
+    def _save(self, entries):
+        atomic_write_json(self.index_path, entries)
+
+    def build_entry(self, conversation_data):
+        """Build an index entry from a conversation (file or API format)"""
+        sender_name = conversation_data.get('sender_name', '')
+        messages = conversation_data.get('messages')
+        if messages is None:
+            messages = conversation_data.get('all_messages', [])
+
+        # Position of our last outbound and their last inbound message
+        last_received_pos = None
+        last_sent_pos = None
+        for pos in range(len(messages) - 1, -1, -1):
+            if messages[pos].get('is_sent', False):
+                if last_sent_pos is None:
+                    last_sent_pos = pos
+            elif last_received_pos is None:
+                last_received_pos = pos
+            if last_sent_pos is not None and last_received_pos is not None:
+                break
+
+        entry = {
+            'sender_name': sender_name,
+            'is_unread': conversation_data.get('is_unread', False),
+            'category': None,
+            'matched_keyword': None,
+            'last_received_message': '',
+            'last_received_timestamp': '',
+            'replied': False,
+            'awaiting_reply': False,
+            'pending_response': None,
+            'thread_url': conversation_data.get('thread_url'),
+            'indexed_at': datetime.now().isoformat()
+        }
+
+        if last_received_pos is None:
+            return entry
+
+        last_received = messages[last_received_pos]
+        message_text = last_received.get('message', '')
+        replied = last_sent_pos is not None and last_sent_pos > last_received_pos
+        categorization = self.categorizer.categorize_message(message_text)
+
+        entry.update({
+            'category': categorization['category'],
+            'matched_keyword': categorization['matched_keyword'],
+            'last_received_message': message_text,
+            'last_received_timestamp': last_received.get('timestamp', ''),
+            'replied': replied,
+            'awaiting_reply': not replied
+        })
+
+        # HR name placeholders are left in place and filled in at read time
+        if not replied and categorization['template']:
+            entry['pending_response'] = self.categorizer.prefill_response(
+                categorization['template'],
+                name_values(sender_name)
+            )
+
+        return entry
+
+    def update(self, conversation_data):
+        """Re-index a single conversation after it has been written"""
+        self.update_many([conversation_data])
+
+    def update_many(self, conversations):
+        """Re-index several conversations with a single index write"""
+        new_entries = {}
+        for conv in conversations:
+            try:
+                entry = self.build_entry(conv)
+                new_entries[entry['sender_name'].lower()] = entry
+            except Exception as e:
+                print(f"⚠️ Could not index {conv.get('sender_name', 'Unknown')}: {e}")
+        if not new_entries:
+            return
+        with _index_lock:
+            entries = self.load()
+            # A thread URL stays known when a write does not carry one
+            for name, entry in new_entries.items():
+                if not entry.get('thread_url') and entries.get(name, {}).get('thread_url'):
+                    entry['thread_url'] = entries[name]['thread_url']
+            entries.update(new_entries)
+            try:
+                self._save(entries)
+            except Exception as e:
+                print(f"⚠️ Could not write conversation index: {e}")
+
+    def mark_replied(self, sender_name):
+        """Record that we have just replied to a conversation"""
+        with _index_lock:
+            entries = self.load()
+            entry = entries.get(sender_name.lower())
+            if entry is None:
+                return
+            entry.update({
+                'replied': True,
+                'awaiting_reply': False,
+                'pending_response': None,
+                'indexed_at': datetime.now().isoformat()
+            })
+            self._save(entries)
+
+    def rebuild(self, conversations):
+        """Replace the whole index with entries for the given conversations"""
+        entries = {}
+        for conv in conversations:
+            try:
+                entry = self.build_entry(conv)
+                entries[entry['sender_name'].lower()] = entry
+            except Exception as e:
+                print(f"⚠️ Could not index {conv.get('sender_name', 'Unknown')}: {e}")
+        with _index_lock:
+            self._save(entries)
+        print(f"🗂️ Rebuilt conversation index with {len(entries)} conversations")
+        return entries
+
+    def thread_url(self, sender_name):
+        """Known LinkedIn thread URL of a conversation, or None"""
+        return self.load().get(sender_name.lower(), {}).get('thread_url')
+
+    def awaiting_reply(self, hr_name=None, categories=None):
+        """Conversations awaiting a reply, grouped by category"""
+        grouped = {}
+        for entry in self.load().values():
+            if not entry.get('awaiting_reply'):
+                continue
+            category = entry.get('category') or 'uncategorized'
+            if categories and category not in categories:
+                continue
+            item = dict(entry)
+            if hr_name and item.get('pending_response'):
+                try:
+                    item['pending_response'] = apply_hr_name(item['pending_response'], hr_name)
+                except MissingTemplateValue as e:
+                    # Never hand out a reply that still shows a placeholder
+                    item['pending_response'] = None
+                    item['missing_value'] = e.args[0]
+            grouped.setdefault(category, []).append(item)
+        return grouped
+
+def apply_hr_name(text, hr_name):
+    """Fill the HR name placeholders left in an indexed response.
+
+    Raises MissingTemplateValue if any other placeholder is still unfilled.
+    """
+    return compile_template(text).render({'hrName': hr_name})
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import re
+from urllib.parse import unquote
+from src.atomic_io import atomic_write_json
+from src.contact_directory import normalize_key
+
+MANIFEST_FILE = '_manifest.json'
+MANIFEST_VERSION = 1
+THREAD_URL_RE = re.compile(r'/messaging/thread/([^/?#]+)')
+# Thread id inside a conversation URN, e.g.
+# urn:li:msg_conversation:(urn:li:fsd_profile:ACoAA...,2-ZmE3...)
+THREAD_URN_RE = re.compile(r',(2-[^,()]+)\)')
+
+def normalize_thread_id(value):
+    """The '2-...' thread part of a conversation URN, thread URL or bare thread id"""
+    value = unquote(str(value or '')).strip()
+    match = THREAD_URN_RE.search(value) or THREAD_URL_RE.search(value)
+    return match.group(1) if match else (value or None)
+
+def thread_id_of(conversation):
+    """LinkedIn thread id of a conversation (either schema), or None"""
+    return normalize_thread_id(conversation.get('conversation_id') or conversation.get('thread_url'))
+
+def _digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+class ConversationManifest:
+    """Stable conversation ids and the file that maps them back to contacts.
+
+    A conversation's id is taken from its LinkedIn thread when that is
+    known the first time it is stored, otherwise from a hash of the
+    normalized sender name, and never changes afterwards. The conversation
+    lives in <id>.json; _manifest.json maps each id to its display name and
+    sidebar position, and lookups by name, normalized name or thread are
+    plain dict accesses.
+    """
+
+    def __init__(self, conversations_dir):
+        self.path = os.path.join(conversations_dir, MANIFEST_FILE)
+        self.entries = {}    # id -> {'sender_name', 'key', 'thread_id', 'order'}
+        self._by_name = {}
+        self._by_key = {}
+        self._by_thread = {}
+        self.load()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f).get('conversations', {})
+            except Exception as e:
+                print(f"⚠️ Could not read conversation manifest: {e}")
+        self.entries = {}
+        self._by_name, self._by_key, self._by_thread = {}, {}, {}
+        for conversation_id, entry in entries.items():
+            # Older manifests may hold the whole conversation URN
+            entry['thread_id'] = normalize_thread_id(entry.get('thread_id'))
+            self._add(conversation_id, entry)
+
+    def save(self):
+        atomic_write_json(self.path, {'version': MANIFEST_VERSION, 'conversations': self.entries})
+
+    def _add(self, conversation_id, entry):
+        self.entries[conversation_id] = entry
+        self._by_name[entry['sender_name']] = conversation_id
+        for alias in entry.get('aliases', []):
+            self._by_name.setdefault(alias, conversation_id)
+        self._by_key.setdefault(entry['key'], conversation_id)
+        if entry.get('thread_id'):
+            self._by_thread[entry['thread_id']] = conversation_id
+
+    def resolve(self, sender_name, thread_id=None):
+        """Id of a stored conversation, or None if it has never been stored"""
+        if thread_id and thread_id in self._by_thread:
+            return self._by_thread[thread_id]
+        conversation_id = self._by_name.get(sender_name) or self._by_key.get(normalize_key(sender_name))
+        if conversation_id is not None and thread_id:
+            known_thread = self.entries[conversation_id].get('thread_id')
+            if known_thread and known_thread != thread_id:
+                return None  # someone else with the same name
+        return conversation_id
+
+    def id_for(self, sender_name, thread_id=None):
+        """Id a conversation has or would get if stored now"""
+        return self.resolve(sender_name, thread_id) or self._new_id(sender_name, thread_id)
+
+    def _new_id(self, sender_name, thread_id=None):
+        base = f"t-{_digest(thread_id)}" if thread_id else f"n-{_digest(normalize_key(sender_name) or 'unknown')}"
+        conversation_id, suffix = base, 1
+        # Ids are never shared, even if two hashes ever met
+        while conversation_id in self.entries:
+            suffix += 1
+            conversation_id = f"{base}-{suffix}"
+        return conversation_id
+
+    def assign(self, sender_name, thread_id=None):
+        """Id for a conversation being stored; returns (id, whether the manifest changed)"""
+        conversation_id = self.resolve(sender_name, thread_id)
+        if conversation_id is None:
+            conversation_id = self._new_id(sender_name, thread_id)
+            self._add(conversation_id, {'sender_name': sender_name, 'key': normalize_key(sender_name),
+                                        'thread_id': thread_id, 'order': None})
+            return conversation_id, True
+        entry = self.entries[conversation_id]
+        changed = False
+        if entry['sender_name'] != sender_name:
+            # Same person under a new display name: remember both spellings
+            aliases = [alias for alias in entry.get('aliases', []) if alias != sender_name]
+            entry['aliases'] = aliases + [entry['sender_name']]
+            entry['sender_name'] = sender_name
+            self._by_name[sender_name] = conversation_id
+            changed = True
+        if thread_id and not entry.get('thread_id'):
+            entry['thread_id'] = thread_id
+            self._by_thread[thread_id] = conversation_id
+            changed = True
+        return conversation_id, changed
+
+    def set_order(self, sender_names):
+        """Record the sidebar order; conversations not listed keep no position"""
+        positions = {}
+        for position, name in enumerate(sender_names):
+            conversation_id = self.resolve(name)
+            if conversation_id is not None and conversation_id not in positions:
+                positions[conversation_id] = position
+        for conversation_id, entry in self.entries.items():
+            entry['order'] = positions.get(conversation_id)
+
+    def ordered_ids(self):
+        """Ids in sidebar order, then the unordered ones by name"""
+        return sorted(self.entries, key=lambda cid: (
+            self.entries[cid]['order'] is None,
+            self.entries[cid]['order'] if self.entries[cid]['order'] is not None else 0,
+            self.entries[cid]['sender_name'].lower()
+        ))
+
+    def ordered_names(self):
+        return [self.entries[cid]['sender_name'] for cid in self.ordered_ids()
+                if self.entries[cid]['order'] is not None]
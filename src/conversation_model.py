@@ -0,0 +1,197 @@
+import sys
+
+API_FIELDS = ('sender_name', 'is_unread', 'unread_count', 'message_count', 'all_messages',
+              'fetch_time', 'last_received_message', 'last_message', 'last_message_sent', 'index')
+
+class ConversationRecord:
+    """Compact in-memory conversation shared by the cache and sync progress.
+
+    Messages are kept column-wise (a bytearray of sent flags plus tuples of
+    texts and interned timestamps) instead of one dict per message, and the
+    sender name is interned. The record still reads like the API dict
+    (conv['sender_name'], conv.get('is_unread')) and to_api() produces the
+    exact JSON shape served to the frontend.
+
+    When a body cache is configured, only the summary fields stay on the
+    record and the message block lives in that LRU, reloaded on demand.
+    """
+
+    __slots__ = ('sender_name', 'is_unread', 'unread_count', 'message_count', 'fetch_time',
+                 'last_received_message', 'last_message', 'last_message_sent', 'index', '_columns')
+
+    # MessageBodyCache holding message blocks; None keeps them on the record
+    body_cache = None
+
+    def __init__(self, sender_name, is_unread=False, messages=None, fetch_time='',
+                 last_received_message=None, unread_count=None, index=None, message_count=0,
+                 last_message=None, last_message_sent=False):
+        self.sender_name = sys.intern(sender_name or '')
+        self.is_unread = bool(is_unread)
+        self.unread_count = unread_count
+        self.fetch_time = fetch_time or ''
+        self.index = index
+        self._columns = None
+        if messages is not None:
+            self.set_messages(messages)
+        else:
+            # Summary only: the body is loaded from the store when needed
+            self.message_count = message_count
+            self.last_received_message = ''
+            self.last_message = ''
+            self.last_message_sent = False
+        if last_received_message is not None:
+            self.last_received_message = last_received_message
+        # Only summaries take the latest message from the caller; with messages it is derived
+        if messages is None and last_message is not None:
+            self.last_message = last_message
+            self.last_message_sent = bool(last_message_sent)
+
+    @classmethod
+    def from_api(cls, conversation):
+        """Build a record from an API-format dict (records are returned as is)"""
+        if isinstance(conversation, cls):
+            return conversation
+        messages = conversation.get('all_messages')
+        if messages is None:
+            messages = conversation.get('messages', ())
+        return cls(
+            conversation.get('sender_name', ''),
+            is_unread=conversation.get('is_unread', False),
+            messages=messages,
+            fetch_time=conversation.get('fetch_time', ''),
+            last_received_message=conversation.get('last_received_message'),
+            unread_count=conversation.get('unread_count'),
+            index=conversation.get('index')
+        )
+
+    @classmethod
+    def from_file(cls, data, index=None):
+        """Build a record from the individual file schema ('messages' may be absent for a summary)"""
+        return cls(
+            data.get('sender_name', ''),
+            is_unread=data.get('is_unread', False),
+            messages=data.get('messages'),
+            fetch_time=data.get('fetch_time', ''),
+            last_received_message=data.get('last_received_message', ''),
+            index=index,
+            message_count=data.get('total_messages', 0),
+            last_message=data.get('last_message'),
+            last_message_sent=data.get('last_message_sent', False)
+        )
+
+    def copy(self):
+        """Shallow copy sharing the (immutable) message block"""
+        clone = object.__new__(ConversationRecord)
+        for slot in self.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        return clone
+
+    def set_messages(self, messages):
+        columns = pack_messages(messages)
+        sent, texts, _ = columns
+        self.message_count = len(texts)
+        # Derived unless the caller supplies one
+        self.last_received_message = ''
+        for pos in range(len(sent) - 1, -1, -1):
+            if not sent[pos]:
+                self.last_received_message = texts[pos]
+                break
+        self.last_message = texts[-1] if texts else ''
+        self.last_message_sent = bool(sent[-1]) if sent else False
+        if self.body_cache is not None:
+            self.body_cache.put(self.sender_name, columns)
+            self._columns = None
+        else:
+            self._columns = columns
+
+    def _message_columns(self):
+        if self._columns is not None:
+            return self._columns
+        if self.body_cache is not None:
+            columns = self.body_cache.get(self.sender_name)
+            if columns is not None:
+                return columns
+        return EMPTY_COLUMNS
+
+    def messages(self):
+        """Message dicts in API order, built on demand"""
+        sent, texts, stamps = self._message_columns()
+        return [
+            {'is_sent': bool(flag), 'message': text, 'timestamp': stamp, 'message_index': pos}
+            for pos, (flag, text, stamp) in enumerate(zip(sent, texts, stamps))
+        ]
+
+    def to_api(self, include_messages=True):
+        """The conversation in the JSON shape served by the API"""
+        api = {
+            'sender_name': self.sender_name,
+            'is_unread': self.is_unread,
+            'message_count': self.message_count
+        }
+        if include_messages:
+            api['all_messages'] = self.messages()
+        api.update({
+            'fetch_time': self.fetch_time,
+            'last_received_message': self.last_received_message,
+            'last_message': self.last_message,
+            'last_message_sent': self.last_message_sent
+        })
+        if self.unread_count is not None:
+            api['unread_count'] = self.unread_count
+        if self.index is not None:
+            api['index'] = self.index
+        return api
+
+    # Read/write access with the API dict's keys, so callers can treat a
+    # record like the dicts it replaces
+
+    def __getitem__(self, key):
+        if key == 'all_messages':
+            return self.messages()
+        if key not in API_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key == 'all_messages':
+            self.set_messages(value)
+        elif key in API_FIELDS:
+            setattr(self, key, sys.intern(value) if key == 'sender_name' else value)
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in API_FIELDS and (key not in ('unread_count', 'index') or getattr(self, key) is not None)
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self[key]
+
+    def keys(self):
+        return [key for key in API_FIELDS if key in self]
+
+    def __repr__(self):
+        return f"ConversationRecord({self.sender_name!r}, {self.message_count} messages)"
+
+EMPTY_COLUMNS = (bytearray(), (), ())
+
+def pack_messages(messages):
+    """Message dicts as a (sent flags, texts, interned timestamps) block"""
+    return (
+        bytearray(1 if m.get('is_sent', False) else 0 for m in messages),
+        tuple(m.get('message', '') for m in messages),
+        tuple(sys.intern(m.get('timestamp') or '') for m in messages)
+    )
+
+def replace_or_append(conversations, conversation):
+    """New list with the conversation replacing the one from the same sender, or appended"""
+    record = ConversationRecord.from_api(conversation)
+    updated = list(conversations or [])
+    name = record.sender_name.lower()
+    for pos, existing in enumerate(updated):
+        if existing['sender_name'].lower() == name:
+            updated[pos] = record
+            return updated
+    updated.append(record)
+    return updated
@@ -0,0 +1,347 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from src.conversation_store import atomic_write_bytes
+
+SNAPSHOT_FILE = 'data/conversations.snap'
+MAGIC = b'LKCV'
+SCHEMA_VERSION = 3
+SEPARATOR = '\x00'  # between strings in a blob; lengths are kept as well
+
+# magic, schema version, record count
+_HEADER = struct.Struct('<4sHI')
+# record length (excluding this prefix)
+_RECORD_PREFIX = struct.Struct('<I')
+# size and mtime of the source JSON file, record flags, message count,
+# meta bytes, message text bytes, timestamp bytes, message id bytes
+_RECORD_HEAD = struct.Struct('<QQBIIIII')
+
+# String fields stored per conversation, in order
+_META_FIELDS = ('filename', 'sender_name', 'conversation_preview', 'fetch_time', 'last_received_message',
+                'thread_url', 'conversation_id', 'sidebar_fingerprint', 'last_message', '_extra')
+# Left out of a decoded record when empty, as in the JSON files
+_OPTIONAL_FIELDS = ('thread_url', 'conversation_id', 'sidebar_fingerprint')
+# Stored in the record head or message block rather than as meta strings
+_RECORD_FIELDS = set(_META_FIELDS) | {'is_unread', 'total_messages', 'messages'}
+# Summary-only fields derived from the messages, dropped once the messages are decoded
+_DERIVED_FIELDS = ('last_message', 'last_message_sent')
+
+# Record flag bits
+_UNREAD = 1
+_LAST_SENT = 2  # the latest message is one we sent
+
+# Per-message flag bits
+_SENT = 1
+_HAS_ID = 2  # message_id and delivered_at keys present (network-captured message)
+_HAS_DELIVERED = 4  # delivered_at is not None
+
+def _uint_array(values=()):
+    arr = array('I', values)
+    if arr.itemsize != 4:
+        arr = array('L', values)
+    return arr
+
+def _pack_lengths(values):
+    arr = _uint_array(values)
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr.tobytes()
+
+def _unpack_lengths(buf, count):
+    arr = _uint_array()
+    arr.frombytes(buf[:count * 4])
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+def _join(values):
+    return SEPARATOR.join(values).encode('utf-8')
+
+def _split(blob, lengths):
+    """Decode a joined blob once and split it back into its strings"""
+    text = blob.decode('utf-8')
+    if not lengths:
+        return []
+    parts = text.split(SEPARATOR)
+    if len(parts) == len(lengths):
+        return parts
+    # A value contained the separator itself: fall back to the length table
+    values, start = [], 0
+    for length in lengths:
+        values.append(text[start:start + length])
+        start += length + 1
+    return values
+
+def source_stamp(filepath):
+    """(size, mtime) of a JSON conversation file, used to tell if a record is stale"""
+    st = os.stat(filepath)
+    return st.st_size, st.st_mtime_ns
+
+def _message_flags(message):
+    flags = _SENT if message.get('is_sent') else 0
+    if 'message_id' in message:
+        flags |= _HAS_ID
+        if message.get('delivered_at') is not None:
+            flags |= _HAS_DELIVERED
+    return flags
+
+def encode_conversation(filename, data, stamp=(0, 0)):
+    """Encode one conversation (individual file schema) as a length-prefixed record"""
+    # Any field the snapshot has no slot for rides along as JSON
+    extra = {key: value for key, value in data.items() if key not in _RECORD_FIELDS}
+    messages = data.get('messages', [])
+    last = messages[-1] if messages else {}
+    # The latest message, sent or received, so list views need no message bodies
+    derived = {'last_message': last.get('message', '') or ''}
+    meta_values = [filename] + [str(derived.get(field, data.get(field)) or '') for field in _META_FIELDS[1:-1]]
+    meta_values.append(json.dumps(extra, ensure_ascii=False) if extra else '')
+    meta = _join(meta_values)
+
+    flags = bytes(_message_flags(m) for m in messages)
+    texts = [m.get('message', '') or '' for m in messages]
+    stamps = [m.get('timestamp', '') or '' for m in messages]
+    text_blob = _join(texts)
+    stamp_blob = _join(stamps)
+    parts = [
+        None,
+        _pack_lengths(len(v) for v in meta_values),
+        meta,
+        flags,
+        _pack_lengths(len(t) for t in texts),
+        _pack_lengths(len(t) for t in stamps),
+        text_blob,
+        stamp_blob
+    ]
+    id_blob = b''
+    if any(flag & _HAS_ID for flag in flags):
+        ids = [m.get('message_id') or '' for m in messages]
+        id_blob = _join(ids)
+        parts.append(_pack_lengths(len(i) for i in ids))
+        parts.append(id_blob)
+        parts.append(struct.pack(f'<{len(messages)}q', *(m.get('delivered_at') or 0 for m in messages)))
+    record_flags = (_UNREAD if data.get('is_unread') else 0) | (_LAST_SENT if last.get('is_sent') else 0)
+    parts[0] = _RECORD_HEAD.pack(stamp[0], stamp[1], record_flags,
+                                 len(messages), len(meta), len(text_blob), len(stamp_blob), len(id_blob))
+    body = b''.join(parts)
+    return _RECORD_PREFIX.pack(len(body)) + body
+
+def _with_messages(summary, messages):
+    """A summary turned back into the individual file schema"""
+    for field in _DERIVED_FIELDS:
+        summary.pop(field, None)
+    summary['messages'] = messages
+    return summary
+
+class ConversationSnapshot:
+    """Single-file binary snapshot of every stored conversation.
+
+    Records are length-prefixed and each keeps its messages in one block
+    (flags, length tables, text, then LinkedIn ids and delivery times for
+    captured messages), so summaries can be read from
+    a memory map without decoding any message bodies. The header carries a
+    schema version and each record the size and mtime of the JSON file it
+    was built from; the JSON files stay the source of truth.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        self._file = None
+        self._map = None
+        self.count = 0
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def write(self, records, stamps=None):
+        """Write (filename, data) pairs atomically; returns the record count"""
+        records = list(records)
+        stamps = stamps or {}
+        parts = [_HEADER.pack(MAGIC, SCHEMA_VERSION, len(records))]
+        parts.extend(encode_conversation(filename, data, stamps.get(filename, (0, 0))) for filename, data in records)
+        atomic_write_bytes(self.path, b''.join(parts))
+        return len(records)
+
+    def open(self):
+        """Memory-map the snapshot and validate its header"""
+        self.close()
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count = _HEADER.unpack_from(self._map, 0)
+        except (ValueError, struct.error, OSError) as e:
+            self.close()
+            raise ValueError(f"Unreadable conversation snapshot: {e}")
+        if magic != MAGIC or version != SCHEMA_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported conversation snapshot (schema {version})")
+        self.count = count
+        return self
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open() if self._map is None else self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def summaries(self):
+        """Yield conversation metadata without decoding message bodies.
+
+        Each summary carries a '_messages_at' offset for messages_at(), the
+        '_source' stamp of the JSON file it was built from, and the latest
+        message as 'last_message' and 'last_message_sent'.
+        """
+        buf = self._map
+        pos = _HEADER.size
+        for _ in range(self.count):
+            (length,) = _RECORD_PREFIX.unpack_from(buf, pos)
+            start = pos + _RECORD_PREFIX.size
+            size, mtime_ns, record_flags, n_messages, meta_len, _, _, _ = _RECORD_HEAD.unpack_from(buf, start)
+            cursor = start + _RECORD_HEAD.size
+            meta_lengths = _unpack_lengths(buf[cursor:cursor + 4 * len(_META_FIELDS)], len(_META_FIELDS))
+            cursor += 4 * len(_META_FIELDS)
+            meta = _split(buf[cursor:cursor + meta_len], meta_lengths)
+            summary = dict(zip(_META_FIELDS, meta))
+            extra = summary.pop('_extra')
+            for field in _OPTIONAL_FIELDS:
+                if not summary[field]:
+                    del summary[field]
+            if extra:
+                summary.update(json.loads(extra))
+            summary['is_unread'] = bool(record_flags & _UNREAD)
+            summary['last_message_sent'] = bool(record_flags & _LAST_SENT)
+            summary['total_messages'] = n_messages
+            summary['_messages_at'] = start
+            summary['_source'] = (size, mtime_ns)
+            yield summary
+            pos = start + length
+
+    def messages_at(self, offset):
+        """Decode the message list of the record starting at offset"""
+        buf = self._map
+        _, _, _, n, meta_len, text_len, stamp_len, id_len = _RECORD_HEAD.unpack_from(buf, offset)
+        cursor = offset + _RECORD_HEAD.size + 4 * len(_META_FIELDS) + meta_len
+        flags = buf[cursor:cursor + n]
+        cursor += n
+        text_lengths = _unpack_lengths(buf[cursor:cursor + 4 * n], n)
+        cursor += 4 * n
+        stamp_lengths = _unpack_lengths(buf[cursor:cursor + 4 * n], n)
+        cursor += 4 * n
+        texts = _split(buf[cursor:cursor + text_len], text_lengths)
+        cursor += text_len
+        stamps = _split(buf[cursor:cursor + stamp_len], stamp_lengths)
+        if not id_len and (not flags or max(flags) <= _SENT):
+            return [
+                {'is_sent': flag == _SENT, 'message': text, 'timestamp': stamp}
+                for flag, text, stamp in zip(flags, texts, stamps)
+            ]
+        cursor += stamp_len
+        id_lengths = _unpack_lengths(buf[cursor:cursor + 4 * n], n)
+        cursor += 4 * n
+        ids = _split(buf[cursor:cursor + id_len], id_lengths)
+        cursor += id_len
+        delivered = struct.unpack_from(f'<{n}q', buf, cursor)
+        messages = []
+        for flag, text, stamp, message_id, delivered_at in zip(flags, texts, stamps, ids, delivered):
+            message = {'is_sent': bool(flag & _SENT), 'message': text, 'timestamp': stamp}
+            if flag & _HAS_ID:
+                message['message_id'] = message_id
+                message['delivered_at'] = delivered_at if flag & _HAS_DELIVERED else None
+            messages.append(message)
+        return messages
+
+    def load(self):
+        """Decode every conversation; returns {filename: data in the individual file schema}"""
+        conversations = {}
+        with self:
+            for summary in self.summaries():
+                offset = summary.pop('_messages_at')
+                filename = summary.pop('filename')
+                summary.pop('_source')
+                conversations[filename] = _with_messages(summary, self.messages_at(offset))
+        return conversations
+
+    def load_files(self, conversations_dir, filenames, with_messages=True):
+        """Load conversation files, decoding unchanged ones from the snapshot.
+
+        Files whose size or mtime differ from their record are parsed as
+        JSON, and the snapshot is rewritten whenever anything changed.
+        With with_messages=False, conversations served from the snapshot
+        are summaries without a 'messages' list.
+        Returns {filename: data in the individual file schema}.
+        """
+        stamps = {}
+        for filename in filenames:
+            try:
+                stamps[filename] = source_stamp(os.path.join(conversations_dir, filename))
+            except OSError:
+                continue
+
+        conversations = {}
+        offsets = {}
+        if self.exists():
+            try:
+                self.open()
+                for summary in self.summaries():
+                    filename = summary.pop('filename')
+                    if stamps.get(filename) != summary.pop('_source'):
+                        continue
+                    offsets[filename] = summary.pop('_messages_at')
+                    conversations[filename] = summary
+            except (ValueError, OSError, struct.error) as e:
+                print(f"⚠️ Ignoring conversation snapshot: {e}")
+                self.close()
+                conversations, offsets = {}, {}
+
+        stale = [filename for filename in stamps if filename not in conversations]
+        rewrite = bool(stale) or len(conversations) != self.count
+        try:
+            # Rewriting needs every body, so decode them even for a summary load
+            if with_messages or rewrite:
+                for filename, offset in offsets.items():
+                    conversations[filename] = _with_messages(conversations[filename], self.messages_at(offset))
+        finally:
+            self.close()
+
+        for filename in stale:
+            try:
+                with open(os.path.join(conversations_dir, filename), 'r', encoding='utf-8') as f:
+                    conversations[filename] = json.load(f)
+            except Exception as e:
+                print(f"❌ Error loading {filename}: {str(e)}")
+                stamps.pop(filename, None)
+
+        if rewrite:
+            try:
+                self.write(((filename, conversations[filename]) for filename in stamps), stamps)
+            except Exception as e:
+                print(f"⚠️ Could not update conversation snapshot: {e}")
+        return conversations
+
+def convert_json_dir(conversations_dir='data/conversations', snapshot_path=SNAPSHOT_FILE):
+    """Build a snapshot from the JSON conversation files; returns the record count"""
+    filenames = [f for f in os.listdir(conversations_dir) if f.endswith('.json') and not f.startswith('_')]
+    snapshot = ConversationSnapshot(snapshot_path)
+    if snapshot.exists():
+        os.remove(snapshot_path)
+    return len(snapshot.load_files(conversations_dir, sorted(filenames)))
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert JSON conversation files to a binary snapshot")
+    parser.add_argument('--dir', default='data/conversations')
+    parser.add_argument('--out', default=SNAPSHOT_FILE)
+    args = parser.parse_args()
+    count = convert_json_dir(args.dir, args.out)
+    print(f"✅ Wrote {count} conversations to {args.out}")
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from src.atomic_io import atomic_write_bytes, atomic_write_json
+from src.conversation_manifest import ConversationManifest, thread_id_of
+
+JOURNAL_FILE = '_journal.jsonl'
+LEGACY_ORDER_FILE = '_order.json'
+DUPLICATES_DIR = '_duplicates'
+CHECKPOINT_EVERY = 50  # journaled writes between file fsyncs
+
+# Journal and checkpoint state is shared by every store on the same directory
+_dir_states = {}
+_dir_states_lock = threading.Lock()
+
+def _state_for(conversations_dir):
+    key = os.path.abspath(conversations_dir)
+    with _dir_states_lock:
+        if key not in _dir_states:
+            _dir_states[key] = {'lock': threading.RLock(), 'pending': set()}
+        return _dir_states[key]
+
+def sidebar_fingerprint(preview_snippet, timestamp, unread_count):
+    """Fingerprint of a sidebar entry; empty if the sidebar showed nothing to compare"""
+    if not preview_snippet and not timestamp:
+        return ''
+    raw = f"{preview_snippet}\0{timestamp}\0{unread_count or 0}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+def _file_message(message):
+    data = {
+        'is_sent': message.get('is_sent', False),
+        'message': message.get('message', ''),
+        'timestamp': message.get('timestamp', '')
+    }
+    # LinkedIn's own id and epoch time, when the message came from network capture
+    if message.get('message_id'):
+        data['message_id'] = message['message_id']
+        data['delivered_at'] = message.get('delivered_at')
+    return data
+
+def build_individual_data(conversation, fetch_time=None):
+    """Convert a conversation (API or file format) to the individual file schema"""
+    messages = conversation.get('all_messages')
+    if messages is None:
+        messages = conversation.get('messages', [])
+
+    # Find last received (incoming) message for preview
+    last_received = ""
+    for msg in reversed(messages):
+        if not msg.get('is_sent', False):
+            last_received = msg.get('message', '')
+            break
+
+    data = {
+        'sender_name': conversation.get('sender_name', ''),
+        'is_unread': conversation.get('is_unread', False),
+        'conversation_preview': (last_received[:100] + "...") if len(last_received) > 100 else last_received,
+        'total_messages': len(messages),
+        'messages': [_file_message(m) for m in messages],
+        'fetch_time': fetch_time or conversation.get('fetch_time') or datetime.now().isoformat(),
+        'last_received_message': last_received
+    }
+    # Sidebar state at fetch time, so the next sync can skip unchanged threads
+    if conversation.get('sidebar_fingerprint'):
+        data['sidebar_fingerprint'] = conversation['sidebar_fingerprint']
+    if conversation.get('thread_url'):
+        data['thread_url'] = conversation['thread_url']
+    if conversation.get('conversation_id'):
+        data['conversation_id'] = conversation['conversation_id']
+    return data
+
+class ConversationStore:
+    """Single write path for individual conversation files.
+
+    Every write goes to a temp file that is renamed over the target, so a
+    crash never leaves a truncated conversation behind. Each batch is first
+    appended to a journal with one fsync; the conversation files themselves
+    are only fsynced at checkpoints, after which the journal is truncated.
+    Any journal left over from a crash is replayed on startup.
+
+    Files are named by stable conversation id (see ConversationManifest),
+    so different contacts never share a file and every name, thread or
+    order lookup is answered from the manifest without listing the folder.
+    """
+
+    def __init__(self, conversations_dir='data/conversations', index=None):
+        self.conversations_dir = conversations_dir
+        self.journal_path = os.path.join(conversations_dir, JOURNAL_FILE)
+        self.index = index
+        self._state = _state_for(conversations_dir)
+        with self._state['lock']:
+            if 'manifest' not in self._state:
+                self._state['manifest'] = ConversationManifest(conversations_dir)
+        self.manifest = self._state['manifest']
+
+    def filename_for(self, sender_name, thread_id=None):
+        return self.manifest.id_for(sender_name, thread_id) + ".json"
+
+    def path_for(self, sender_name):
+        return os.path.join(self.conversations_dir, self.filename_for(sender_name))
+
+    def ordered_filenames(self):
+        """Files of every stored conversation, in sidebar order"""
+        return [conversation_id + ".json" for conversation_id in self.manifest.ordered_ids()]
+
+    def _assign(self, data):
+        """File for a conversation about to be written; returns (filename, manifest changed)"""
+        conversation_id, changed = self.manifest.assign(data['sender_name'], thread_id_of(data))
+        return conversation_id + ".json", changed
+
+    def exists(self, sender_name):
+        return os.path.exists(self.path_for(sender_name))
+
+    def read(self, sender_name):
+        """Read a stored conversation in the individual file schema, or None"""
+        filepath = self.path_for(sender_name)
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def write(self, conversation, fetch_time=None):
+        """Persist one conversation; returns the file path"""
+        return self.write_many([conversation], fetch_time=fetch_time)[0]
+
+    def write_many(self, conversations, fetch_time=None):
+        """Persist several conversations with a single journal fsync"""
+        datas = [conv if 'messages' in conv and 'total_messages' in conv else build_individual_data(conv, fetch_time)
+                 for conv in conversations]
+        if not datas:
+            return []
+
+        os.makedirs(self.conversations_dir, exist_ok=True)
+        with self._state['lock']:
+            records = []
+            manifest_changed = False
+            for data in datas:
+                filename, changed = self._assign(data)
+                records.append((filename, data))
+                manifest_changed = manifest_changed or changed
+            self._append_journal(records)
+            for filename, data in records:
+                atomic_write_json(os.path.join(self.conversations_dir, filename), data, fsync=False)
+                self._state['pending'].add(filename)
+            # Only new contacts, renames and newly learned threads touch the manifest
+            if manifest_changed:
+                self.manifest.save()
+            if len(self._state['pending']) >= CHECKPOINT_EVERY:
+                self.checkpoint()
+
+        if self.index is not None:
+            self.index.update_many([data for _, data in records])
+        return [os.path.join(self.conversations_dir, filename) for filename, _ in records]
+
+    def update(self, sender_name, changes):
+        """Apply field changes to a stored conversation; returns the new data or None"""
+        with self._state['lock']:
+            data = self.read(sender_name)
+            if data is None:
+                return None
+            data.update(changes)
+            self.write(data)
+        return data
+
+    def write_order(self, order):
+        """Persist the sidebar processing order (sender names) in the manifest"""
+        with self._state['lock']:
+            self.manifest.set_order(order)
+            self.manifest.save()
+
+    def read_order(self):
+        return self.manifest.ordered_names() or None
+
+    def read_all(self):
+        """Every stored conversation in sidebar order"""
+        conversations = []
+        for filename in self.ordered_filenames():
+            try:
+                with open(os.path.join(self.conversations_dir, filename), 'r', encoding='utf-8') as f:
+                    conversations.append(json.load(f))
+            except Exception as e:
+                print(f"❌ Error loading {filename}: {str(e)}")
+        return conversations
+
+    def migrate_legacy_files(self):
+        """Rename name-based conversation files to their ids and build the manifest; returns the count"""
+        if not os.path.isdir(self.conversations_dir):
+            return 0
+        with self._state['lock']:
+            legacy = [f for f in os.listdir(self.conversations_dir)
+                      if f.endswith('.json') and not f.startswith('_') and f[:-5] not in self.manifest.entries]
+            migrated = 0
+            moved_from = {}  # target path -> legacy file now stored there
+            for filename in sorted(legacy):
+                source = os.path.join(self.conversations_dir, filename)
+                try:
+                    with open(source, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    target = os.path.join(self.conversations_dir, self.filename_for(data['sender_name'], thread_id_of(data)))
+                except Exception as e:
+                    print(f"⚠️ Could not migrate {filename}: {e}")
+                    continue
+                if os.path.exists(target):
+                    # Two old names for one contact: keep the newest copy, set the other aside
+                    duplicates = os.path.join(self.conversations_dir, DUPLICATES_DIR)
+                    os.makedirs(duplicates, exist_ok=True)
+                    if not self._newer(data, source, target):
+                        print(f"🗂️ Kept the newer copy of {data['sender_name']}; set {filename} aside")
+                        os.replace(source, os.path.join(duplicates, filename))
+                        continue
+                    older = moved_from.get(target, os.path.basename(target))
+                    print(f"🗂️ Kept the newer copy of {data['sender_name']} ({filename}); set {older} aside")
+                    os.replace(target, os.path.join(duplicates, older))
+                    migrated -= 1
+                self._assign(data)
+                os.replace(source, target)
+                moved_from[target] = filename
+                migrated += 1
+
+            legacy_order = os.path.join(self.conversations_dir, LEGACY_ORDER_FILE)
+            if os.path.exists(legacy_order):
+                try:
+                    with open(legacy_order, 'r', encoding='utf-8') as f:
+                        self.manifest.set_order(json.load(f))
+                except Exception as e:
+                    print(f"⚠️ Could not read {LEGACY_ORDER_FILE}: {e}")
+            if migrated or legacy or os.path.exists(legacy_order):
+                self.manifest.save()
+                if os.path.exists(legacy_order):
+                    os.remove(legacy_order)
+        if migrated:
+            print(f"🗂️ Migrated {migrated} conversation files to stable ids")
+        return migrated
+
+    def _newer(self, data, source_path, existing_path):
+        """True if the legacy file being migrated is newer than the copy already at the target"""
+        try:
+            with open(existing_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+        except Exception:
+            return True
+        fetched, existing_fetched = data.get('fetch_time') or '', existing.get('fetch_time') or ''
+        if fetched and existing_fetched and fetched != existing_fetched:
+            return fetched > existing_fetched
+        # No fetch time to compare: the file written last wins
+        return os.path.getmtime(source_path) > os.path.getmtime(existing_path)
+
+    def _append_journal(self, records):
+        lines = ''.join(
+            json.dumps({'file': filename, 'data': data}, ensure_ascii=False) + '\n'
+            for filename, data in records
+        )
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def checkpoint(self):
+        """Flush written files to disk and truncate the journal"""
+        with self._state['lock']:
+            failed = set()
+            for filename in self._state['pending']:
+                filepath = os.path.join(self.conversations_dir, filename)
+                try:
+                    with open(filepath, 'rb+') as f:
+                        os.fsync(f.fileno())
+                except FileNotFoundError:
+                    # Deleted or renamed since it was written: nothing left to flush
+                    continue
+                except OSError as e:
+                    print(f"⚠️ Could not fsync {filename}: {e}")
+                    failed.add(filename)
+            self._state['pending'] = failed
+            # The journal is the only durable copy of a file that could not be flushed
+            if not failed and os.path.exists(self.journal_path):
+                with open(self.journal_path, 'w', encoding='utf-8') as f:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def replay_journal(self):
+        """Re-apply journaled writes left by a crash; returns the number replayed"""
+        if not os.path.isdir(self.conversations_dir):
+            return 0
+
+        # Temp files from an interrupted write are never valid data
+        for name in os.listdir(self.conversations_dir):
+            if name.startswith('.') and name.endswith('.tmp'):
+                try:
+                    os.remove(os.path.join(self.conversations_dir, name))
+                except OSError:
+                    pass
+
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        records = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line)['data'])
+                except ValueError:
+                    # A torn final line means that batch never reached the files
+                    break
+
+        with self._state['lock']:
+            # Files are re-resolved from the data, so entries journaled under old names land on ids
+            replayed = {}
+            manifest_changed = False
+            for data in records:
+                filename, changed = self._assign(data)
+                replayed[filename] = data
+                manifest_changed = manifest_changed or changed
+            for filename, data in replayed.items():
+                atomic_write_json(os.path.join(self.conversations_dir, filename), data, fsync=False)
+                self._state['pending'].add(filename)
+            if manifest_changed:
+                self.manifest.save()
+            self.checkpoint()
+
+        if replayed:
+            print(f"🧾 Replayed {len(replayed)} journaled conversation writes")
+            if self.index is not None:
+                self.index.update_many(list(replayed.values()))
+        return len(replayed)
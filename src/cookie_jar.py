@@ -0,0 +1,98 @@
+import json
+import os
+import time
+from datetime import datetime
+from src.conversation_store import atomic_write_json
+
+COOKIE_JAR_FILE = 'data/linkedin_cookies.json'
+SESSION_COOKIES = ('li_at',)  # without these the saved session cannot be logged in
+MESSAGING_URL = 'https://www.linkedin.com/messaging/'
+
+def _normalize(cookie):
+    """A cookie in CDP form from either a CDP or a Selenium cookie dict"""
+    expires = cookie.get('expires', cookie.get('expiry'))
+    normalized = {
+        'name': cookie['name'],
+        'value': cookie['value'],
+        'domain': cookie.get('domain', '.linkedin.com'),
+        'path': cookie.get('path', '/'),
+        'secure': cookie.get('secure', False),
+        'httpOnly': cookie.get('httpOnly', False)
+    }
+    if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+        normalized['sameSite'] = cookie['sameSite']
+    # Session cookies carry no expiry (CDP reports -1)
+    if expires is not None and expires > 0 and not cookie.get('session'):
+        normalized['expires'] = expires
+    return normalized
+
+class CookieJar:
+    """LinkedIn cookies stored as JSON with their expiry times.
+
+    Replaces the pickled cookie files: the jar is safe to load, knows
+    when the session cookies have expired without opening a browser, and
+    restores every cookie with a single CDP Network.setCookies call.
+    """
+
+    def __init__(self, path=COOKIE_JAR_FILE):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def capture(self, driver):
+        """Save all LinkedIn cookies of the browser (httpOnly ones included); returns how many"""
+        try:
+            cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        except Exception:
+            # Without CDP only the current page's cookies are visible
+            cookies = driver.get_cookies()
+        cookies = [_normalize(c) for c in cookies if 'linkedin.com' in c.get('domain', '')]
+        self.save(cookies)
+        return len(cookies)
+
+    def save(self, cookies):
+        atomic_write_json(self.path, {
+            'saved_at': datetime.now().isoformat(),
+            'cookies': [_normalize(c) for c in cookies]
+        })
+
+    def load(self):
+        """Saved cookies, or [] if there are none or the file is unreadable"""
+        if not self.exists():
+            return []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('cookies', [])
+        except Exception as e:
+            print(f"⚠️ Could not read cookie jar: {e}")
+            return []
+
+    def live_cookies(self, now=None):
+        """Saved cookies that have not expired"""
+        now = now or time.time()
+        return [c for c in self.load() if c.get('expires') is None or c['expires'] > now]
+
+    def session_expired(self, now=None):
+        """True if any key session cookie is missing or expired, so restoring is pointless"""
+        names = {c['name'] for c in self.live_cookies(now)}
+        return not all(name in names for name in SESSION_COOKIES)
+
+    def inject(self, driver):
+        """Set all live cookies in one CDP call, before the first navigation; returns how many"""
+        cookies = self.live_cookies()
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        return len(cookies)
+
+def validate_session(driver, timeout=10):
+    """Open messaging once and report whether LinkedIn accepted the session"""
+    from selenium.webdriver.support.ui import WebDriverWait
+    driver.get(MESSAGING_URL)
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: any(part in d.current_url for part in ('/messaging', '/login', '/authwall', '/checkpoint'))
+        )
+    except Exception:
+        return False
+    url = driver.current_url
+    return '/messaging' in url and not any(part in url for part in ('/login', '/authwall', '/checkpoint'))
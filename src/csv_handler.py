@@ -1,5 +1,6 @@
 import csv
 import os
+from src.response_template import TemplateError, compile_template
 from datetime import datetime
 
 class CSVHandler:
@@ -33,6 +34,13 @@ class CSVHandler:
                     # Split keywords by pipe character
                     keywords = [k.strip() for k in row['keywords'].split('|')]
                     
+                    # Placeholders are checked now, not when a reply is about to be sent
+                    try:
+                        compile_template(row['response']).validate()
+                    except TemplateError as e:
+                        print(f"✗ Skipping template '{row['status']}': {e}")
+                        continue
+                    
                     templates.append({
                         'status': row['status'],
                         'keywords': keywords,
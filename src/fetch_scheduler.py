@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+FETCH_BUDGET = float(os.environ.get('FETCH_BUDGET_SECONDS', 8))  # seconds of fetching per refresh cycle
+
+# Priority weights
+WEIGHT_OPEN_THREAD = 100    # the thread the user is looking at right now
+WEIGHT_REPLY_NEEDED = 30    # awaiting our reply in a recognised category
+WEIGHT_UNREAD = 10          # per unread message, capped below
+MAX_UNREAD_COUNTED = 5
+WEIGHT_STALE_HOUR = 1       # per hour since the stored copy was written, capped below
+MAX_STALE_HOURS = 24
+WEIGHT_CARRIED_CYCLE = 5    # per cycle spent waiting, so carried work is never starved
+
+class FetchScheduler:
+    """Priority queue of pending conversation fetches, run within a time budget.
+
+    Pending threads are ranked by unread count, age of the stored copy,
+    whether the user has the thread open, and whether it awaits a reply
+    (from the conversation index). Each cycle fetches in rank order until
+    the budget is spent; whatever is left is carried over to the next
+    cycle with a small boost.
+    """
+
+    def __init__(self, budget=FETCH_BUDGET, index=None):
+        self.budget = budget
+        self.index = index  # ConversationIndex, for reply status and stored-copy age
+        self.open_thread = None
+        self._pending = {}  # lowercased sender name -> {'conversation': preview, 'cycles': n}
+        self._lock = threading.Lock()
+        self.stats = {
+            'cycles': 0,
+            'fetched': 0,
+            'carried_over': 0,
+            'budget_exhausted': 0,
+            'last_cycle_seconds': 0
+        }
+
+    def set_open_thread(self, sender_name):
+        """Remember which conversation the user currently has open"""
+        self.open_thread = sender_name or None
+
+    def add(self, conversations):
+        """Queue sidebar previews, refreshing any already carried over"""
+        with self._lock:
+            for conv in conversations:
+                name = conv['sender_name'].lower()
+                queued = self._pending.get(name)
+                cycles = queued['cycles'] if queued else 0
+                self._pending[name] = {'conversation': conv, 'cycles': cycles}
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def priority(self, conv, entry=None, cycles=0, now=None):
+        """Rank of a pending fetch; higher goes first"""
+        score = WEIGHT_UNREAD * min(conv.get('unread_count') or (1 if conv.get('is_unread') else 0), MAX_UNREAD_COUNTED)
+        if self.open_thread and conv['sender_name'].lower() == self.open_thread.lower():
+            score += WEIGHT_OPEN_THREAD
+        if entry is None:
+            # Never stored: as stale as it gets
+            score += WEIGHT_STALE_HOUR * MAX_STALE_HOURS
+        else:
+            if entry.get('awaiting_reply') and entry.get('category') not in (None, 'uncategorized'):
+                score += WEIGHT_REPLY_NEEDED
+            try:
+                now = now or datetime.now()
+                age_hours = (now - datetime.fromisoformat(entry['indexed_at'])).total_seconds() / 3600
+                score += WEIGHT_STALE_HOUR * min(max(age_hours, 0), MAX_STALE_HOURS)
+            except Exception:
+                pass
+        return score + WEIGHT_CARRIED_CYCLE * cycles
+
+    def ranked(self):
+        """Pending previews, most important first"""
+        entries = self.index.load() if self.index is not None else {}
+        now = datetime.now()
+        with self._lock:
+            queued = list(self._pending.items())
+        scored = [
+            (self.priority(item['conversation'], entries.get(name), item['cycles'], now), pos, item['conversation'])
+            for pos, (name, item) in enumerate(queued)
+        ]
+        # Ties keep sidebar order
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [conv for _, _, conv in scored]
+
+    def drain(self, budget=None):
+        """Yield pending previews in priority order until the budget is spent.
+
+        At least one preview is handed out per cycle; the rest stays queued.
+        A preview the consumer stops on (an exception, or closing the
+        generator) is queued again for the next cycle.
+        """
+        budget = self.budget if budget is None else budget
+        start = time.monotonic()
+        attempted = 0
+        for conv in self.ranked():
+            if attempted and time.monotonic() - start >= budget:
+                self.stats['budget_exhausted'] += 1
+                break
+            name = conv['sender_name'].lower()
+            with self._lock:
+                item = self._pending.pop(name, None)
+            attempted += 1
+            try:
+                yield conv
+            except GeneratorExit:
+                # Cancelled or failed hard: keep the thread for the next cycle
+                if item is not None:
+                    with self._lock:
+                        self._pending.setdefault(name, item)
+                raise
+
+        with self._lock:
+            for item in self._pending.values():
+                item['cycles'] += 1
+            carried = len(self._pending)
+        self.stats['cycles'] += 1
+        self.stats['carried_over'] = carried
+        self.stats['last_cycle_seconds'] = round(time.monotonic() - start, 2)
+        if carried:
+            print(f"⏳ Fetch budget of {budget:g}s spent: {carried} conversations carried over to the next cycle")
+
+    def note_fetched(self, count=1):
+        self.stats['fetched'] += count
+
+    def run(self, fetch_one, budget=None):
+        """Fetch pending threads in priority order until the budget is spent.
+
+        fetch_one(preview) returns the fetched conversation or None.
+        """
+        fetched = []
+        queue = self.drain(budget)
+        try:
+            for conv in queue:
+                result = fetch_one(conv)
+                if result is not None:
+                    fetched.append(result)
+                    self.note_fetched()
+        finally:
+            queue.close()
+        return fetched
+
+    def status(self):
+        return dict(self.stats, budget=self.budget, pending=self.pending_count(), open_thread=self.open_thread)
@@ -47,25 +47,27 @@ class LinkedInHRAutomation:
         }
         
         try:
-            # Step 1: Fetch messages and save to individual files
+            categorizer = MessageCategorizer() if categorize else None
+            
+            # Step 1: Fetch messages, saving and categorizing each conversation as soon as it is read
             if fetch_messages:
                 print("\n📥 STEP 1: Fetching LinkedIn Messages to Individual Files")
                 print("-" * 50)
                 
                 fetcher = LinkedInMessageFetcher(self.auth.driver)
                 
-                # Fetch and save directly to individual files
-                saved_files = fetcher.fetch_and_save_to_individual_files(
+                for conversation in fetcher.iter_and_save_to_individual_files(
                     include_read=True,
                     limit=message_limit,
                     conversations_dir=self.conversations_dir
-                )
+                ):
+                    results['fetched_messages'].append(conversation)
+                    if categorizer is not None:
+                        results['categorized_messages'].extend(
+                            categorizer.iter_processed([self._categorizer_input(conversation)], hr_name=self.hr_name))
                 
-                if saved_files:
-                    # Load the conversations from individual files for processing
-                    individual_conversations = fetcher.load_individual_conversations(self.conversations_dir)
-                    results['fetched_messages'] = individual_conversations
-                    print(f"✓ Fetched and saved {len(saved_files)} conversations to individual files")
+                if results['fetched_messages']:
+                    print(f"✓ Fetched and saved {len(results['fetched_messages'])} conversations to individual files")
                 else:
                     print("✗ No messages fetched or saved")
                     return results
@@ -75,38 +77,21 @@ class LinkedInHRAutomation:
                 print("\n🏷️  STEP 2: Categorizing Messages from Individual Files")
                 print("-" * 50)
                 
-                categorizer = MessageCategorizer()
-                
-                # Use fetched messages or load from individual files
-                if results['fetched_messages']:
-                    messages_to_process = results['fetched_messages']
-                else:
-                    # Load from individual files
+                # Fetched conversations were categorized while they streamed in
+                if not fetch_messages:
                     fetcher = LinkedInMessageFetcher(self.auth.driver)
-                    messages_to_process = fetcher.load_individual_conversations(self.conversations_dir)
-                
-                if not messages_to_process:
-                    print("❌ No conversations found to categorize")
-                    return results
+                    stored = fetcher.load_individual_conversations(self.conversations_dir)
+                    
+                    if not stored:
+                        print("❌ No conversations found to categorize")
+                        return results
+                    
+                    results['categorized_messages'] = categorizer.process_messages(
+                        (self._categorizer_input(conv) for conv in stored),
+                        hr_name=self.hr_name
+                    )
                 
-                # Convert individual file format to the format expected by categorizer
-                converted_messages = []
-                for conv in messages_to_process:
-                    # Convert back to the format expected by message categorizer
-                    converted_conv = {
-                        'sender_name': conv['sender_name'],
-                        'all_messages': conv['messages'],  # Use the messages array
-                        'is_unread': conv.get('is_unread', False),
-                        'fetch_time': conv.get('fetch_time', '')
-                    }
-                    converted_messages.append(converted_conv)
-                
-                categorized = categorizer.process_messages(
-                    converted_messages, 
-                    hr_name=self.hr_name
-                )
-                
-                results['categorized_messages'] = categorized
+                categorized = results['categorized_messages']
                 
                 # Show categorization summary
                 print(f"\n📊 Categorization Summary:")
@@ -179,6 +164,15 @@ class LinkedInHRAutomation:
             traceback.print_exc()
             return results
 
+    def _categorizer_input(self, conversation):
+        """A conversation in the individual file format, as the categorizer expects it"""
+        return {
+            'sender_name': conversation['sender_name'],
+            'all_messages': conversation['messages'],
+            'is_unread': conversation.get('is_unread', False),
+            'fetch_time': conversation.get('fetch_time', '')
+        }
+
     def get_all_conversations(self):
         """Get all conversations from individual files"""
         fetcher = LinkedInMessageFetcher(None)  # No driver needed for loading files
@@ -194,18 +188,8 @@ class LinkedInHRAutomation:
         
         fetcher = LinkedInMessageFetcher(self.auth.driver)
         
-        # Fetch only new/unread conversations
-        new_conversations = fetcher.fetch_new_or_unread_conversations(limit=limit)
-        
-        if not new_conversations:
-            print("📬 No new conversations found")
-            return []
-        
-        # Save to individual files
-        saved_files = fetcher.save_conversations_to_individual_files(
-            new_conversations, 
-            self.conversations_dir
-        )
+        # Each new/unread conversation is saved to its file as soon as it is fetched
+        saved_files = fetcher.fetch_new_conversations_only(limit=limit, conversations_dir=self.conversations_dir)
         
         return saved_files
         
@@ -7,12 +7,28 @@ import json
 import os
 import re
 from datetime import datetime
+from src.conversation_index import ConversationIndex
+from src.conversation_store import ConversationStore, build_individual_data, sidebar_fingerprint
+from src.sync_checkpoint import SyncCancelled
+from src.sync_engine import SyncEngine, FullSync, UnreadSync
+from src.contact_directory import get_directory
 
 class LinkedInMessageFetcher:
-    def __init__(self, driver):
+    def __init__(self, driver, capture=None):
         self.driver = driver
+        # Optional MessagingCapture: messages come from the page's JSON responses when available
+        self.capture = capture
+        # LinkedIn conversation URN of the thread last read from the capture, else None
+        self.captured_conversation_id = None
         self.messages = []
         self.wait = WebDriverWait(driver, 10)
+        # Optional callable returning True once the running job has been cancelled
+        self.cancel_check = None
+        
+    def _check_cancelled(self):
+        """Abort the current fetch loop if the job has been cancelled"""
+        if self.cancel_check is not None and self.cancel_check():
+            raise SyncCancelled()
         
     def navigate_to_messages(self):
         """Navigate to LinkedIn messaging page"""
@@ -46,6 +62,7 @@ class LinkedInMessageFetcher:
             max_attempts = 15
             
             while attempts < max_attempts:
+                self._check_cancelled()
                 # Get current count
                 current_convs = self.driver.find_elements(By.CSS_SELECTOR, "li.msg-conversation-listitem")
                 current_count = len(current_convs)
@@ -88,6 +105,7 @@ class LinkedInMessageFetcher:
             conv_elements = conv_elements[:limit]
             
             for index, conv in enumerate(conv_elements):
+                self._check_cancelled()
                 try:
                     conversation_data = self._extract_conversation_preview(conv, index)
                     if conversation_data:
@@ -244,6 +262,18 @@ class LinkedInMessageFetcher:
                 except Exception as e:
                     print(f"Debug: Styling method failed for {sender_name}: {e}")
             
+            # Last-message snippet and time shown in the sidebar, used to detect changes
+            preview_snippet = ""
+            try:
+                preview_snippet = conv_element.find_element(By.CSS_SELECTOR, ".msg-conversation-card__message-snippet").text.strip()
+            except:
+                pass
+            sidebar_timestamp = ""
+            try:
+                sidebar_timestamp = conv_element.find_element(By.CSS_SELECTOR, "time.msg-conversation-listitem__time-stamp, .msg-conversation-card__time-stamp").text.strip()
+            except:
+                pass
+            
             print(f"📋 Conversation {index}: {sender_name} - Unread: {is_unread} (Count: {unread_count})")
             
             return {
@@ -251,6 +281,9 @@ class LinkedInMessageFetcher:
                 'sender_name': sender_name,
                 'is_unread': is_unread,
                 'unread_count': unread_count,
+                'preview_snippet': preview_snippet,
+                'sidebar_timestamp': sidebar_timestamp,
+                'fingerprint': sidebar_fingerprint(preview_snippet, sidebar_timestamp, unread_count),
                 'element': conv_element
             }
             
@@ -269,12 +302,42 @@ class LinkedInMessageFetcher:
             WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, ".msg-s-message-list"))
             )
+            # Remember the thread's own URL so it can be reopened without the sidebar
+            if "/messaging/thread/" in self.driver.current_url:
+                conversation['thread_url'] = self.driver.current_url.split('?')[0]
             print(f"✓ Opened conversation with {conversation['sender_name']}")
             return True
         except Exception as e:
             print(f"✗ Failed to open conversation: {str(e)}")
             return False
     
+    def open_thread_url(self, thread_url):
+        """Open a conversation directly by its thread URL"""
+        try:
+            self.driver.get(thread_url)
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".msg-s-message-list"))
+            )
+            return True
+        except Exception as e:
+            print(f"✗ Failed to open thread {thread_url}: {str(e)}")
+            return False
+    
+    def is_marked_read(self, sender_name, timeout=3):
+        """True once the conversation's sidebar entry shows no unread badge.
+
+        Waits up to timeout seconds for the badge to clear; False if it does
+        not, or if the entry is not in the loaded sidebar (unknown is not read).
+        """
+        deadline = time.time() + timeout
+        while True:
+            element = self.find_conversation_element(sender_name)
+            if element is not None and not self._quick_unread_check(element, 0):
+                return True
+            if time.time() >= deadline:
+                return False
+            time.sleep(0.5)
+    
     def scroll_to_load_all_messages(self):
         """Scroll up to load all messages in the conversation (optimized, minimal waiting)"""
         try:
@@ -284,6 +347,7 @@ class LinkedInMessageFetcher:
             max_attempts = 10  # Reduced to avoid too much scrolling
             scroll_attempts = 0
             while same_count_repeats < 2 and max_attempts > 0 and scroll_attempts < 5:
+                self._check_cancelled()
                 try:
                     # Scroll to top with a more gentle approach
                     self.driver.execute_script("arguments[0].scrollTop = 0;", message_area)
@@ -321,7 +385,12 @@ class LinkedInMessageFetcher:
             # No need for extra wait here; scroll already loads messages
             message_elements = self._get_message_elements_with_retry()
             print(f"Found {len(message_elements)} message elements in conversation")
+            captured = self._captured_messages()
+            if captured is not None and len(captured) >= len(message_elements):
+                print(f"✓ Using {len(captured)} captured messages (network)")
+                return captured
             for index, msg_element in enumerate(message_elements):
+                self._check_cancelled()
                 message_data = self._extract_message_data_with_retry(msg_element, index)
                 if message_data:
                     messages.append(message_data)
@@ -330,6 +399,73 @@ class LinkedInMessageFetcher:
             print(f"Error getting conversation messages: {str(e)}")
             return []
     
+    def _captured_messages(self):
+        """Messages of the open thread from the network capture, or None"""
+        self.captured_conversation_id = None
+        if self.capture is None:
+            return None
+        self.capture.drain()
+        conv = self.capture.conversation_for(thread_url=self.driver.current_url)
+        if conv is None or not conv['all_messages']:
+            return None
+        self.captured_conversation_id = conv['conversation_id']
+        # The thread has been read: its messages need not stay in the capture
+        self.capture.consume(conv['conversation_id'])
+        return conv['all_messages']
+    
+    def _captured_new_messages(self, known_messages):
+        """Stored messages plus the captured ones after the last of them, or None"""
+        captured = self._captured_messages()
+        if not captured:
+            return None
+        last = known_messages[-1]
+        for position in range(len(captured) - 1, -1, -1):
+            msg = captured[position]
+            if (msg['message_id'] == last['message_id']) if last.get('message_id') else self._same_message(msg, last):
+                merged = [dict(m) for m in known_messages] + [dict(m) for m in captured[position + 1:]]
+                for index, m in enumerate(merged):
+                    m['message_index'] = index
+                print(f"✓ Incremental fetch: {len(merged) - len(known_messages)} new captured messages (network)")
+                return merged
+        return None
+    
+    def get_new_messages(self, known_messages):
+        """Append messages newer than the stored ones, reading only the visible tail.
+
+        Returns the merged message list, or None when the loaded tail does not
+        reach back to the last stored message and a full fetch is needed.
+        """
+        if not known_messages:
+            return None
+        captured = self._captured_new_messages(known_messages)
+        if captured is not None:
+            return captured
+        last = known_messages[-1]
+        before_last = known_messages[-2] if len(known_messages) > 1 else None
+        try:
+            message_elements = self._get_message_elements_with_retry()
+            new_messages = []
+            for index in range(len(message_elements) - 1, -1, -1):
+                self._check_cancelled()
+                message_data = self._extract_message_data_with_retry(message_elements[index], index)
+                if self._same_message(message_data, last) and (
+                        before_last is None or index == 0 or
+                        self._same_message(self._extract_message_data_with_retry(message_elements[index - 1], index - 1), before_last)):
+                    merged = [dict(msg) for msg in known_messages] + list(reversed(new_messages))
+                    for position, msg in enumerate(merged):
+                        msg['message_index'] = position
+                    print(f"✓ Incremental fetch: {len(new_messages)} new messages")
+                    return merged
+                new_messages.append(message_data)
+            return None
+        except Exception as e:
+            print(f"Error reading new messages: {str(e)}")
+            return None
+    
+    def _same_message(self, message_data, stored):
+        return (message_data.get('message') == stored.get('message')
+                and message_data.get('is_sent') == stored.get('is_sent'))
+    
     def _get_message_elements_with_retry(self, max_retries=3):
         """Get message elements with retry logic for stale elements"""
         for attempt in range(max_retries):
@@ -462,51 +598,25 @@ class LinkedInMessageFetcher:
                 'message_index': index
             }
     
+    def iter_all_conversations(self, include_read=True, limit=10):
+        """Yield each conversation with all its messages as soon as it has been read"""
+        engine = SyncEngine(self, policy=FullSync(include_read=include_read))
+        for item in engine.stream(limit=limit):
+            yield item['conversation']
+    
     def fetch_all_conversations(self, include_read=True, limit=10):
         """Fetch all conversations with all messages"""
         print("Fetching all conversations...")
-        
-        if not self.navigate_to_messages():
-            return []
-        
-        conversations = self.get_conversation_list(limit=limit)
-        
-        if not include_read:
-            conversations = [c for c in conversations if c['is_unread']]
-        
-        print(f"Processing {len(conversations)} conversations")
-        
-        all_data = []
-        
-        for conv_index, conv in enumerate(conversations):
-            print(f"\nProcessing conversation {conv_index + 1}/{len(conversations)}: {conv['sender_name']}")
-            
-            if self.open_conversation(conv):
-                messages = self.get_conversation_messages()
-                
-                if messages:
-                    conversation_data = {
-                        'sender_name': conv['sender_name'],
-                        'is_unread': conv['is_unread'],
-                        'message_count': len(messages),
-                        'all_messages': messages,
-                        'fetch_time': datetime.now().isoformat()
-                    }
-                    
-                    all_data.append(conversation_data)
-                    print(f"✓ Collected {len(messages)} messages from {conv['sender_name']}")
-                else:
-                    print(f"✗ No messages found for {conv['sender_name']}")
-                
-                # Dynamic wait: ensure sidebar is ready for next click (wait for conversation list to be clickable)
-                try:
-                    WebDriverWait(self.driver, 2).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "li.msg-conversation-listitem"))
-                    )
-                except Exception as e:
-                    print(f"Warning: Sidebar not clickable after conversation: {str(e)}")
-        
-        return all_data
+        return list(self.iter_all_conversations(include_read=include_read, limit=limit))
+    
+    def wait_for_sidebar(self, timeout=2):
+        """Wait until the conversation list is clickable again after opening a thread"""
+        try:
+            WebDriverWait(self.driver, timeout).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, "li.msg-conversation-listitem"))
+            )
+        except Exception as e:
+            print(f"Warning: Sidebar not clickable after conversation: {str(e)}")
     
     def save_messages_to_json(self, conversations, filename='data/linkedin_messages.json'):
         """Save all messages to a JSON file"""
@@ -528,129 +638,84 @@ class LinkedInMessageFetcher:
         return filename
 
     def save_conversations_to_individual_files(self, conversations, conversations_dir='data/conversations'):
-        """Save each conversation to its own JSON file"""
+        """Save each conversation to its own JSON file.
+
+        Conversations may be any iterable, such as iter_all_conversations():
+        each one is written as soon as it arrives and is not kept afterwards.
+        """
         try:
             os.makedirs(conversations_dir, exist_ok=True)
         except Exception as e:
             print(f"❌ Error creating conversations directory '{conversations_dir}': {str(e)}")
             raise Exception(f"Cannot create conversations directory: {str(e)}")
         
+        # The store also keeps the category/reply-status index in step
+        store = ConversationStore(conversations_dir, index=ConversationIndex())
         saved_files = []
         total_messages = 0
-        
         for conv in conversations:
             try:
-                sender_name = conv.get('sender_name', 'Unknown')
-                filename = self._safe_filename(sender_name) + ".json"
-                filepath = os.path.join(conversations_dir, filename)
-                
-                # Convert to individual file format
-                messages = conv.get('all_messages', [])
-                
-                # Find last received message (not sent by us)
-                last_received = ""
-                for msg in reversed(messages):
-                    if not msg.get('is_sent', False):
-                        last_received = msg.get('message', '')
-                        break
-                
-                # Convert messages to individual format
-                individual_messages = []
-                for msg in messages:
-                    individual_messages.append({
-                        'is_sent': msg.get('is_sent', False),
-                        'message': msg.get('message', ''),
-                        'timestamp': msg.get('timestamp', '')
-                    })
-                
-                individual_data = {
-                    'sender_name': sender_name,
-                    'is_unread': conv.get('is_unread', False),
-                    'conversation_preview': last_received[:100] + "..." if len(last_received) > 100 else last_received,
-                    'total_messages': len(individual_messages),
-                    'messages': individual_messages,
-                    'fetch_time': conv.get('fetch_time', datetime.now().isoformat()),
-                    'last_received_message': last_received
-                }
-                
-                # Save to individual file
-                try:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        json.dump(individual_data, f, indent=2, ensure_ascii=False)
-                    
-                    saved_files.append(filepath)
-                    total_messages += len(individual_messages)
-                    print(f"✅ Saved {sender_name}: {len(individual_messages)} messages to {filename}")
-                except PermissionError:
-                    print(f"❌ Permission denied writing to {filepath}. Check file/directory permissions.")
-                    continue
-                except Exception as file_error:
-                    print(f"❌ Error writing file {filepath}: {str(file_error)}")
-                    continue
-                
+                record = build_individual_data(conv)
             except Exception as e:
                 print(f"❌ Error processing conversation for {conv.get('sender_name', 'Unknown')}: {str(e)}")
                 continue
+            try:
+                saved_files.append(store.write(record))
+            except PermissionError:
+                print(f"❌ Permission denied writing to {conversations_dir}. Check file/directory permissions.")
+                break
+            except Exception as e:
+                print(f"❌ Error writing conversation file for {record['sender_name']}: {str(e)}")
+                continue
+            total_messages += record['total_messages']
+            print(f"✅ Saved {record['sender_name']}: {record['total_messages']} messages")
         
         print(f"✅ Saved {len(saved_files)} conversations ({total_messages} total messages) to individual files")
         return saved_files
 
     def load_individual_conversations(self, conversations_dir='data/conversations'):
         """Load all conversations from individual JSON files"""
-        conversations = []
-        
         if not os.path.exists(conversations_dir):
             print(f"⚠️  Conversations directory {conversations_dir} not found")
-            return conversations
+            return []
         
-        for filename in os.listdir(conversations_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(conversations_dir, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        conversation_data = json.load(f)
-                        conversations.append(conversation_data)
-                        print(f"📁 Loaded {conversation_data.get('sender_name', 'Unknown')}: {conversation_data.get('total_messages', 0)} messages")
-                except Exception as e:
-                    print(f"❌ Error loading {filename}: {str(e)}")
-                    continue
+        conversations = ConversationStore(conversations_dir).read_all()
+        for conversation_data in conversations:
+            print(f"📁 Loaded {conversation_data.get('sender_name', 'Unknown')}: {conversation_data.get('total_messages', 0)} messages")
         
         print(f"📁 Loaded {len(conversations)} conversations from individual files")
         return conversations
 
+    def _stream_to_store(self, policy, limit, conversations_dir):
+        """Run a sync that writes each conversation to its file as soon as it is read"""
+        store = ConversationStore(conversations_dir, index=ConversationIndex())
+        return SyncEngine(self, store, policy).stream(limit=limit)
+
+    def iter_and_save_to_individual_files(self, include_read=True, limit=10, conversations_dir='data/conversations'):
+        """Yield each conversation (individual file schema) once it has been read and saved"""
+        for item in self._stream_to_store(FullSync(include_read=include_read), limit, conversations_dir):
+            yield item['record']
+
     def fetch_and_save_to_individual_files(self, include_read=True, limit=10, conversations_dir='data/conversations'):
-        """Fetch conversations from LinkedIn and save directly to individual files"""
+        """Fetch conversations from LinkedIn, saving each one to its file as soon as it is read"""
         print("🔄 Fetching conversations and saving to individual files...")
+        saved_files = [item['path'] for item in
+                       self._stream_to_store(FullSync(include_read=include_read), limit, conversations_dir)]
         
-        # Fetch conversations from LinkedIn
-        conversations = self.fetch_all_conversations(include_read=include_read, limit=limit)
-        
-        if not conversations:
+        if not saved_files:
             print("❌ No conversations fetched from LinkedIn")
-            return []
-        
-        # Save directly to individual files
-        saved_files = self.save_conversations_to_individual_files(conversations, conversations_dir)
-        
         return saved_files
 
-    def fetch_new_conversations_only(self, limit=10, conversations_dir='data/conversations'):
+    def fetch_new_conversations_only(self, limit=10, conversations_dir='data/conversations', scheduler=None):
         """Fetch only new/unread conversations and save to individual files"""
         print("📬 Fetching only new/unread conversations...")
         
-        # Fetch only new/unread conversations
-        new_conversations = self.fetch_new_or_unread_conversations(limit=limit)
+        # Each conversation is saved as soon as it is fetched, so the most important ones land first
+        saved_files = [item['path'] for item in
+                       self._stream_to_store(UnreadSync(scheduler), limit, conversations_dir)]
         
-        if not new_conversations:
+        if not saved_files:
             print("📬 No new conversations found")
-            return []
-        
-        # Save to individual files
-        saved_files = self.save_conversations_to_individual_files(
-            new_conversations, 
-            conversations_dir
-        )
-        
         return saved_files
 
     def get_unread_conversations(self, limit=20):
@@ -684,44 +749,7 @@ class LinkedInMessageFetcher:
     def fetch_unread_conversations(self, limit=10):
         """Fetch only unread conversations with all messages"""
         print("📬 Fetching only unread conversations...")
-        
-        if not self.navigate_to_messages():
-            return []
-        
-        unread_conversations = self.get_unread_conversations(limit=limit)
-        
-        if not unread_conversations:
-            print("📬 No unread conversations found")
-            return []
-        
-        print(f"📬 Processing {len(unread_conversations)} unread conversations")
-        
-        all_data = []
-        
-        for conv_index, conv in enumerate(unread_conversations):
-            print(f"\n📬 Processing unread conversation {conv_index + 1}/{len(unread_conversations)}: {conv['sender_name']}")
-            
-            if self.open_conversation(conv):
-                messages = self.get_conversation_messages()
-                
-                if messages:
-                    conversation_data = {
-                        'sender_name': conv['sender_name'],
-                        'is_unread': conv['is_unread'],
-                        'unread_count': conv.get('unread_count', 1),
-                        'message_count': len(messages),
-                        'all_messages': messages,
-                        'fetch_time': datetime.now().isoformat()
-                    }
-                    
-                    all_data.append(conversation_data)
-                    print(f"✅ Collected {len(messages)} messages from unread conversation: {conv['sender_name']}")
-                else:
-                    print(f"❌ No messages found for unread conversation: {conv['sender_name']}")
-                
-                time.sleep(2)
-        
-        return all_data
+        return self.fetch_all_conversations(include_read=False, limit=limit)
 
     def get_new_or_unread_conversations(self, limit=50):
         """Efficiently get only new or unread conversations without processing all"""
@@ -785,47 +813,51 @@ class LinkedInMessageFetcher:
             print(f"Error getting new/unread conversation list: {str(e)}")
             return []
 
-    def fetch_new_or_unread_conversations(self, limit=20):
-        """Fetch only new or unread conversations efficiently"""
+    def fetch_new_or_unread_conversations(self, limit=20, scheduler=None, on_conversation=None):
+        """Fetch new or unread conversations, most important first, within the scheduler's time budget.
+
+        Without a shared scheduler the work left over when the budget runs out
+        is dropped; with one it is carried over to the scheduler's next cycle.
+        """
         print("📬 Fetching only new/unread conversations efficiently...")
-        
-        if not self.navigate_to_messages():
-            return []
-        
-        new_or_unread_conversations = self.get_new_or_unread_conversations(limit=limit)
-        
-        if not new_or_unread_conversations:
-            print("📬 No new/unread conversations found - no processing needed")
-            return []
-        
-        print(f"📬 Processing {len(new_or_unread_conversations)} new/unread conversations")
-        
-        all_data = []
-        
-        for conv_index, conv in enumerate(new_or_unread_conversations):
-            print(f"\n📬 Processing new/unread conversation {conv_index + 1}/{len(new_or_unread_conversations)}: {conv['sender_name']}")
-            
-            if self.open_conversation(conv):
-                messages = self.get_conversation_messages()
-                
-                if messages:
-                    conversation_data = {
-                        'sender_name': conv['sender_name'],
-                        'is_unread': conv['is_unread'],
-                        'unread_count': conv.get('unread_count', 1),
-                        'message_count': len(messages),
-                        'all_messages': messages,
-                        'fetch_time': datetime.now().isoformat()
-                    }
-                    
-                    all_data.append(conversation_data)
-                    print(f"✅ Collected {len(messages)} messages from new/unread conversation: {conv['sender_name']}")
-                else:
-                    print(f"❌ No messages found for new/unread conversation: {conv['sender_name']}")
-                
-                time.sleep(1)  # Reduced delay for faster processing
-        
-        return all_data
+        conversations = []
+        for conversation in self.iter_new_or_unread_conversations(limit=limit, scheduler=scheduler):
+            if on_conversation is not None:
+                on_conversation(conversation)
+            conversations.append(conversation)
+        return conversations
+    
+    def iter_new_or_unread_conversations(self, limit=20, scheduler=None):
+        """Yield new or unread conversations in priority order as soon as each has been read"""
+        engine = SyncEngine(self, policy=UnreadSync(scheduler))
+        for item in engine.stream(limit=limit):
+            yield item['conversation']
+    
+    def open_queued_conversation(self, conv):
+        """Open a queued conversation, finding it again in the sidebar if it was carried over"""
+        try:
+            # Previews carried over from an earlier cycle hold detached elements
+            conv['element'].is_displayed()
+        except Exception:
+            element = self.find_conversation_element(conv['sender_name'])
+            if element is None:
+                print(f"⚠️ {conv['sender_name']} is no longer in the sidebar")
+                return False
+            conv['element'] = element
+        return self.open_conversation(conv)
+    
+    def find_conversation_element(self, sender_name):
+        """The sidebar entry of a conversation, or None if it is not loaded"""
+        contacts = get_directory()
+        key = contacts.key(sender_name)
+        for conv_element in self.driver.find_elements(By.CSS_SELECTOR, "li.msg-conversation-listitem"):
+            try:
+                name = conv_element.find_element(By.CSS_SELECTOR, ".msg-conversation-listitem__participant-names").text.strip()
+                if contacts.key(name) == key:
+                    return conv_element
+            except:
+                continue
+        return None
 
     def _quick_unread_check(self, conv_element, index):
         """Quick check for unread indicators without full processing"""
@@ -888,21 +920,3 @@ class LinkedInMessageFetcher:
         except Exception as e:
             print(f"Error in quick unread check for conversation {index}: {str(e)}")
             return False
-
-    def _safe_filename(self, sender_name):
-        """Generate a safe filename from sender name"""
-        if not sender_name or sender_name.strip() == "":
-            return "Unknown_Contact"
-        
-        # Replace spaces with underscores and remove/replace unsafe characters
-        safe_name = sender_name.strip()
-        safe_name = re.sub(r'[<>:"/\\|?*]', '_', safe_name)  # Replace unsafe chars
-        safe_name = re.sub(r'\s+', '_', safe_name)  # Replace spaces and multiple whitespace
-        safe_name = re.sub(r'_+', '_', safe_name)  # Replace multiple underscores with single
-        safe_name = safe_name.strip('_')  # Remove leading/trailing underscores
-        
-        # Ensure we don't have an empty filename
-        if not safe_name:
-            safe_name = "Unknown_Contact"
-            
-        return safe_name
\ No newline at end of file
@@ -4,6 +4,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 import time
 from datetime import datetime
+from src.contact_directory import get_directory
 
 class LinkedInResponder:
     def __init__(self, driver):
@@ -24,7 +25,8 @@ class LinkedInResponder:
                 "li.msg-conversation-listitem"
             )
             
-            # Look for the conversation with matching name
+            # Look for the conversation with matching name (titles, emoji and accents ignored)
+            contacts = get_directory()
             for conv in conversations:
                 try:
                     name_element = conv.find_element(
@@ -33,7 +35,7 @@ class LinkedInResponder:
                     )
                     conv_name = name_element.text.strip()
                     
-                    if sender_name.lower() in conv_name.lower():
+                    if contacts.matches(sender_name, conv_name):
                         # Click to open conversation
                         conv.click()
                         time.sleep(2)
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+MESSAGE_OVERHEAD = 64  # rough per-message bookkeeping on top of the text itself
+
+def columns_size(columns):
+    """Approximate bytes held by a (sent flags, texts, timestamps) message block"""
+    sent, texts, stamps = columns
+    return (len(sent) * MESSAGE_OVERHEAD
+            + sum(len(text) for text in texts)
+            + sum(len(stamp) for stamp in stamps))
+
+class MessageBodyCache:
+    """Byte-bounded LRU of conversation message bodies.
+
+    Only conversation summaries stay resident; message blocks are kept here
+    and reloaded through the loader (normally the conversation store) after
+    they have been evicted.
+    """
+
+    def __init__(self, loader=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (columns, size)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Message columns for a conversation, loading them on a miss (None if unknown)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        if self.loader is None:
+            return None
+        columns = self.loader(key)
+        if columns is not None:
+            self.put(key, columns)
+        return columns
+
+    def put(self, key, columns):
+        size = columns_size(columns)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (columns, size)
+            self.bytes += size
+            # Never evict the entry just stored, even if it alone exceeds the budget
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
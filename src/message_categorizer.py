@@ -1,5 +1,7 @@
 import re
 from src.csv_handler import CSVHandler
+from src.response_template import MissingTemplateValue, compile_template, name_values, proper_name
+from src.contact_directory import get_directory
 
 class MessageCategorizer:
     def __init__(self):
@@ -31,36 +33,56 @@ class MessageCategorizer:
         }
     
     def personalize_response(self, template, user_data):
-        """Replace placeholders in template with actual data"""
+        """Replace placeholders in template with actual data; None if one of them has no value"""
         if not template:
             return None
         
-        personalized = template
-        
-        # Replace [firstname] with actual name
-        if user_data.get('firstName'):
-            personalized = personalized.replace('[firstname]', user_data['firstName'])
-        
-        # Replace HR name placeholders with actual HR name
-        if user_data.get('hrName'):
-            personalized = personalized.replace('[hrname]', user_data['hrName'])
-            personalized = personalized.replace('[Nome HR]', user_data['hrName'])  # Legacy support
-        
-        return personalized
+        try:
+            return compile_template(template).render(self._values(user_data))
+        except MissingTemplateValue as e:
+            print(f"⚠️ No value for [{e.args[0]}] in the response template, leaving it unpersonalized")
+            return None
+    
+    def missing_value(self, template, user_data):
+        """The first placeholder in template that user_data has no value for, or None"""
+        try:
+            compile_template(template).render(self._values(user_data))
+        except MissingTemplateValue as e:
+            return e.args[0]
+        return None
+    
+    def prefill_response(self, template, user_data):
+        """Fill the placeholders user_data has values for and keep the others, for a later strict render"""
+        if not template:
+            return None
+        return compile_template(template).render_partial(self._values(user_data))
+    
+    def _values(self, user_data):
+        values = dict(user_data)
+        if values.get('firstName'):
+            values['firstName'] = proper_name(values['firstName'])
+        return values
+    
+    def personalize_many(self, template, recipients, shared=None):
+        """Personalize one template for many recipients (dicts of values, e.g. from name_values)"""
+        if not template:
+            return []
+        return compile_template(template).validate().render_many(recipients, shared=shared)
     
     def extract_first_name(self, full_name):
         """Extract first name from full name"""
-        if not full_name:
-            return ""
-        
-        # Split by space and take the first part
-        parts = full_name.strip().split()
-        return parts[0] if parts else ""
+        return get_directory().first_name(full_name)
     
     def process_messages(self, conversations, hr_name="HR Team"):
         """Process conversations and categorize their messages"""
-        results = []
-        
+        return list(self.iter_processed(conversations, hr_name=hr_name))
+    
+    def iter_processed(self, conversations, hr_name="HR Team"):
+        """Categorize messages as the conversations arrive, yielding each result.
+
+        Conversations may be a generator, such as the fetcher's
+        iter_all_conversations(), so results appear while fetching goes on.
+        """
         for conv in conversations:
             # Handle both conversation format (with all_messages) and individual message format
             if 'all_messages' in conv:
@@ -85,18 +107,12 @@ class MessageCategorizer:
                     # Categorize the message
                     categorization = self.categorize_message(message_text)
                     
-                    # Extract first name
-                    first_name = self.extract_first_name(sender_name)
-                    
                     # Personalize response if category found
                     personalized_response = None
                     if categorization['template']:
                         personalized_response = self.personalize_response(
                             categorization['template'],
-                            {
-                                'firstName': first_name,
-                                'hrName': hr_name
-                            }
+                            {**name_values(sender_name), 'hrName': hr_name}
                         )
                     
                     # Prepare result
@@ -114,12 +130,11 @@ class MessageCategorizer:
                     # Save to history
                     self.csv_handler.save_message_history(result)
                     
-                    results.append(result)
-                    
                     print(f"✓ Processed message from {sender_name}")
                     print(f"  Message: {message_text[:50]}...")
                     print(f"  Category: {categorization['category']}")
                     print(f"  Matched keyword: {categorization['matched_keyword']}")
+                    yield result
             
             else:
                 # Handle legacy individual message format
@@ -136,18 +151,12 @@ class MessageCategorizer:
                 # Categorize the message
                 categorization = self.categorize_message(msg['message'])
                 
-                # Extract first name
-                first_name = self.extract_first_name(msg['sender_name'])
-                
                 # Personalize response if category found
                 personalized_response = None
                 if categorization['template']:
                     personalized_response = self.personalize_response(
                         categorization['template'],
-                        {
-                            'firstName': first_name,
-                            'hrName': hr_name
-                        }
+                        {**name_values(msg['sender_name']), 'hrName': hr_name}
                     )
                 
                 # Prepare result
@@ -165,10 +174,7 @@ class MessageCategorizer:
                 # Save to history
                 self.csv_handler.save_message_history(result)
                 
-                results.append(result)
-                
                 print(f"✓ Processed message from {msg['sender_name']}")
                 print(f"  Category: {categorization['category']}")
                 print(f"  Matched keyword: {categorization['matched_keyword']}")
-        
-        return results
\ No newline at end of file
+                yield result
\ No newline at end of file
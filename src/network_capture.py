@@ -0,0 +1,287 @@
+import base64
+import json
+import re
+import sys
+from datetime import datetime
+from urllib.parse import unquote
+from src.conversation_store import atomic_write_json
+from src.conversation_manifest import THREAD_URN_RE
+
+# XHR endpoints whose JSON carries conversations and messages
+MESSAGING_URL_PATTERNS = ('/voyager/api/voyagerMessagingGraphQL/', '/voyager/api/messaging/')
+THREAD_URL = 'https://www.linkedin.com/messaging/thread/{}/'
+
+# Mailbox owner and thread id inside conversation/message URNs, e.g.
+# urn:li:msg_conversation:(urn:li:fsd_profile:ACoAA...,2-ZmE3...)
+_MAILBOX_RE = re.compile(r'\((urn:li:fsd_profile:[^,()]+),')
+_THREAD_RE = THREAD_URN_RE
+
+def is_messaging_url(url):
+    return any(pattern in url for pattern in MESSAGING_URL_PATTERNS)
+
+def _entity_type(entity):
+    return entity.get('_type') or entity.get('$type') or ''
+
+def _walk(node):
+    """Every typed entity anywhere in a payload (GraphQL data trees and normalized 'included' lists)"""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if _entity_type(node):
+                yield node
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+
+def _text(value):
+    if isinstance(value, dict):
+        return value.get('text', '') or ''
+    return value or ''
+
+def _participant_name(participant):
+    member = (participant.get('participantType') or {}).get('member') or {}
+    name = f"{_text(member.get('firstName'))} {_text(member.get('lastName'))}".strip()
+    if not name:
+        organization = (participant.get('participantType') or {}).get('organization') or {}
+        name = _text(organization.get('name'))
+    return name
+
+def _ref(entity, field, entities):
+    """Follow a field that is either embedded or a '*field' URN reference"""
+    value = entity.get(field)
+    if isinstance(value, dict):
+        return value
+    urn = value if isinstance(value, str) else entity.get('*' + field)
+    return entities.get(urn, {'entityUrn': urn} if urn else {})
+
+def merge_entities(entities, payload):
+    """Fold the typed entities of one captured response into entities, keyed by URN"""
+    for entity in _walk(payload.get('body', payload)):
+        urn = entity.get('entityUrn')
+        if urn:
+            # Later payloads carry the fresher copy of an entity
+            entities[urn] = {**entities.get(urn, {}), **entity}
+    return entities
+
+def parse_messaging_payloads(payloads, fetch_time=None):
+    """Conversations in the fetcher's API format from captured messaging responses.
+
+    Messages keep their LinkedIn URN as message_id and the delivery time as
+    delivered_at (epoch milliseconds); timestamp is the same instant as ISO
+    text. Duplicates across payloads are merged by URN.
+    """
+    entities = {}
+    for payload in payloads:
+        merge_entities(entities, payload)
+    return parse_entities(entities, fetch_time)
+
+def parse_entities(entities, fetch_time=None):
+    """Conversations from entities already merged by URN (see merge_entities)"""
+    conversations = {}
+    participants = {}
+    messages = {}
+    for urn, entity in entities.items():
+        entity_type = _entity_type(entity)
+        if entity_type.endswith('.Conversation'):
+            conversations[urn] = entity
+        elif entity_type.endswith('.MessagingParticipant'):
+            participants[urn] = entity
+        elif entity_type.endswith('.Message'):
+            messages[urn] = entity
+
+    by_conversation = {}
+    for urn, message in messages.items():
+        conversation_urn = _ref(message, 'conversation', entities).get('entityUrn')
+        if conversation_urn:
+            by_conversation.setdefault(conversation_urn, []).append(message)
+            conversations.setdefault(conversation_urn, {'entityUrn': conversation_urn})
+
+    fetch_time = fetch_time or datetime.now().isoformat()
+    result = []
+    for urn, conversation in conversations.items():
+        mailbox = _MAILBOX_RE.search(urn)
+        self_urn = mailbox.group(1) if mailbox else None
+        thread = _THREAD_RE.search(urn)
+
+        thread_messages = []
+        other_names = []
+        for message in sorted(by_conversation.get(urn, []), key=lambda m: m.get('deliveredAt') or 0):
+            sender = _ref(message, 'sender', entities)
+            sender = participants.get(sender.get('entityUrn'), sender)
+            is_sent = self_urn is not None and sender.get('hostIdentityUrn') == self_urn
+            if not is_sent:
+                name = _participant_name(sender)
+                if name and name not in other_names:
+                    other_names.append(name)
+            delivered_at = message.get('deliveredAt')
+            thread_messages.append({
+                'is_sent': is_sent,
+                'message': _text(message.get('body')),
+                'timestamp': datetime.fromtimestamp(delivered_at / 1000).isoformat() if delivered_at else '',
+                'message_index': len(thread_messages),
+                'message_id': message.get('entityUrn'),
+                'delivered_at': delivered_at
+            })
+
+        # Sender name: the other participants, as the sidebar shows them
+        for participant in conversation.get('conversationParticipants') or conversation.get('*conversationParticipants') or []:
+            if isinstance(participant, str):
+                participant = participants.get(participant, {})
+            else:
+                participant = participants.get(participant.get('entityUrn'), participant)
+            if participant.get('hostIdentityUrn') == self_urn:
+                continue
+            name = _participant_name(participant)
+            if name and name not in other_names:
+                other_names.append(name)
+        if not other_names:
+            continue
+
+        unread_count = conversation.get('unreadCount') or 0
+        last_received = ''
+        for msg in reversed(thread_messages):
+            if not msg['is_sent']:
+                last_received = msg['message']
+                break
+        result.append({
+            'sender_name': ', '.join(other_names),
+            'is_unread': bool(unread_count) or conversation.get('read') is False,
+            'unread_count': unread_count,
+            'message_count': len(thread_messages),
+            'all_messages': thread_messages,
+            'fetch_time': fetch_time,
+            'last_received_message': last_received,
+            'conversation_id': urn,
+            'thread_url': conversation.get('conversationUrl') or (THREAD_URL.format(thread.group(1)) if thread else None),
+            'last_activity_at': conversation.get('lastActivityAt')
+                or max((m['delivered_at'] or 0 for m in thread_messages), default=None)
+        })
+
+    result.sort(key=lambda conv: conv['last_activity_at'] or 0, reverse=True)
+    return result
+
+class MessagingCapture:
+    """Records the messaging JSON the page receives, through the driver's DevTools network events.
+
+    Needs a driver started with performance logging (LINKEDIN_NETWORK_CAPTURE=1).
+    drain() folds the responses seen since the last call into one entity map,
+    so each response is parsed once; consume() drops a thread's messages once
+    the fetcher has taken them. Raw payloads are only kept with record=True,
+    to be saved as a fixture and replayed offline with from_fixture().
+    """
+
+    def __init__(self, driver=None, payloads=None, record=False):
+        self.driver = driver
+        self.record = record
+        self.payloads = []
+        self.entities = {}
+        self._pending = {}  # request id -> url, waiting for the body to finish loading
+        self._parsed = None  # conversations from the last parse, None when entities changed
+        self.enabled = False
+        for payload in payloads or []:
+            self._add(payload)
+
+    def _add(self, payload):
+        merge_entities(self.entities, payload)
+        self._parsed = None
+        if self.record:
+            self.payloads.append(payload)
+
+    def enable(self):
+        """Turn on CDP network events; False if the driver does not support them"""
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.enabled = True
+        except Exception as e:
+            print(f"⚠️ Network capture unavailable: {e}")
+            self.enabled = False
+        return self.enabled
+
+    def drain(self):
+        """Collect messaging responses from the performance log; returns how many were added"""
+        if not self.enabled:
+            return 0
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception as e:
+            print(f"⚠️ Could not read network events: {e}")
+            return 0
+        added = 0
+        for entry in entries:
+            try:
+                event = json.loads(entry['message'])['message']
+            except Exception:
+                continue
+            method = event.get('method')
+            params = event.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if is_messaging_url(response.get('url', '')) and 'json' in response.get('mimeType', ''):
+                    self._pending[params['requestId']] = response['url']
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                url = self._pending.pop(params['requestId'])
+                try:
+                    body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                    text = body.get('body', '')
+                    if body.get('base64Encoded'):
+                        text = base64.b64decode(text).decode('utf-8')
+                    self._add({'url': unquote(url), 'body': json.loads(text)})
+                    added += 1
+                except Exception as e:
+                    print(f"⚠️ Could not read captured response: {str(e)[:80]}")
+            elif method == 'Network.loadingFailed':
+                self._pending.pop(params.get('requestId'), None)
+        return added
+
+    def conversations(self):
+        """Parsed conversations, rebuilt only when new entities arrived"""
+        if self._parsed is None:
+            self._parsed = parse_entities(self.entities)
+        return self._parsed
+
+    def conversation_for(self, thread_url=None, sender_name=None):
+        """The captured conversation for a thread URL or sender name, or None"""
+        thread_id = None
+        if thread_url:
+            match = re.search(r'/messaging/thread/([^/?]+)', thread_url)
+            thread_id = match.group(1) if match else None
+        for conv in self.conversations():
+            if thread_id and conv.get('thread_url') and thread_id in conv['thread_url']:
+                return conv
+            if sender_name and conv['sender_name'].lower() == sender_name.lower():
+                return conv
+        return None
+
+    def consume(self, conversation_id):
+        """Drop the messages of a thread the fetcher has taken; its conversation and participants stay"""
+        consumed = [urn for urn, entity in self.entities.items()
+                    if _entity_type(entity).endswith('.Message')
+                    and _ref(entity, 'conversation', self.entities).get('entityUrn') == conversation_id]
+        for urn in consumed:
+            del self.entities[urn]
+        if consumed:
+            self._parsed = None
+        return len(consumed)
+
+    def clear(self):
+        self.payloads = []
+        self.entities = {}
+        self._pending.clear()
+        self._parsed = None
+
+    def save_fixture(self, path):
+        """Write the recorded payloads for offline replay (needs record=True)"""
+        atomic_write_json(path, {'payloads': self.payloads})
+
+    @classmethod
+    def from_fixture(cls, path):
+        """A capture holding recorded payloads, without a browser"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(payloads=json.load(f)['payloads'], record=True)
+
+if __name__ == '__main__':
+    # Replay a recorded fixture: python -m src.network_capture capture.json
+    capture = MessagingCapture.from_fixture(sys.argv[1])
+    for conv in capture.conversations():
+        print(f"{conv['sender_name']}: {conv['message_count']} messages, unread={conv['unread_count']}, {conv['thread_url']}")
@@ -0,0 +1,97 @@
+import threading
+from src.browser_worker import BrowserUnavailableError
+
+# Passes a conversation gets before it is reported as unconfirmed
+MAX_ATTEMPTS = 3
+# Seconds before unconfirmed conversations get their next pass
+RETRY_DELAY = 15
+
+class ReadReceiptQueue:
+    """Batches LinkedIn-side read acknowledgements into background browser passes.
+
+    Mark-read requests only record the conversation here. A single
+    background job is kept queued on the browser worker; it runs once the
+    worker is otherwise idle and acknowledges every conversation collected
+    by then in one pass, so a burst of clicks costs one browser visit.
+    Conversations LinkedIn still shows as unread are retried together in a
+    later pass, RETRY_DELAY seconds on, up to MAX_ATTEMPTS.
+    """
+
+    def __init__(self, worker, acknowledge, retry_delay=RETRY_DELAY):
+        self.worker = worker
+        self.acknowledge = acknowledge  # fn(sender names) -> {sender name: confirmed}
+        self.retry_delay = retry_delay
+        self._pending = {}  # lowercased sender name -> sender name, in arrival order
+        self._attempts = {}  # lowercased sender name -> passes already made
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.stats = {'requested': 0, 'batches': 0, 'confirmed': 0, 'unconfirmed': 0, 'retried': 0}
+
+    def add(self, sender_name):
+        """Queue a conversation for acknowledgement; False if the browser is unavailable"""
+        with self._lock:
+            self.stats['requested'] += 1
+            self._attempts.pop(sender_name.lower(), None)
+        return self._queue(sender_name)
+
+    def _queue(self, sender_name):
+        with self._lock:
+            self._pending[sender_name.lower()] = sender_name
+            if self._scheduled:
+                return True
+            self._scheduled = True
+        return self._submit()
+
+    def _submit(self):
+        try:
+            self.worker.submit_background(self._drain)
+            return True
+        except BrowserUnavailableError as e:
+            with self._lock:
+                self._pending.clear()
+                self._scheduled = False
+            print(f"[WARN] Read acknowledgement skipped: {e}")
+            return False
+
+    def _drain(self):
+        with self._lock:
+            sender_names = list(self._pending.values())
+            self._pending.clear()
+            self._scheduled = False
+        if not sender_names:
+            return {}
+        results = self.acknowledge(sender_names)
+        self.stats['batches'] += 1
+        retry = []
+        schedule = False
+        with self._lock:
+            for sender_name, ok in results.items():
+                key = sender_name.lower()
+                attempts = self._attempts.pop(key, 0) + 1
+                if ok:
+                    self.stats['confirmed'] += 1
+                elif attempts < MAX_ATTEMPTS:
+                    self._attempts[key] = attempts
+                    retry.append(sender_name)
+                else:
+                    self.stats['unconfirmed'] += 1
+            self.stats['retried'] += len(retry)
+            for sender_name in retry:
+                self._pending.setdefault(sender_name.lower(), sender_name)
+            if retry and not self._scheduled:
+                self._scheduled = schedule = True
+        confirmed = sum(1 for ok in results.values() if ok)
+        print(f"📬 Acknowledged {confirmed}/{len(sender_names)} conversations as read on LinkedIn"
+              + (f", retrying {len(retry)}" if retry else ""))
+        if schedule:
+            # Submitted from a timer thread: from inside the worker the pass would run inline right away
+            timer = threading.Timer(self.retry_delay, self._submit)
+            timer.daemon = True
+            timer.start()
+        return results
+
+    def pending(self):
+        return list(self._pending.values())
+
+    def status(self):
+        return dict(self.stats, pending=len(self._pending))
@@ -0,0 +1,120 @@
+import os
+import re
+from functools import lru_cache
+from src.contact_directory import get_directory, proper_name
+
+PLACEHOLDER_RE = re.compile(r'\[([^\[\]\n]{1,40})\]')
+
+# Placeholder spellings (lowercased, without spaces, '_' or '-') and the value each one takes
+PLACEHOLDERS = {
+    'firstname': 'firstName', 'nome': 'firstName',
+    'lastname': 'lastName', 'cognome': 'lastName',
+    'fullname': 'fullName', 'nomecompleto': 'fullName',
+    'hrname': 'hrName', 'nomehr': 'hrName', 'recruiter': 'hrName', 'recruitername': 'hrName',
+    'company': 'company', 'azienda': 'company',
+    'role': 'role', 'ruolo': 'role', 'position': 'role', 'posizione': 'role',
+    'recruiteremail': 'recruiterEmail', 'email': 'recruiterEmail',
+}
+
+# Values used when the caller does not supply one
+DEFAULT_VALUES = {key: value for key, value in (
+    ('company', os.getenv('TEMPLATE_COMPANY')),
+    ('role', os.getenv('TEMPLATE_ROLE')),
+    ('recruiterEmail', os.getenv('TEMPLATE_RECRUITER_EMAIL')),
+) if value}
+
+class TemplateError(ValueError):
+    """A response template uses placeholders nobody can fill"""
+
+class MissingTemplateValue(KeyError):
+    """A strict render had no value for one of the template's placeholders"""
+
+def _placeholder_key(name):
+    return PLACEHOLDERS.get(re.sub(r'[\s_\-]', '', name.lower()))
+
+def name_values(full_name):
+    """firstName, lastName and fullName values for a LinkedIn display name"""
+    contact = get_directory().lookup(full_name)
+    return {
+        'firstName': contact['first_name'],
+        'lastName': contact['last_name'],
+        'fullName': contact['full_name']
+    }
+
+class CompiledTemplate:
+    """A response template parsed once into literal text and placeholder segments.
+
+    Rendering joins the segments with the values, so each template is
+    scanned only when it is compiled, any number of placeholders costs one
+    pass, and an inserted value is never itself searched for placeholders.
+    Each placeholder is either filled or left exactly as written.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.segments = []   # (literal text before, value key, placeholder as written)
+        self.unknown = []
+        pos = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            key = _placeholder_key(match.group(1))
+            if key is None:
+                self.unknown.append(match.group(0))
+                continue
+            self.segments.append((text[pos:match.start()], key, match.group(0)))
+            pos = match.end()
+        self.tail = text[pos:]
+        self.keys = frozenset(key for _, key, _ in self.segments)
+
+    def validate(self):
+        if self.unknown:
+            raise TemplateError(f"unknown placeholders {', '.join(self.unknown)}")
+        return self
+
+    def render(self, values):
+        """Fill every placeholder; raises MissingTemplateValue rather than send a placeholder"""
+        parts = []
+        for literal, key, _ in self.segments:
+            value = values.get(key) or DEFAULT_VALUES.get(key)
+            if not value:
+                raise MissingTemplateValue(key)
+            parts.append(literal)
+            parts.append(value)
+        parts.append(self.tail)
+        return ''.join(parts)
+
+    def render_partial(self, values):
+        """Fill the placeholders that have a value and keep the others as written"""
+        parts = []
+        for literal, key, placeholder in self.segments:
+            parts.append(literal)
+            parts.append(values.get(key) or DEFAULT_VALUES.get(key) or placeholder)
+        parts.append(self.tail)
+        return ''.join(parts)
+
+    def bind(self, values):
+        """A template with the given values already filled in, the other placeholders still open"""
+        bound = CompiledTemplate.__new__(CompiledTemplate)
+        bound.text = self.text
+        bound.unknown = self.unknown
+        bound.segments = []
+        filled = ''
+        for literal, key, placeholder in self.segments:
+            value = values.get(key) or DEFAULT_VALUES.get(key)
+            if value:
+                filled += literal + value
+            else:
+                bound.segments.append((filled + literal, key, placeholder))
+                filled = ''
+        bound.tail = filled + self.tail
+        bound.keys = frozenset(key for _, key, _ in bound.segments)
+        return bound
+
+    def render_many(self, rows, shared=None):
+        """Render for many recipients; rows are per-recipient values, shared ones are filled once"""
+        template = self.bind(shared) if shared else self
+        return [template.render(row) for row in rows]
+
+@lru_cache(maxsize=1024)
+def compile_template(text):
+    """Compiled form of a template text, cached by text"""
+    return CompiledTemplate(text)
@@ -0,0 +1,126 @@
+import json
+import os
+from datetime import datetime
+from src.conversation_store import atomic_write_json
+
+CHECKPOINT_FILE = 'data/sync_checkpoint.json'
+
+class SyncCancelled(BaseException):
+    """Raised inside fetch loops when the running sync has been cancelled.
+
+    Derives from BaseException so the fetcher's many broad
+    `except Exception` handlers let it through to the sync job.
+    """
+
+class SyncCheckpoint:
+    """Resumable record of a progressive sync, rewritten after every conversation.
+
+    Holds the sidebar conversation list, the conversations already
+    completed, and a per-conversation anchor (message count and last
+    message) describing what was stored for each of them.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.data = None
+
+    def load(self):
+        """Load the last checkpoint, or None if there is none"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read sync checkpoint: {e}")
+            self.data = None
+        return self.data
+
+    def resumable(self):
+        """True if the last sync stopped before finishing"""
+        data = self.load()
+        return data is not None and data.get('state') in ('running', 'cancelled', 'failed')
+
+    def start(self, limit, conversations):
+        """Begin a new checkpoint for the given sidebar list"""
+        self.data = {
+            'state': 'running',
+            'limit': limit,
+            'conversations': [
+                {
+                    'index': conv.get('index', pos),
+                    'sender_name': conv['sender_name'],
+                    'is_unread': conv.get('is_unread', False),
+                    'unread_count': conv.get('unread_count', 0)
+                }
+                for pos, conv in enumerate(conversations)
+            ],
+            'completed': [],
+            'anchors': {},
+            'processing_order': [],
+            'started_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat()
+        }
+        self._save()
+
+    def resume(self, conversations):
+        """Continue the loaded checkpoint against a fresh sidebar list"""
+        self.data['state'] = 'running'
+        known = {c['sender_name'] for c in self.data['conversations']}
+        for pos, conv in enumerate(conversations):
+            if conv['sender_name'] not in known:
+                self.data['conversations'].append({
+                    'index': conv.get('index', pos),
+                    'sender_name': conv['sender_name'],
+                    'is_unread': conv.get('is_unread', False),
+                    'unread_count': conv.get('unread_count', 0)
+                })
+        self._save()
+
+    def is_completed(self, sender_name):
+        return sender_name in self.data['completed']
+
+    def anchor(self, sender_name):
+        return self.data['anchors'].get(sender_name)
+
+    def mark_completed(self, sender_name, messages=None, anchor=None):
+        """Record a finished conversation and its anchor"""
+        if sender_name not in self.data['completed']:
+            self.data['completed'].append(sender_name)
+        if sender_name not in self.data['processing_order']:
+            self.data['processing_order'].append(sender_name)
+        if anchor is None and messages is not None:
+            last = messages[-1] if messages else {}
+            anchor = {
+                'message_count': len(messages),
+                'last_timestamp': last.get('timestamp', ''),
+                'last_message': last.get('message', '')[:200]
+            }
+        if anchor is not None:
+            self.data['anchors'][sender_name] = anchor
+        self._save()
+
+    def finish(self, state):
+        """Close the checkpoint as completed, cancelled or failed"""
+        if self.data is None:
+            return
+        self.data['state'] = state
+        self._save()
+
+    def progress(self):
+        if self.data is None:
+            return None
+        return {
+            'state': self.data['state'],
+            'completed': len(self.data['completed']),
+            'total': len(self.data['conversations']),
+            'started_at': self.data['started_at'],
+            'updated_at': self.data['updated_at']
+        }
+
+    def _save(self):
+        self.data['updated_at'] = datetime.now().isoformat()
+        try:
+            atomic_write_json(self.path, self.data)
+        except Exception as e:
+            print(f"⚠️ Could not write sync checkpoint: {e}")
@@ -0,0 +1,371 @@
+import time
+from datetime import datetime
+from src.conversation_index import ConversationIndex
+from src.conversation_store import build_individual_data
+from src.fetch_scheduler import FetchScheduler
+from src.sync_checkpoint import SyncCancelled
+
+STAGES = ('list', 'filter', 'fetch', 'normalize', 'persist')
+
+# What a sync does with a listed conversation
+SKIPPED = 'skipped'          # unchanged since it was stored: not opened
+INCREMENTAL = 'incremental'  # stored copy extended with the messages after it
+FULL = 'full'                # every message read again
+
+class SyncPolicy:
+    """Which conversations a sync lists and how much of each it reads again"""
+    name = 'full'
+    records_order = True   # the list is the whole sidebar, so it is also the conversation order
+    pause = 1.0            # seconds between conversations, on top of waiting for the sidebar
+
+    def __init__(self, include_read=True):
+        self.include_read = include_read
+
+    def list(self, fetcher, limit):
+        return fetcher.get_conversation_list(limit=limit)
+
+    def queue(self, previews):
+        """Number of conversations to process and the previews in processing order"""
+        if not self.include_read:
+            previews = [conv for conv in previews if conv['is_unread']]
+        return len(previews), iter(previews)
+
+    def plan(self, preview, existing):
+        return FULL
+
+    def open(self, fetcher, preview):
+        return fetcher.open_conversation(preview)
+
+    def fetched(self, item):
+        """Called once a conversation has been read and stored"""
+
+class FullSync(SyncPolicy):
+    """Read every listed conversation from scratch"""
+
+class IncrementalSync(SyncPolicy):
+    """Skip threads whose sidebar entry did not change, read only new messages of the others"""
+    name = 'incremental'
+
+    def plan(self, preview, existing):
+        if existing is None:
+            return FULL
+        fingerprint = preview.get('fingerprint')
+        if fingerprint:
+            unchanged = existing.get('sidebar_fingerprint') == fingerprint
+        else:
+            # Sidebar gave nothing to compare: fall back to skipping read threads
+            unchanged = not existing.get('is_unread', False) and not preview.get('is_unread', False)
+        if unchanged:
+            return SKIPPED
+        return INCREMENTAL if existing.get('messages') else FULL
+
+class UnreadSync(SyncPolicy):
+    """New or unread threads only, most important first, within the scheduler's time budget.
+
+    Without a shared scheduler the work left when the budget runs out is
+    dropped; with one it is carried over to the scheduler's next cycle.
+    """
+    name = 'unread'
+    records_order = False
+    pause = 0
+
+    def __init__(self, scheduler=None):
+        super().__init__(include_read=False)
+        if scheduler is None:
+            scheduler = FetchScheduler(index=ConversationIndex())
+        self.scheduler = scheduler
+
+    def list(self, fetcher, limit):
+        return fetcher.get_new_or_unread_conversations(limit=limit)
+
+    def queue(self, previews):
+        self.scheduler.add(previews)
+        return self.scheduler.pending_count(), self.scheduler.drain()
+
+    def plan(self, preview, existing):
+        return INCREMENTAL if existing and existing.get('messages') else FULL
+
+    def open(self, fetcher, preview):
+        # Previews carried over from an earlier cycle are found again in the sidebar
+        return fetcher.open_queued_conversation(preview)
+
+    def fetched(self, item):
+        self.scheduler.note_fetched()
+
+POLICIES = {'full': FullSync, 'incremental': IncrementalSync, 'unread': UnreadSync}
+
+def last_received(messages):
+    for msg in reversed(messages):
+        if not msg.get('is_sent', False):
+            return msg.get('message', '')
+    return ""
+
+def stored_conversation(data, index=None):
+    """API-format view of a stored conversation"""
+    return {
+        'sender_name': data.get('sender_name', ''),
+        'is_unread': data.get('is_unread', False),
+        'message_count': data.get('total_messages', 0),
+        'all_messages': data.get('messages', []),
+        'fetch_time': data.get('fetch_time', ''),
+        'last_received_message': data.get('last_received_message', ''),
+        'index': index
+    }
+
+class SyncEngine:
+    """The one sync pipeline: list -> filter -> fetch -> normalize -> persist.
+
+    Each stage is a generator handing conversations on one at a time, so a
+    conversation is stored (and reported through on_result) as soon as it
+    has been read. The policy decides what is listed and how much of each
+    thread is read again; the time spent inside each stage is kept in
+    stats['stages'].
+
+    Every item passed on carries the sidebar 'preview', its 'position',
+    the 'mode' (skipped, incremental or full), the 'existing' stored copy,
+    the API-format 'conversation', its file-schema 'record' and the 'path'
+    it was written to (None without a store).
+    """
+
+    def __init__(self, fetcher, store=None, policy=None, checkpoint=None, cancel_check=None,
+                 on_listed=None, on_progress=None, on_result=None):
+        self.fetcher = fetcher
+        self.store = store            # ConversationStore or WriteBehindStore; None only reads
+        self.policy = policy or FullSync()
+        self.checkpoint = checkpoint  # SyncCheckpoint, for resumable syncs
+        self.cancel_check = cancel_check
+        self.on_listed = on_listed
+        self.on_progress = on_progress
+        self.on_result = on_result
+        self.stats = self._new_stats()
+
+    def _new_stats(self):
+        return {
+            'policy': self.policy.name,
+            'state': 'idle',
+            'listed': 0,
+            SKIPPED: 0,
+            INCREMENTAL: 0,
+            FULL: 0,
+            'empty': 0,
+            'failed': 0,
+            'saved': 0,
+            'stages': {stage: {'seconds': 0.0, 'items': 0} for stage in STAGES},
+            'elapsed': 0.0
+        }
+
+    def _timed(self, stage, start, items=1):
+        timing = self.stats['stages'][stage]
+        timing['seconds'] += time.perf_counter() - start
+        timing['items'] += items
+
+    def _cancelled(self):
+        return self.cancel_check is not None and self.cancel_check()
+
+    def run(self, limit=50, resume=False):
+        """Sync up to limit conversations; returns the finished items in processing order.
+
+        Every item is kept until the end; stream() holds only one at a time.
+        """
+        return list(self.stream(limit, resume))
+
+    def stream(self, limit=50, resume=False):
+        """Sync up to limit conversations, yielding each item once it is stored"""
+        # Reset in place: callers may hold the stats dict as a live view
+        self.stats.update(self._new_stats(), state='running')
+        started = time.perf_counter()
+        order = []
+        previous_cancel_check = self.fetcher.cancel_check
+        if self.cancel_check is not None:
+            # Cancellation is also checked inside the fetcher's scroll and extraction loops
+            self.fetcher.cancel_check = self.cancel_check
+        pipeline = self._persist(self._normalize(self._fetch(self._filter(self._list(limit, resume)))))
+        try:
+            for item in pipeline:
+                order.append(item['preview']['sender_name'])
+                yield item
+            if self.stats.get('error'):
+                self.stats['state'] = 'failed'
+            else:
+                self.stats['state'] = 'cancelled' if self._cancelled() else 'completed'
+        except SyncCancelled:
+            # Raised from inside a scroll or extraction loop
+            print("🛑 Sync cancelled mid-conversation")
+            self.stats['state'] = 'cancelled'
+        except GeneratorExit:
+            self.stats['state'] = 'cancelled'
+            raise
+        except BaseException:
+            self.stats['state'] = 'failed'
+            raise
+        finally:
+            pipeline.close()
+            self.fetcher.cancel_check = previous_cancel_check
+            self.stats['elapsed'] = round(time.perf_counter() - started, 2)
+            self._finish(order)
+
+    def _finish(self, order):
+        complete = self.stats['state'] == 'completed'
+        if self.checkpoint is not None and self.checkpoint.data is not None:
+            self.checkpoint.finish(self.stats['state'])
+            # The checkpoint's order also covers what was done before a resume
+            order = self.checkpoint.data['processing_order']
+            complete = self.stats['state'] != 'failed'
+        # A partial list would drop the position of every conversation not reached
+        if self.store is not None and self.policy.records_order and order and complete:
+            try:
+                self.store.write_order(order)
+                print(f"🔢 Saved processing order to the manifest: {order}")
+            except Exception as e:
+                print(f"⚠️ Could not save processing order: {e}")
+        stages = ', '.join(f"{stage} {timing['seconds']:.2f}s/{timing['items']}"
+                           for stage, timing in self.stats['stages'].items())
+        print(f"⏱️ {self.policy.name} sync {self.stats['state']} in {self.stats['elapsed']}s: "
+              f"{self.stats['saved']} saved ({self.stats[SKIPPED]} unchanged, {self.stats[INCREMENTAL]} incremental, "
+              f"{self.stats[FULL]} full) - {stages}")
+
+    def _list(self, limit, resume):
+        """Sidebar previews in processing order"""
+        start = time.perf_counter()
+        if not self.fetcher.navigate_to_messages():
+            self.stats['error'] = 'Failed to navigate to messages'
+            self._timed('list', start, 0)
+            return
+        previews = self.policy.list(self.fetcher, limit)
+        if self.checkpoint is not None and previews:
+            if resume and self.checkpoint.load() is not None:
+                self.checkpoint.resume(previews)
+            else:
+                self.checkpoint.start(limit, previews)
+        total, queue = self.policy.queue(previews)
+        self.stats['listed'] = total
+        self._timed('list', start, total)
+        if not total:
+            print(f"📭 No conversations to {self.policy.name} sync")
+            return
+        print(f"📥 Processing {total} conversations ({self.policy.name} sync)...")
+        if self.on_listed is not None:
+            self.on_listed(previews)
+        try:
+            for position, preview in enumerate(queue, start=1):
+                yield position, total, preview
+        finally:
+            if hasattr(queue, 'close'):
+                queue.close()
+
+    def _filter(self, listed):
+        """Drop finished conversations and decide how much of each thread to read"""
+        for position, total, preview in listed:
+            if self._cancelled():
+                return
+            start = time.perf_counter()
+            sender_name = preview['sender_name']
+            if self.on_progress is not None:
+                self.on_progress(position, total, preview)
+            # Finished before the interruption we are resuming from
+            if self.checkpoint is not None and self.checkpoint.is_completed(sender_name):
+                print(f"⏭️ Skipping conversation {position}/{total}: {sender_name} (done before resume)")
+                self._timed('filter', start, 0)
+                continue
+            existing = None
+            if self.store is not None and self.store.exists(sender_name):
+                try:
+                    existing = self.store.read(sender_name)
+                except Exception as e:
+                    print(f"⚠️ Could not read existing file for {sender_name}: {e}")
+            mode = self.policy.plan(preview, existing)
+            if mode == SKIPPED:
+                print(f"⏭️ Skipping conversation {position}/{total}: {sender_name} (unchanged since last sync)")
+            self._timed('filter', start)
+            yield {'preview': preview, 'position': position, 'mode': mode, 'existing': existing}
+
+    def _fetch(self, planned):
+        """Open each thread and read all of its messages, or only the new ones"""
+        for item in planned:
+            if item['mode'] == SKIPPED:
+                yield item
+                continue
+            start = time.perf_counter()
+            preview = item['preview']
+            print(f"\n📥 Processing conversation {item['position']}/{self.stats['listed']}: {preview['sender_name']}")
+            if not self.policy.open(self.fetcher, preview):
+                self.stats['failed'] += 1
+                self._timed('fetch', start, 0)
+                continue
+            messages = None
+            if item['mode'] == INCREMENTAL:
+                messages = self.fetcher.get_new_messages(item['existing']['messages'])
+                if messages is None:
+                    item['mode'] = FULL
+            if messages is None:
+                messages = self.fetcher.get_conversation_messages()
+            self.fetcher.wait_for_sidebar()
+            if self.policy.pause:
+                time.sleep(self.policy.pause)  # small delay between conversations
+            self._timed('fetch', start)
+            if not messages:
+                print(f"✗ No messages found for {preview['sender_name']}")
+                self.stats['empty'] += 1
+                continue
+            item['messages'] = messages
+            item['conversation_id'] = getattr(self.fetcher, 'captured_conversation_id', None)
+            yield item
+
+    def _normalize(self, fetched):
+        """Build the API-format conversation and its individual file record"""
+        for item in fetched:
+            start = time.perf_counter()
+            preview = item['preview']
+            if item['mode'] == SKIPPED:
+                item['conversation'] = stored_conversation(item['existing'], preview.get('index'))
+                item['record'] = item['existing']
+            else:
+                messages = item.pop('messages')
+                conversation = {
+                    'sender_name': preview['sender_name'],
+                    'is_unread': preview['is_unread'],
+                    'unread_count': preview.get('unread_count', 0),
+                    'message_count': len(messages),
+                    'all_messages': messages,
+                    'fetch_time': datetime.now().isoformat(),
+                    'last_received_message': last_received(messages),
+                    'thread_url': preview.get('thread_url')
+                }
+                conversation_id = item.pop('conversation_id', None) or (item['existing'] or {}).get('conversation_id')
+                if conversation_id:
+                    conversation['conversation_id'] = conversation_id
+                # Sidebar state at fetch time, so the next incremental sync can skip the thread
+                if preview.get('fingerprint'):
+                    conversation['sidebar_fingerprint'] = preview['fingerprint']
+                item['conversation'] = conversation
+                item['record'] = build_individual_data(conversation)
+            self._timed('normalize', start)
+            yield item
+
+    def _persist(self, normalized):
+        """Write each conversation as soon as it is read, then report it"""
+        for item in normalized:
+            start = time.perf_counter()
+            sender_name = item['preview']['sender_name']
+            item['path'] = None
+            if item['mode'] != SKIPPED and self.store is not None:
+                try:
+                    item['path'] = self.store.write(item['record'])
+                except Exception as e:
+                    print(f"❌ Error saving {sender_name}: {str(e)}")
+                    self.stats['failed'] += 1
+                    self._timed('persist', start, 0)
+                    continue
+            if item['mode'] != SKIPPED:
+                self.stats['saved'] += 1
+                print(f"✅ Collected {item['record']['total_messages']} messages from {sender_name}")
+            self.stats[item['mode']] += 1
+            if self.checkpoint is not None:
+                # Checkpoint (and processing order) after every conversation
+                self.checkpoint.mark_completed(sender_name, messages=item['record'].get('messages', []))
+            if item['mode'] != SKIPPED:
+                self.policy.fetched(item)
+            self._timed('persist', start)
+            if self.on_result is not None:
+                self.on_result(item)
+            yield item
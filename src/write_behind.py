@@ -0,0 +1,126 @@
+import os
+import threading
+from src.conversation_manifest import thread_id_of
+from src.conversation_store import build_individual_data
+
+FLUSH_DELAY = 1.0  # seconds a mutation may wait in memory before hitting disk
+
+class WriteBehindStore:
+    """Coalescing write-behind layer in front of a ConversationStore.
+
+    Mutations are applied to an in-memory copy right away and readers see
+    them immediately. Repeated updates to the same conversation collapse
+    into one pending record, which is written out by a short timer or by
+    an explicit flush() on shutdown.
+    """
+
+    def __init__(self, store, flush_delay=FLUSH_DELAY):
+        self.store = store
+        self.flush_delay = flush_delay
+        self._pending = {}  # filename -> conversation in the individual file schema
+        self._flushing = {}  # records being written by the running flush, still served to readers
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()  # one flush at a time, so an older batch never lands last
+        self._timer = None
+        self.stats = {'writes': 0, 'flushes': 0, 'records_flushed': 0}
+
+    def __getattr__(self, name):
+        # Everything not buffered (paths, order file, checkpoints) goes straight to the store
+        return getattr(self.store, name)
+
+    def _buffered(self, sender_name):
+        """(filename, data) of a buffered conversation, or (None, None)"""
+        filename = self.store.filename_for(sender_name)
+        for buffer in (self._pending, self._flushing):
+            if filename in buffer:
+                return filename, buffer[filename]
+        # A thread not in the manifest yet is buffered under its thread id
+        for buffer in (self._pending, self._flushing):
+            for filename, data in buffer.items():
+                if data.get('sender_name') == sender_name:
+                    return filename, data
+        return None, None
+
+    def exists(self, sender_name):
+        with self._lock:
+            if self._buffered(sender_name)[0] is not None:
+                return True
+        return self.store.exists(sender_name)
+
+    def read(self, sender_name):
+        """Read a conversation, preferring a pending in-memory version"""
+        with self._lock:
+            data = self._buffered(sender_name)[1]
+            if data is not None:
+                return dict(data)
+        return self.store.read(sender_name)
+
+    def write(self, conversation, fetch_time=None):
+        """Buffer one conversation; returns the path it will be written to"""
+        return self.write_many([conversation], fetch_time=fetch_time)[0]
+
+    def write_many(self, conversations, fetch_time=None):
+        paths = []
+        with self._lock:
+            for conv in conversations:
+                data = conv if 'messages' in conv and 'total_messages' in conv else build_individual_data(conv, fetch_time)
+                # Keyed like the store files them, so two threads under one name stay apart
+                filename = self.store.filename_for(data['sender_name'], thread_id_of(data))
+                self._pending[filename] = data
+                paths.append(os.path.join(self.store.conversations_dir, filename))
+                self.stats['writes'] += 1
+            self._schedule()
+        return paths
+
+    def update(self, sender_name, changes):
+        """Apply field changes in memory; returns the new data or None"""
+        with self._lock:
+            filename, data = self._buffered(sender_name)
+            if data is None:
+                data = self.store.read(sender_name)
+                if data is None:
+                    return None
+                filename = self.store.filename_for(sender_name, thread_id_of(data))
+            data = dict(data, **changes)
+            self._pending[filename] = data
+            self.stats['writes'] += 1
+            self._schedule()
+        return data
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write every pending conversation through the store; returns the count"""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._pending:
+                    return 0
+                # Swap the buffer, so readers and writers are not held up by the disk I/O
+                self._flushing, self._pending = self._pending, {}
+            records = list(self._flushing.values())
+            try:
+                self.store.write_many(records)
+            except Exception as e:
+                # Put the records back so the next flush retries them; newer writes win
+                print(f"⚠️ Write-behind flush failed, will retry: {e}")
+                with self._lock:
+                    self._pending = {**self._flushing, **self._pending}
+                    self._flushing = {}
+                    self._schedule()
+                return 0
+            with self._lock:
+                self._flushing = {}
+                self.stats['flushes'] += 1
+                self.stats['records_flushed'] += len(records)
+            return len(records)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending) + len(self._flushing)